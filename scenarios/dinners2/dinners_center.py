@@ -8,15 +8,15 @@ class DinnersEvaluator:
 
     def __init__(self, reserved_value=0.0, values=None):
         self.reserved_value = reserved_value
+        # read the utility values from the csv vile
+        csv = pd.read_csv(Path(__file__).parent / "center.csv")
+        self._days = [_ for _ in csv.columns if _ != "value"]
         if values is None:
-            values = pd.read_csv(Path(__file__).parent / "center.csv")
             self.values = dict()
-            for _, row in values.iterrows():
+            for _, row in csv.iterrows():
                 self.values[tuple(int(row[col]) for col in self._days)] = row["value"]
         else:
             self.values = values
-        # read the utility values from the csv vile
-        self._days = [_ for _ in values.columns if _ != "value"]
 
     def __call__(self, agreements):
         if not agreements:
@@ -0,0 +1,268 @@
+import hashlib
+import io
+import os
+import pickle
+import sys
+from collections.abc import Callable, Iterable
+from contextlib import contextmanager
+from functools import cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any, TypeVar
+
+from negmas.warnings import NegmasIOWarning, warn
+
+__all__ = [
+    "CACHE_SUFFIX",
+    "cache_file",
+    "cached_load",
+    "clear_cache",
+    "content_hash",
+    "unload_shadowed_modules",
+]
+
+T = TypeVar("T")
+
+CACHE_SUFFIX = ".anl2025.pkl"
+"""Suffix of files holding compiled (pickled) scenarios"""
+
+_IGNORED_PARTS = ("__pycache__",)
+_IGNORED_SUFFIXES = (".pyc", ".pyo", CACHE_SUFFIX)
+_INSTALLED_PREFIXES = tuple(
+    {str(Path(_).resolve()) for _ in (sys.prefix, sys.base_prefix, sys.exec_prefix)}
+)
+
+
+@cache
+def _code_hash() -> str:
+    # development installs keep their version while the code changes under them
+    h = hashlib.sha256()
+    base = Path(__file__).parent
+    for f in sorted(base.glob("**/*.py")):
+        h.update(str(f.relative_to(base)).encode())
+        h.update(f.read_bytes())
+    return h.hexdigest()
+
+
+def _versions() -> tuple[str, ...]:
+    versions = [f"{sys.version_info.major}.{sys.version_info.minor}"]
+    for package in ("anl2025", "negmas"):
+        try:
+            versions.append(version(package))
+        except PackageNotFoundError:
+            versions.append("")
+    versions.append(_code_hash())
+    return tuple(versions)
+
+
+def _source_files(path: Path) -> list[Path]:
+    if path.is_file():
+        return [path]
+    return sorted(
+        f
+        for f in path.glob("**/*")
+        if f.is_file()
+        and not f.name.endswith(_IGNORED_SUFFIXES)
+        and not any(_ in f.parts for _ in _IGNORED_PARTS)
+    )
+
+
+def _file_hash(path: Path | str) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def content_hash(paths: Iterable[Path | str], *extra: Any) -> str:
+    """
+    Hashes the contents of the given files/folders (recursively) and any extra values.
+
+    Remarks:
+        - File names (relative to the given folders) are part of the hash so renaming a file changes it.
+        - The versions of python, anl2025 and negmas (and the code of anl2025) are always included.
+    """
+    h = hashlib.sha256()
+    h.update(repr((_versions(), extra)).encode())
+    for path in paths:
+        path = Path(path).resolve()
+        for f in _source_files(path):
+            h.update(str(f.relative_to(path) if f != path else f.name).encode())
+            h.update(b"\0")
+            h.update(f.read_bytes())
+            h.update(b"\0")
+    return h.hexdigest()
+
+
+def cache_file(path: Path | str, cache_path: Path | str | None = None) -> Path:
+    """Returns the cache file of a scenario file or folder.
+
+    Remarks:
+        - By default, the cache file is a hidden file next to the scenario. If a `cache_path` is given,
+          the cache file is stored in it instead (named after the scenario and a hash of its location).
+    """
+    path = Path(path).resolve()
+    if cache_path is None:
+        return path.parent / f".{path.name}{CACHE_SUFFIX}"
+    location = hashlib.sha256(str(path).encode()).hexdigest()[:16]
+    return Path(cache_path) / f"{path.name}-{location}{CACHE_SUFFIX}"
+
+
+def unload_shadowed_modules(folder: Path | str) -> list[str]:
+    """Removes modules named after code files in the folder but loaded from elsewhere from `sys.modules`.
+
+    Remarks:
+        - Scenarios often use the same module names for their code files (e.g. `dinners_center`). Without
+          this, classes of a scenario would be taken from whatever scenario was loaded first.
+
+    Returns:
+        The names of removed modules.
+    """
+    folder = Path(folder).resolve()
+    removed = []
+    for f in folder.glob("**/*.py"):
+        parts = f.relative_to(folder).with_suffix("").parts
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        name = ".".join(parts)
+        module = sys.modules.get(name, None) if name else None
+        file = getattr(module, "__file__", None)
+        if module is None or not file:
+            continue
+        if not Path(file).resolve().is_relative_to(folder):
+            del sys.modules[name]
+            removed.append(name)
+    return removed
+
+
+@contextmanager
+def _added_paths(paths: Iterable[Path | str]):
+    paths = list(paths)
+    for p in paths:
+        unload_shadowed_modules(p)
+    added = [str(_) for _ in paths if str(_) not in sys.path]
+    for p in added:
+        sys.path.insert(0, p)
+    try:
+        yield
+    finally:
+        for p in added:
+            if p in sys.path:
+                sys.path.remove(p)
+
+
+class _RecordingPickler(pickle.Pickler):
+    """Records the modules defining the classes and functions of pickled objects"""
+
+    def __init__(self, file, protocol=pickle.HIGHEST_PROTOCOL):
+        super().__init__(file, protocol=protocol)
+        self.modules: set[str] = set()
+
+    def reducer_override(self, obj):
+        if isinstance(obj, type) or callable(obj):
+            module = getattr(obj, "__module__", None)
+            if isinstance(module, str):
+                self.modules.add(module)
+        return NotImplemented
+
+
+def _manifest(modules: Iterable[str]) -> dict[str, tuple[str, str]]:
+    """The file and hash of every module defining code of an object that is not part of an installed package"""
+    manifest = {}
+    for name in sorted(modules):
+        if name == "anl2025" or name.startswith("anl2025."):
+            # covered by the code hash of anl2025 (see `content_hash`)
+            continue
+        file = getattr(sys.modules.get(name, None), "__file__", None)
+        if not file:
+            continue
+        file = str(Path(file).resolve())
+        if not file.endswith(".py") or any(
+            Path(file).is_relative_to(_) for _ in _INSTALLED_PREFIXES
+        ):
+            continue
+        manifest[name] = (file, _file_hash(file))
+    return manifest
+
+
+def _check_manifest(manifest: dict[str, tuple[str, str]]) -> str | None:
+    """Returns why the code of a cached object does not match the code loaded now (`None` if it does)."""
+    for name, (file, digest) in manifest.items():
+        current = getattr(sys.modules.get(name, None), "__file__", None)
+        if not current or str(Path(current).resolve()) != file:
+            return f"module {name} was loaded from {current} instead of {file}"
+        if not Path(file).is_file() or _file_hash(file) != digest:
+            return f"{file} changed"
+    return None
+
+
+def _discard(f: Path, reason: str) -> None:
+    warn(f"Discarding the cached scenario {f}: {reason}", NegmasIOWarning)
+    f.unlink(missing_ok=True)
+
+
+def cached_load(
+    key: str,
+    loader: Callable[[], T],
+    path: Path | str,
+    sys_paths: Iterable[Path | str] = (),
+) -> T:
+    """
+    Returns the object stored in a cache file if it was stored under the given key or loads (and caches) it.
+
+    Args:
+        key: A key for the object (usually a `content_hash` of its sources).
+        loader: Loads the object if it is not found in the cache.
+        path: The cache file (see `cache_file`). It keeps a single object replaced whenever the key changes.
+        sys_paths: Paths added to `sys.path` while unpickling (for objects defined in code files of scenarios).
+
+    Remarks:
+        - The file and hash of every module defining code used by the object (outside installed packages)
+          are stored with it. The cached object is not used if any of them changed or if a module with the
+          same name is loaded from another file.
+        - Unreadable or outdated cache files are removed (with a warning). Objects that cannot be pickled
+          are not cached (with a warning).
+        - `None` is never cached.
+    """
+    f = Path(path)
+    sys_paths = list(sys_paths)
+    if f.is_file():
+        try:
+            with open(f, "rb") as file:
+                stored_key, manifest, data = pickle.load(file)
+            if stored_key == key:
+                with _added_paths(sys_paths):
+                    obj = pickle.loads(data)
+                    reason = _check_manifest(manifest)
+                if reason is None:
+                    return obj
+                _discard(f, reason)
+        except Exception as e:
+            _discard(f, f"cannot read it ({type(e).__name__}: {e})")
+    obj = loader()
+    if obj is None:
+        return obj
+    try:
+        buffer = io.BytesIO()
+        pickler = _RecordingPickler(buffer)
+        pickler.dump(obj)
+        data = pickle.dumps(
+            (key, _manifest(pickler.modules), buffer.getvalue()),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        f.parent.mkdir(parents=True, exist_ok=True)
+        tmp = f.with_name(f"{f.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(f)
+    except Exception as e:
+        warn(
+            f"Cannot cache the scenario in {f} ({type(e).__name__}: {e})",
+            NegmasIOWarning,
+        )
+    return obj
+
+
+def clear_cache(cache_path: Path | str) -> None:
+    """Removes all compiled objects from a folder (scenario folders or a `cache_path` given to loaders)."""
+    cache_path = Path(cache_path)
+    if not cache_path.is_dir():
+        return
+    for f in cache_path.glob(f"*{CACHE_SUFFIX}"):
+        f.unlink(missing_ok=True)
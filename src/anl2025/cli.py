@@ -15,12 +15,21 @@ from negmas.serialization import dump
 import pandas as pd
 import anl2025
 from typing import Annotated
-from anl2025.tournament import Tournament
+from anl2025.tournament import (
+    SCORES_FILE_NAME,
+    STREAM_FOLDER_NAME,
+    Tournament,
+    TournamentResults,
+    merge_shards,
+    run_worker,
+)
+from anl2025.jobqueue import LEASE_SECONDS
+from anl2025.plots import render_plots
 import typer
 from rich import print
 
 from anl2025.ufun import CenterUFun
-from anl2025.common import TYPE_IDENTIFIER
+from anl2025.common import DEFAULT_OUTPUT_TIER, OUTPUT_TIERS, TYPE_IDENTIFIER
 from anl2025.runner import DEFAULT_METHOD, RunParams, run_generated_session, run_session
 
 
@@ -81,8 +90,10 @@ def do_make(
     separate_scenarios: bool = True,
     name: str = "auto",
     method: str = DEFAULT_METHOD,
+    output_tier: str = DEFAULT_OUTPUT_TIER,
     public_graph: bool = True,
     verbose: bool = False,
+    seed: int | None = None,
 ):
     if (
         fraction_dinners is not None
@@ -149,7 +160,14 @@ def do_make(
     t = Tournament.from_scenarios(
         competitors=(competitors),
         scenarios=tuple(scenarios),
-        run_params=RunParams(nsteps, keep_order, share_ufuns, atomic, method=method),
+        run_params=RunParams(
+            nsteps,
+            keep_order,
+            share_ufuns,
+            atomic,
+            method=method,
+            output_tier=output_tier,
+        ),
         n_generated=generated,
         nedges=nedges,
         nissues=nissues,
@@ -164,6 +182,7 @@ def do_make(
         fraction_job_hunt=fraction_job_hunt,
         fraction_target_quantity=fraction_target_quantity,
         fraction_others=fraction_others,
+        seed=seed,
     )
     path = output / "info.yaml"
     t.save(
@@ -175,15 +194,45 @@ def do_make(
 
 
 def do_run(
-    t: Tournament, nreps: int, output: Path, verbose: bool, dry: bool, njobs: int
+    t: Tournament,
+    nreps: int,
+    output: Path,
+    verbose: bool,
+    dry: bool,
+    njobs: int,
+    stream: bool = False,
+    resume: bool = False,
+    seed: int | None = None,
+    shard: str | None = None,
+    queue: Path | None = None,
 ):
-    results = t.run(nreps, output, verbose, dry, n_jobs=njobs if njobs >= 0 else None)
-    if len(results.scores) < 1:
+    results = t.run(
+        nreps,
+        output,
+        verbose,
+        dry,
+        n_jobs=njobs if njobs >= 0 else None,
+        stream=stream,
+        resume=resume,
+        seed=seed,
+        shard=shard,
+        queue=queue,
+    )
+    scores_file = output / STREAM_FOLDER_NAME / SCORES_FILE_NAME
+    if stream and scores_file.is_file():
+        data = pd.read_csv(scores_file)
+    else:
+        data = pd.DataFrame.from_records(results.scores)
+    save_results(results, data, output)
+
+
+def save_results(results: TournamentResults, data: pd.DataFrame, output: Path):
+    """Saves and displays the scores of a tournament (`data` has a row per score record)"""
+    if len(data) < 1:
         print(
             "No results found!! Make sure that you pass scenarios either using --scenarios or --generate"
         )
         return
-    data = pd.DataFrame.from_records(results.scores)
     data["role"] = data["index"].apply(lambda x: "center" if x == 0 else "edge")
     data.to_csv(output / "scores.csv", index=False)
     dump(results.final_scores, output / "final_scores.yaml")
@@ -193,7 +242,7 @@ def do_run(
     dump(results.unweighted_average, output / "unweighted_average.yaml")
     dump(results.center_count, output / "center_count.yaml")
     dump(results.edge_count, output / "edge_count.yaml")
-    print(f"Got {len(results.scores)} scores")
+    print(f"Got {len(data)} scores")
     df = data.groupby(["agent", "role"])["utility"].describe().reset_index()
     if len(df) > 0:
         assert isinstance(df, pd.DataFrame)
@@ -375,7 +424,7 @@ def run_random(
     output: Annotated[
         Path,
         typer.Option(
-            help="A directory to store the negotiation logs and plots",
+            help="A directory to store the negotiation logs (use the plots command to render plots from them)",
             rich_help_panel="Output",
         ),
     ] = Path.home() / "negmas" / "anl2025" / "session",
@@ -390,6 +439,13 @@ def run_random(
         bool,
         typer.Option(help="Verbosity", rich_help_panel="Output and Logs"),
     ] = False,
+    output_tier: Annotated[
+        str,
+        typer.Option(
+            help=f"How much to write to the output: {', '.join(OUTPUT_TIERS)} (nothing, final results only, also negotiation traces or also csv logs and plots)",
+            rich_help_panel="Output and Logs",
+        ),
+    ] = DEFAULT_OUTPUT_TIER,
 ):
     results = run_generated_session(
         center_type=center,
@@ -411,6 +467,7 @@ def run_random(
         name=name,
         dry=dry,
         method=DEFAULT_METHOD,
+        output_tier=output_tier,
     )
 
     cfun = results.center.ufun
@@ -495,7 +552,7 @@ def run_scenario(
     output: Annotated[
         Path,
         typer.Option(
-            help="A directory to store the negotiation logs and plots",
+            help="A directory to store the negotiation logs (use the plots command to render plots from them)",
             rich_help_panel="Output",
         ),
     ] = Path.home() / "negmas" / "anl2025" / "session",
@@ -510,6 +567,13 @@ def run_scenario(
         bool,
         typer.Option(help="Verbosity", rich_help_panel="Output and Logs"),
     ] = False,
+    output_tier: Annotated[
+        str,
+        typer.Option(
+            help=f"How much to write to the output: {', '.join(OUTPUT_TIERS)} (nothing, final results only, also negotiation traces or also csv logs and plots)",
+            rich_help_panel="Output and Logs",
+        ),
+    ] = DEFAULT_OUTPUT_TIER,
 ):
     s = (
         MultidealScenario.from_file(path)
@@ -532,6 +596,7 @@ def run_scenario(
         name=name,
         dry=dry,
         method=DEFAULT_METHOD,
+        output_tier=output_tier,
     )
 
     cfun = results.center.ufun
@@ -648,6 +713,13 @@ def make(
             rich_help_panel="Tournament Control",
         ),
     ] = False,
+    seed: Annotated[
+        int,
+        typer.Option(
+            help="Random seed. If given, generated scenarios and the assignment of competitors to sessions are reproducible.",
+            rich_help_panel="Tournament Control",
+        ),
+    ] = None,  # type: ignore
     center_reserved_value_min: Annotated[
         float,
         typer.Option(
@@ -722,7 +794,7 @@ def make(
     output: Annotated[
         Path,
         typer.Option(
-            help="A directory to store the negotiation logs and plots",
+            help="A directory to store the negotiation logs (use the plots command to render plots from them)",
             rich_help_panel="Output",
         ),
     ] = Path.home() / "negmas" / "anl2025" / "tournament",
@@ -747,6 +819,13 @@ def make(
             rich_help_panel="Mechanism",
         ),
     ] = DEFAULT_METHOD,
+    output_tier: Annotated[
+        str,
+        typer.Option(
+            help=f"How much to write to the output: {', '.join(OUTPUT_TIERS)} (nothing, final results only, also negotiation traces or also csv logs and plots)",
+            rich_help_panel="Output and Logs",
+        ),
+    ] = DEFAULT_OUTPUT_TIER,
 ):
     if scenarios_path is None and generate is None:
         print(
@@ -778,7 +857,9 @@ def make(
         separate_scenarios=separate_scenarios,
         name=name,
         method=method,
+        output_tier=output_tier,
         verbose=verbose,
+        seed=seed,
     )
     if tournament:
         print(f"Tournament information is saved in {path}. Use `run` to run it")
@@ -941,7 +1022,7 @@ def run(
     output: Annotated[
         Path,
         typer.Option(
-            help="A directory to store the negotiation logs and plots",
+            help="A directory to store the negotiation logs (use the plots command to render plots from them)",
             rich_help_panel="Output",
         ),
     ] = Path.home() / "negmas" / "anl2025" / "tournament",
@@ -966,6 +1047,13 @@ def run(
             rich_help_panel="Mechanism",
         ),
     ] = DEFAULT_METHOD,
+    output_tier: Annotated[
+        str,
+        typer.Option(
+            help=f"How much to write to the output: {', '.join(OUTPUT_TIERS)} (nothing, final results only, also negotiation traces or also csv logs and plots)",
+            rich_help_panel="Output and Logs",
+        ),
+    ] = DEFAULT_OUTPUT_TIER,
     dry: Annotated[
         bool,
         typer.Option(
@@ -991,6 +1079,20 @@ def run(
             rich_help_panel="Tournament Control",
         ),
     ] = 1,
+    stream: Annotated[
+        bool,
+        typer.Option(
+            help="Stream scores and session summaries to disk as sessions complete instead of keeping them in memory.",
+            rich_help_panel="Output and Logs",
+        ),
+    ] = False,
+    seed: Annotated[
+        int,
+        typer.Option(
+            help="Random seed. If given, generated scenarios and the assignment of competitors to sessions are reproducible.",
+            rich_help_panel="Tournament Control",
+        ),
+    ] = None,  # type: ignore
 ):
     if scenarios_path is None and generate is None:
         print(
@@ -1022,12 +1124,14 @@ def run(
         separate_scenarios=separate_scenarios,
         name=name,
         method=method,
+        output_tier=output_tier,
         verbose=verbose,
+        seed=seed,
     )
     if not t or path is None:
         return
     print(f"Tournament information is saved in {path}. Use `run` to run it")
-    do_run(t, nreps, path.parent, verbose, dry, njobs)
+    do_run(t, nreps, path.parent, verbose, dry, njobs, stream, seed=seed)
 
 
 @tournament.command(help="Executes a tournament made using the make command.")
@@ -1064,6 +1168,43 @@ def execute(
             rich_help_panel="Tournament Control",
         ),
     ] = 1,
+    stream: Annotated[
+        bool,
+        typer.Option(
+            help="Stream scores and session summaries to disk as sessions complete instead of keeping them in memory.",
+            rich_help_panel="Output and Logs",
+        ),
+    ] = False,
+    resume: Annotated[
+        bool,
+        typer.Option(
+            help="Resume an interrupted run of this tournament skipping sessions that were already completed.",
+            rich_help_panel="Tournament Control",
+        ),
+    ] = False,
+    seed: Annotated[
+        int,
+        typer.Option(
+            help="Random seed. If given, generated scenarios and the assignment of competitors to sessions are reproducible.",
+            rich_help_panel="Tournament Control",
+        ),
+    ] = None,  # type: ignore
+    shard: Annotated[
+        str,
+        typer.Option(
+            help="Run only a slice of the sessions given as k/n (e.g. 3/8 for the third of eight shards). "
+            "Every shard must use the same tournament, nreps and seed. Use `merge` to combine the results of all shards.",
+            rich_help_panel="Tournament Control",
+        ),
+    ] = None,  # type: ignore
+    queue: Annotated[
+        Path,
+        typer.Option(
+            help="A job queue database to add the sessions to. Sessions are run by any number of `anl2025 worker` "
+            "processes started separately with the same queue (njobs is ignored).",
+            rich_help_panel="Tournament Control",
+        ),
+    ] = None,  # type: ignore
     python_class_identifier: Annotated[
         str,
         typer.Option(
@@ -1073,7 +1214,108 @@ def execute(
     ] = TYPE_IDENTIFIER,
 ):
     t = Tournament.load(path, python_class_identifier=python_class_identifier)
-    do_run(t, nreps, path.parent, verbose, dry, njobs)
+    do_run(
+        t, nreps, path.parent, verbose, dry, njobs, stream, resume, seed, shard, queue
+    )
+
+
+@app.command(
+    help="Runs sessions of a tournament executed with `tournament execute --queue` until none is left."
+)
+def worker(
+    queue: Annotated[
+        Path,
+        typer.Argument(help="The job queue database", rich_help_panel="Input"),
+    ],
+    lease: Annotated[
+        float,
+        typer.Option(
+            help="Seconds a session stays reserved for this worker. Sessions of crashed workers are run again after this.",
+            rich_help_panel="Tournament Control",
+        ),
+    ] = LEASE_SECONDS,
+    max_sessions: Annotated[
+        int,
+        typer.Option(
+            help="Maximum number of sessions to run before exiting",
+            rich_help_panel="Tournament Control",
+        ),
+    ] = None,  # type: ignore
+):
+    n = run_worker(queue, lease_seconds=lease, max_sessions=max_sessions)
+    print(f"Ran {n} sessions")
+
+
+@app.command(
+    help="Renders plots of negotiations from the traces stored while running them."
+)
+def plots(
+    path: Annotated[
+        Path,
+        typer.Argument(
+            help="A results directory (e.g. a tournament folder), a folder of trace files or a trace file",
+            rich_help_panel="Input",
+        ),
+    ],
+    session: Annotated[
+        list[str],
+        typer.Option(
+            help="Names (or glob patterns) of the sessions to plot. Can be repeated. All sessions are plotted if not given.",
+            rich_help_panel="Input",
+        ),
+    ] = None,  # type: ignore
+    output: Annotated[
+        Path,
+        typer.Option(
+            help="Folder to save plots to. By default, a plots folder inside the results directory",
+            rich_help_panel="Output and Logs",
+        ),
+    ] = None,  # type: ignore
+    njobs: Annotated[
+        int,
+        typer.Option(
+            help="Parallelism. -1 for serial, 0 for maximum parallelism and int>0 for specific number of cores",
+            rich_help_panel="Output and Logs",
+        ),
+    ] = 0,
+    overwrite: Annotated[
+        bool,
+        typer.Option(
+            help="Render plots that already exist again.",
+            rich_help_panel="Output and Logs",
+        ),
+    ] = False,
+):
+    rendered = render_plots(
+        path, output, sessions=session, n_jobs=njobs, overwrite=overwrite
+    )
+    print(f"Rendered {len(rendered)} plots")
+
+
+@tournament.command(
+    help="Merges the results of shards of a tournament executed using `execute --shard`."
+)
+def merge(
+    paths: Annotated[
+        list[Path],
+        typer.Argument(
+            help="Folders the shards were executed in (the folders of their tournament yaml files)",
+            rich_help_panel="Input",
+        ),
+    ],
+    output: Annotated[
+        Path,
+        typer.Option(
+            help="Folder to save the merged results to. By default, a `merged` folder next to the first shard",
+            rich_help_panel="Output and Logs",
+        ),
+    ] = None,  # type: ignore
+):
+    if output is None:
+        output = paths[0].parent / "merged"
+    output.mkdir(parents=True, exist_ok=True)
+    results = merge_shards(paths)
+    save_results(results, pd.DataFrame.from_records(results.scores), output)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,33 @@
+import _thread
+import hashlib
+import signal
+import string
+import threading
+import time
+from contextlib import contextmanager
 from typing import Any
+import numpy as np
 from attr import field
 from attrs import define
-from random import random
 from negmas.helpers.types import get_class
+from negmas.warnings import NegmasIgnoredValueWarning, warn
+import psutil
 
 __all__ = [
     "RunParams",
+    "make_rng",
+    "derive_seed",
+    "random_name",
+    "session_budget",
+    "SessionBudgetExceeded",
+    "BUDGET_ERROR_PREFIX",
+    "OUTPUT_NONE",
+    "OUTPUT_SUMMARY",
+    "OUTPUT_TRACE",
+    "OUTPUT_FULL",
+    "OUTPUT_TIERS",
+    "DEFAULT_OUTPUT_TIER",
+    "check_output_tier",
     "TYPE_IDENTIFIER",
     "CENTER_FILE_NAME",
     "EDGES_FOLDER_NAME",
@@ -17,6 +39,9 @@ TYPE_IDENTIFIER = "type"
 CENTER_FILE_NAME = "center.yml"
 EDGES_FOLDER_NAME = "edges"
 SIDES_FOLDER_NAME = "sides"
+BUDGET_ERROR_PREFIX = "Exceeded the "
+NAME_CHARACTERS = string.digits + string.ascii_letters
+"""Characters used for the random part of generated names (see `random_name`)"""
 TYPES_MAP = dict(
     DiscreteCartesianOutcomeSpace="negmas.outcomes.DiscreteCartesianOutcomeSpace"
 )
@@ -24,6 +49,18 @@ TYPES_MAP = dict(
 SEQUENTIAL_METHOD = "sequential"
 DEFAULT_METHOD = SEQUENTIAL_METHOD
 
+OUTPUT_NONE = "none"
+"""Output tier: nothing is written to disk"""
+OUTPUT_SUMMARY = "summary"
+"""Output tier: only final results of sessions are written"""
+OUTPUT_TRACE = "trace"
+"""Output tier: final results and compact negotiation traces (see `anl2025.traces`) are written"""
+OUTPUT_FULL = "full"
+"""Output tier: final results, traces, csv logs and plots of every negotiation thread are written"""
+OUTPUT_TIERS = (OUTPUT_NONE, OUTPUT_SUMMARY, OUTPUT_TRACE, OUTPUT_FULL)
+"""All output tiers from the least to the most output"""
+DEFAULT_OUTPUT_TIER = OUTPUT_TRACE
+
 
 @define
 class RunParams:
@@ -42,6 +79,20 @@ class RunParams:
         center_os_limit: Allows for specifying a limit of outcome-space size for any negotiator when it is in the center.
                          This is useful to avoid attempting to run agents that will definitely fail for large outcome-spaces breaking
                          the tournament (e.g. due to a memory explosion resulting from attempting to create a list of all outcomes).
+        session_cpu_limit: Maximum CPU time (in seconds) of a complete multideal session in a tournament (see `session_budget`).
+        session_memory_limit: Maximum growth of the resident memory (in MB) of a worker while running a session in a tournament.
+        output_tier: How much is written to disk when an output path is given. One of `OUTPUT_TIERS`: none (nothing),
+                     summary (final results only), trace (final results and compact traces) or full (also csv logs
+                     and plots of every thread).
+
+    Remarks:
+        - Tournaments learn the usage of every agent in the center versus the size of the center outcome-space
+          and skip sessions predicted to exceed `session_cpu_limit` or `session_memory_limit` (see
+          `anl2025.scheduler.CostProfile`). `center_os_limit` can still be used to set limits explicitly.
+        - Tournaments only keep their final results with the none tier (no per-session files are written)
+          and only stream session summaries and scores with the summary tier.
+        - Session budgets are only enforced for sessions running in the main thread of their process (see
+          `session_budget`).
     """
 
     # mechanism params
@@ -57,6 +108,19 @@ class RunParams:
     ignore_mechanism_exceptions: bool = False
     ignore_negotiator_exceptions: bool | None = None
     center_os_limit: dict = field(factory=dict)
+    session_cpu_limit: float | None = None
+    session_memory_limit: float | None = None
+    # output
+    output_tier: str = DEFAULT_OUTPUT_TIER
+
+
+def check_output_tier(tier: str) -> str:
+    """Returns the tier if it is one of `OUTPUT_TIERS` and raises a `ValueError` otherwise"""
+    if tier not in OUTPUT_TIERS:
+        raise ValueError(
+            f"Unknown output tier {tier}. Supported tiers are {OUTPUT_TIERS}"
+        )
+    return tier
 
 
 def get_ufun_class(x: str | type) -> type:
@@ -73,8 +137,132 @@ def get_agent_class(x: str | type) -> type:
     return get_class(x, module_name="anl2025.negotiator")
 
 
-def sample_between(mn: float, mx: float, eps: float = EPSILON) -> float:
+def make_rng(seed: int | np.random.Generator | None = None) -> np.random.Generator:
+    """Creates a random number generator.
+
+    Remarks:
+        - If `seed` is `None`, the generator is seeded with fresh entropy from the OS.
+        - If `seed` is already a generator, it is returned as it is so that callers can share it.
+        - Nothing in this package seeds or uses the global `random`/`numpy.random` state to get
+          reproducible results. Pass generators (or seeds) explicitly instead.
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def derive_seed(*keys: Any) -> int:
+    """Derives a 32-bit seed from the given keys (e.g. a base seed and a run index).
+
+    Remarks:
+        - The result depends only on the keys so it can be regenerated independently on any machine.
+    """
+    h = hashlib.sha256(repr(keys).encode()).digest()
+    return int.from_bytes(h[:4], "little")
+
+
+def random_name(
+    base: str, rng: np.random.Generator | None = None, sep: str = "_", n: int = 8
+) -> str:
+    """Returns `base` followed by `n` random letters and digits drawn from the given generator."""
+    chars = make_rng(rng).choice(list(NAME_CHARACTERS), size=n)
+    return f"{base}{sep}{''.join(chars)}"
+
+
+class SessionBudgetExceeded(BaseException):
+    """Raised in the main thread when a session exceeds its budget (see `session_budget`).
+
+    Remarks:
+        - Derives from `BaseException` so that agents catching `Exception` cannot swallow it.
+    """
+
+
+@contextmanager
+def session_budget(
+    cpu_seconds: float | None = None,
+    memory_mb: float | None = None,
+    interval: float = 0.05,
+):
+    """Interrupts the block with `SessionBudgetExceeded` if it uses too much CPU time or memory.
+
+    Args:
+        cpu_seconds: Maximum CPU time used by the process (all threads) within the block.
+        memory_mb: Maximum growth of the resident set size of the process within the block.
+        interval: Seconds between checks.
+
+    Remarks:
+        - A watchdog thread checks usage and interrupts the main thread. The interruption takes effect
+          as soon as the main thread runs python code (long computations in C cannot be interrupted).
+        - Does nothing if no budget is given. Only the main thread can be interrupted so budgets are not
+          enforced (with a warning) when called from any other thread. Run sessions with budgets in the main
+          thread of their process (as tournament workers do).
+    """
+    if cpu_seconds is None and memory_mb is None:
+        yield
+        return
+    if threading.current_thread() is not threading.main_thread():
+        warn(
+            f"Session budgets (cpu: {cpu_seconds}, memory: {memory_mb}) are not enforced outside the main thread "
+            f"(running in {threading.current_thread().name})",
+            NegmasIgnoredValueWarning,
+        )
+        yield
+        return
+    process = psutil.Process()
+    cpu = time.process_time()
+    rss = process.memory_info().rss
+    reasons: list[str] = []
+    armed = [True]
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def interrupt(signum, frame):
+        if not reasons:
+            if callable(previous):
+                return previous(signum, frame)
+            raise KeyboardInterrupt
+        if armed[0]:
+            armed[0] = False
+            raise SessionBudgetExceeded(reasons[0])
+
+    def watch():
+        while not done.wait(interval):
+            reason = None
+            used = time.process_time() - cpu
+            if cpu_seconds is not None and used > cpu_seconds:
+                reason = f"{BUDGET_ERROR_PREFIX}CPU budget of {cpu_seconds}s"
+            elif memory_mb is not None:
+                grown = (process.memory_info().rss - rss) / 2**20
+                if grown > memory_mb:
+                    reason = f"{BUDGET_ERROR_PREFIX}memory budget of {memory_mb}MB (grew by {grown:.0f}MB)"
+            if reason is None:
+                continue
+            with lock:
+                if armed[0]:
+                    reasons.append(reason)
+                    _thread.interrupt_main(signal.SIGINT)
+            return
+
+    previous = signal.signal(signal.SIGINT, interrupt)
+    watchdog = threading.Thread(target=watch, daemon=True)
+    watchdog.start()
+    try:
+        yield
+    finally:
+        done.set()
+        with lock:
+            armed[0] = False
+        watchdog.join()
+        signal.signal(signal.SIGINT, previous)
+
+
+def sample_between(
+    mn: float,
+    mx: float,
+    eps: float = EPSILON,
+    rng: np.random.Generator | None = None,
+) -> float:
     """Samples a number if the given range"""
     if (mx - mn) > eps:
-        return mn + (mx - mn) * random()
+        return mn + (mx - mn) * float(make_rng(rng).random())
     return (mx + mn) / 2.0
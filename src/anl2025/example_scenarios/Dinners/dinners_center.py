@@ -1,6 +1,8 @@
-import itertools
+from ast import literal_eval
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from anl2025.ufun import CompiledEvaluator
 
 
 class DinnersEvaluator:
@@ -21,15 +23,33 @@ class DinnersEvaluator:
             self.days = days
             self.values = values
 
+    def _day_indices(self) -> dict:
+        # created lazily so that evaluators pickled before it existed keep working
+        day_index = self.__dict__.get("_day_index", None)
+        if day_index is None:
+            day_index = self._day_index = {day: i for i, day in enumerate(self.days)}
+        return day_index
+
     def __call__(self, agreements):
         if not agreements:
             return self.reserved_value
-        outings = dict(zip(self.days, itertools.repeat(0)))
+        day_index = self._day_indices()
+        outings = [0] * len(self.days)
         for agreement in agreements:
             if agreement is None:
                 continue
             # day is a tuple of one value which is the day selected
-            outings[agreement[0]] += 1
-        return self.values.get(
-            str(tuple(outings[day] for day in self.days)), self.reserved_value
-        )
+            outings[day_index[agreement[0]]] += 1
+        return self.values.get(str(tuple(outings)), self.reserved_value)
+
+    def compile(self, thread_outcomes):
+        """Compiles the evaluator into an array-backed form for fast batch evaluation"""
+        day_index = self._day_indices()
+        counts = []
+        for outcomes in thread_outcomes:
+            c = np.zeros((len(outcomes) + 1, len(self.days)), dtype=np.int64)
+            for i, outcome in enumerate(outcomes):
+                c[i + 1, day_index[outcome[0]]] = 1
+            counts.append(c)
+        values = {literal_eval(k): float(v) for k, v in self.values.items()}
+        return CompiledEvaluator(counts, values, self.reserved_value)
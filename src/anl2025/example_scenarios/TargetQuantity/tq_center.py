@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from anl2025.ufun import CompiledEvaluator
 
 
 class TargetEvaluator:
@@ -20,11 +22,16 @@ class TargetEvaluator:
     def __call__(self, agreements):
         if not agreements:
             return self.reserved_value
-
-        # outings = dict(zip(self.days, itertools.repeat(0)))
-        quantity_sum = 0
-        for agreement in agreements:
-            if agreement is None:
-                continue
-            quantity_sum += int(agreement[0])
+        quantity_sum = sum(int(_[0]) for _ in agreements if _ is not None)
         return self.values.get(quantity_sum, self.reserved_value)
+
+    def compile(self, thread_outcomes):
+        """Compiles the evaluator into an array-backed form for fast batch evaluation"""
+        return CompiledEvaluator(
+            [
+                np.asarray([0] + [int(_[0]) for _ in outcomes])
+                for outcomes in thread_outcomes
+            ],
+            {(int(k),): float(v) for k, v in self.values.items()},
+            self.reserved_value,
+        )
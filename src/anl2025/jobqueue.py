@@ -0,0 +1,217 @@
+import math
+import os
+import pickle
+import socket
+import sqlite3
+import time
+from collections.abc import Iterable
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+__all__ = [
+    "LEASE_SECONDS",
+    "POLL_SECONDS",
+    "JobQueue",
+]
+
+LEASE_SECONDS = 60.0
+"""Seconds a leased job is reserved for a worker unless the lease is renewed"""
+POLL_SECONDS = 0.5
+"""Seconds between checks of the queue when there is nothing to do"""
+
+PENDING, LEASED, DONE, FAILED = "pending", "leased", "done", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value BLOB);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    job BLOB NOT NULL,
+    priority REAL NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result BLOB,
+    collected INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, priority);
+"""
+
+
+class JobQueue:
+    """
+    A job queue stored in an SQLite database shared by a producer and any number of workers.
+
+    Args:
+        path: The database file (created if it does not exist).
+        lease_seconds: Seconds a leased job stays reserved for its worker unless renewed.
+        max_attempts: A job is marked failed instead of leased again once it was leased this many times.
+
+    Remarks:
+        - A connection is used by a single thread. Threads of the same process should create their own queues.
+        - Jobs and results are pickled. Workers must be able to import everything the jobs refer to.
+        - A worker leases a job (see `lease`), renews the lease while running it (see `renew`) and writes
+          the result back (see `complete`). Jobs whose lease expires (e.g. because their worker crashed) are
+          leased again to other workers.
+        - The producer stores everything workers need to run jobs with `set` and `seal`s the queue
+          once all jobs are added so that workers know when to exit.
+        - Leasing uses immediate transactions, so the database can be on storage shared by several hosts
+          as long as it supports file locking.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        lease_seconds: float = LEASE_SECONDS,
+        max_attempts: int = 3,
+    ):
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # transactions are managed explicitly (see `_transaction`)
+        self._connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        self._connection.executescript(_SCHEMA)
+
+    @classmethod
+    def worker_name(cls) -> str:
+        """A name identifying the current process on any host"""
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    @contextmanager
+    def _transaction(self):
+        db = self._connection
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def clear(self) -> None:
+        """Removes all jobs and stored values (workers already connected keep working with the queue)"""
+        with self._transaction() as db:
+            db.execute("DELETE FROM jobs")
+            db.execute("DELETE FROM meta")
+
+    def set(self, key: str, value: Any) -> None:
+        """Stores a value shared with workers"""
+        with self._transaction() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, pickle.dumps(value))
+            )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Reads a value stored using `set`"""
+        row = self._connection.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return default if row is None else pickle.loads(row[0])
+
+    @property
+    def sealed(self) -> bool:
+        """Whether all jobs were added"""
+        return bool(self.get("sealed", False))
+
+    def seal(self) -> None:
+        """Marks that no more jobs will be added"""
+        self.set("sealed", True)
+
+    def _fail_expired(self, db: sqlite3.Connection, now: float) -> None:
+        # jobs whose workers died too many times are not tried again
+        db.execute(
+            "UPDATE jobs SET state = ?, worker = NULL WHERE state = ? AND lease_until < ? AND attempts >= ?",
+            (FAILED, LEASED, now, self.max_attempts),
+        )
+
+    def put(self, jobs: Iterable[tuple[int, Any, float]]) -> int:
+        """Adds jobs given as (id, job, priority). Jobs with higher priority are leased first.
+
+        Returns:
+            The number of jobs added (jobs with existing ids are ignored).
+        """
+        rows = [
+            (i, pickle.dumps(job), priority if math.isfinite(priority) else 1e300)
+            for i, job, priority in jobs
+        ]
+        with self._transaction() as db:
+            before = db.total_changes
+            db.executemany(
+                "INSERT OR IGNORE INTO jobs (id, job, priority) VALUES (?, ?, ?)", rows
+            )
+            return db.total_changes - before
+
+    def lease(self, worker: str | None = None) -> tuple[int, Any] | None:
+        """Leases the next job returning its id and the job (`None` if no job is available now)."""
+        worker = worker if worker else self.worker_name()
+        now = time.time()
+        with self._transaction() as db:
+            self._fail_expired(db, now)
+            row = db.execute(
+                "SELECT id, job FROM jobs WHERE state = ? OR (state = ? AND lease_until < ?) "
+                "ORDER BY priority DESC, id LIMIT 1",
+                (PENDING, LEASED, now),
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET state = ?, worker = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                (LEASED, worker, now + self.lease_seconds, row[0]),
+            )
+        return row[0], pickle.loads(row[1])
+
+    def renew(self, id: int, worker: str | None = None) -> bool:
+        """Extends the lease of a job. Returns `False` if the worker does not hold the lease anymore."""
+        worker = worker if worker else self.worker_name()
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND state = ? AND worker = ?",
+                (time.time() + self.lease_seconds, id, LEASED, worker),
+            )
+            return cursor.rowcount > 0
+
+    def complete(self, id: int, result: Any) -> None:
+        """Stores the result of a job (the first result stored for a job is kept)"""
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET state = ?, result = ?, lease_until = NULL WHERE id = ? AND state != ?",
+                (DONE, pickle.dumps(result), id, DONE),
+            )
+
+    def collect(self) -> list[tuple[int, Any, Any, int]]:
+        """Returns the finished jobs not collected before as (id, job, result, attempts).
+
+        Remarks:
+            - The result of a job that failed (see `max_attempts`) is `None`.
+        """
+        with self._transaction() as db:
+            self._fail_expired(db, time.time())
+            rows = db.execute(
+                "SELECT id, job, result, attempts FROM jobs WHERE state IN (?, ?) AND collected = 0",
+                (DONE, FAILED),
+            ).fetchall()
+            db.executemany(
+                "UPDATE jobs SET collected = 1 WHERE id = ?", [(_[0],) for _ in rows]
+            )
+        return [
+            (i, pickle.loads(job), None if result is None else pickle.loads(result), n)
+            for i, job, result, n in rows
+        ]
+
+    def counts(self) -> dict[str, int]:
+        """The number of jobs in every state"""
+        return dict(
+            self._connection.execute(
+                "SELECT state, COUNT(*) FROM jobs GROUP BY state"
+            ).fetchall()
+        )
+
+    def is_finished(self) -> bool:
+        """Whether the queue is sealed and every job is done or failed"""
+        counts = self.counts()
+        return self.sealed and not counts.get(PENDING, 0) and not counts.get(LEASED, 0)
@@ -1,7 +1,15 @@
-from typing import Literal
-from random import random, choice
+import hashlib
+import pickle
+import threading
+import numpy as np
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Literal
+from anl2025.common import make_rng
 from anl2025.ufun import CenterUFun, SideUFun
 from negmas import SAONMI, InverseUFun, PolyAspiration, PresortingInverseUtilityFunction
+from negmas.preferences import BaseUtilityFunction
+from negmas.serialization import serialize
 
 from negmas.sao.controllers import SAOController, SAOState
 from negmas import (
@@ -32,6 +40,9 @@ __all__ = [
     "IndependentBoulware2025",
     "IndependentLinear2025",
     "IndependentConceder2025",
+    "cached_inverter",
+    "clear_inverter_cache",
+    "outcome_in",
 ]
 if ANL2024_AVAILABLE:
     __all__ += [
@@ -40,6 +51,130 @@ if ANL2024_AVAILABLE:
     ]
 
 
+INVERTER_CACHE_SIZE = 256
+"""Maximum number of utility inverters kept by `cached_inverter` in each process"""
+
+_inverter_cache: OrderedDict[Hashable, tuple[dict[str, Any], float, float, list]] = (
+    OrderedDict()
+)
+_inverter_lock = threading.Lock()
+
+
+def _fingerprint(ufun: BaseUtilityFunction) -> str | None:
+    """A hash of the serialized ufun (None if it cannot be serialized)"""
+    # not memoized per ufun object: ufuns can change after they are first seen (e.g. `restore_state`)
+    try:
+        return hashlib.sha1(pickle.dumps(serialize(ufun))).hexdigest()
+    except Exception:
+        return None
+
+
+def _inverter_key(ufun: BaseUtilityFunction) -> Hashable | None:
+    """A key that identifies the utility of every outcome under the ufun (None if not cachable)"""
+    if not ufun.is_stationary():
+        return None
+    if isinstance(ufun, SideUFun):
+        center = ufun._center_ufun
+        fp = _fingerprint(center)
+        key = (
+            fp,
+            float(center.reserved_value),
+            ufun._index,
+            tuple(center._expected[: ufun._index + 1]),
+            float(ufun.reserved_value),
+        )
+    else:
+        fp = _fingerprint(ufun)
+        key = (fp, float(ufun.reserved_value))
+    if fp is None:
+        return None
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def cached_inverter(
+    ufun: BaseUtilityFunction, best_margin: float = 1e-8
+) -> tuple[PresortingInverseUtilityFunction, float, float, list[Outcome]]:
+    """
+    Creates an initialized rational-only inverter for the given ufun reusing sorted outcomes when possible.
+
+    Args:
+        ufun: The utility function to invert.
+        best_margin: Outcomes within this (normalized) margin of the best utility are returned as best outcomes.
+
+    Returns:
+        The inverter, the maximum and minimum utilities (the minimum is never below the reserved value)
+        and a list of the best outcomes.
+
+    Remarks:
+        - Sorted outcomes are shared by all negotiators in the process. They are keyed by the content of the
+          ufun and, for side ufuns, by the expected outcomes of the center affecting the thread.
+        - At most `INVERTER_CACHE_SIZE` inverters are kept (least recently used ones are evicted).
+        - The ufun is fingerprinted on every call so changes to it are never missed. The cache can be
+          used by negotiators running in different threads.
+    """
+    inverter = PresortingInverseUtilityFunction(ufun, rational_only=True)
+    key = _inverter_key(ufun)
+    cached = None
+    if key is not None:
+        with _inverter_lock:
+            cached = _inverter_cache.get(key, None)
+            if cached is not None:
+                _inverter_cache.move_to_end(key)
+    if cached is not None and inverter.restore_state(cached[0]):
+        return inverter, cached[1], cached[2], cached[3]
+    inverter.init()
+    mx, mn = inverter.max(), inverter.min()
+    mn = max(mn, ufun(None))
+    best = inverter.some(
+        (max(0.0, mn, ufun(None), mx - best_margin), mx), normalized=True
+    )
+    if not best:
+        best = [inverter.best()]  # type: ignore
+    if key is not None:
+        state = inverter.persist_state()
+        if state is not None:
+            with _inverter_lock:
+                _inverter_cache[key] = (state, mx, mn, best)
+                while len(_inverter_cache) > INVERTER_CACHE_SIZE:
+                    _inverter_cache.popitem(last=False)
+    return inverter, mx, mn, best
+
+
+def outcome_in(
+    inverter: PresortingInverseUtilityFunction,
+    urange: tuple[float, float],
+    rng: np.random.Generator,
+    normalized: bool = True,
+) -> Outcome | None:
+    """Returns a random rational outcome with a utility in the given range (`None` if there is none).
+
+    Remarks:
+        - Equivalent to `inverter.one_in` without its fallbacks except that the outcome is drawn from `rng`
+          instead of the global `random` generator.
+    """
+    last = inverter._last_rational
+    if last < 0:
+        return None
+    lo, mn, mx = inverter._indx_of_worst_in(urange, normalized)
+    hi, _, _ = inverter._indx_of_best_in(urange, normalized)
+    lo, hi = sorted((max(0, min(lo, last)), max(0, min(hi, last))))
+    indx = int(rng.integers(lo, hi + 1))
+    tolerance = getattr(inverter, "_clamp_tolerance", 0.0)
+    if not mn - tolerance <= inverter.utils[indx] <= mx + tolerance:
+        return None
+    return inverter.outcomes[indx]
+
+
+def clear_inverter_cache() -> None:
+    """Removes all inverters cached by `cached_inverter` in this process"""
+    with _inverter_lock:
+        _inverter_cache.clear()
+
+
 class ANL2025Negotiator(SAOController):
     """
     Base class of all participant code.
@@ -67,6 +202,9 @@ class ANL2025Negotiator(SAOController):
                - `ufun`: The side ufun for the thread.
                - `center`: A boolean indicating whether this is a side negotiator for a center or is an edge negotiator.
                - `index`: The thread index for this thread.
+            - `self.rng`: A numpy random generator. Tournaments replace it with one derived from the seed of the
+                          session so agents drawing random numbers from it (instead of `random`/`numpy.random`)
+                          are reproducible.
             - `self.active_negotiators` / `self.started_negotiators` / `self.to_start_negotiators` / `self.finished_negotiators` / `self.unfinished_negotiators`
               Same as `self.negotiators` but with the corresponding subset of negotiators only.
     """
@@ -82,6 +220,7 @@ class ANL2025Negotiator(SAOController):
         **kwargs,
     ):
         super().__init__(*args, auto_kill=auto_kill, **kwargs)
+        self.rng = make_rng()
         self._n_edges = n_edges
         self._update_side_ufuns_on_end = update_side_ufuns_on_end
         self._update_side_ufuns_after_offering = update_side_ufuns_after_offering
@@ -247,7 +386,9 @@ class Random2025(ANL2025Negotiator):
         """
         nmi = self.negotiators[negotiator_id].negotiator.nmi
         os: DiscreteCartesianOutcomeSpace = nmi.outcome_space
-        return list(os.sample(1))[0]
+        return tuple(
+            _.value_at(int(self.rng.integers(_.cardinality))) for _ in os.issues
+        )
 
     def respond(
         self, negotiator_id: str, state: SAOState, source: str | None = None
@@ -260,11 +401,11 @@ class Random2025(ANL2025Negotiator):
 
         """
 
-        if random() < self.p_end:
+        if self.rng.random() < self.p_end:
             return ResponseType.END_NEGOTIATION
 
         if (
-            random() < self.p_reject
+            self.rng.random() < self.p_reject
             or float(self.ufun(state.current_offer)) < self.ufun(None)  # type: ignore
         ):
             return ResponseType.REJECT_OFFER
@@ -299,24 +440,17 @@ class TimeBased2025(ANL2025Negotiator):
         self.reject_exactly_as_reserved = reject_exactly_as_reserved
 
     def ensure_inverter(self, negotiator_id) -> InverseUFun:
-        """Ensures that utility inverter is available"""
+        """Ensures that utility inverter is available
+
+        Remarks:
+            - Inverters are obtained from `cached_inverter` which shares sorted outcomes
+              across threads and negotiators in the same process.
+        """
         if self._inverter.get(negotiator_id, None) is None:
             _, cntxt = self.negotiators[negotiator_id]
-            ufun = cntxt["ufun"]
-            inverter = PresortingInverseUtilityFunction(ufun, rational_only=True)
-            inverter.init()
-            # breakpoint()
-            self._mx, self._mn = inverter.max(), inverter.min()
-            self._mn = max(self._mn, ufun(None))
-            self._best = inverter.some(
-                (
-                    max(0.0, self._mn, ufun(None), self._mx - self._best_margin),
-                    self._mx,
-                ),
-                normalized=True,
+            inverter, self._mx, self._mn, self._best = cached_inverter(
+                cntxt["ufun"], self._best_margin
             )
-            if not self._best:
-                self._best = [inverter.best()]  # type: ignore
             self._inverter[negotiator_id] = inverter
 
         return self._inverter[negotiator_id]
@@ -354,12 +488,12 @@ class TimeBased2025(ANL2025Negotiator):
             return None
         for d in self._deltas:
             mx = min(1.0, level + d)
-            outcome = inverter.one_in((level, mx), normalized=True)
+            outcome = outcome_in(inverter, (level, mx), self.rng)
             # print(f"{self.id} found {outcome} at level {(level, mx)}")
             if outcome:
                 break
         if not outcome:
-            return choice(self._best)
+            return self._best[int(self.rng.integers(len(self._best)))]
         return outcome
 
     def respond(
@@ -0,0 +1,127 @@
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+from multiprocessing import cpu_count
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.compute as pc
+from matplotlib.figure import Figure
+
+from anl2025.traces import NO_OFFER, TRACES_FOLDER_NAME, TraceReader
+
+__all__ = ["PLOTS_FOLDER_NAME", "plot_trace", "render_plots"]
+
+PLOTS_FOLDER_NAME = "plots"
+"""Folder (inside the results directory) to save rendered plots to by default"""
+
+
+def plot_trace(trace: pd.DataFrame, title: str = "") -> Figure:
+    """Plots the trace of a negotiation thread (see `anl2025.traces.TraceReader.trace`).
+
+    Remarks:
+        - The left plot shows the utilities of the offers of each negotiator for the center and the edge over time.
+        - The right plot shows the same offers in the utility plane with the agreement (if any) marked.
+        - The figure is not attached to pyplot so plots can be rendered from any thread or process.
+    """
+    fig = Figure(figsize=(12, 5), layout="constrained")
+    left, right = fig.subplots(1, 2)
+    offers = trace[trace["offer"] != NO_OFFER]
+    for negotiator, mine in offers.groupby("negotiator", sort=True):
+        (line,) = left.plot(
+            mine["relative_time"],
+            mine["center_utility"],
+            marker="o",
+            label=f"{negotiator} (center utility)",
+        )
+        left.plot(
+            mine["relative_time"],
+            mine["edge_utility"],
+            marker="x",
+            linestyle="--",
+            color=line.get_color(),
+            label=f"{negotiator} (edge utility)",
+        )
+        right.plot(
+            mine["edge_utility"],
+            mine["center_utility"],
+            marker="o",
+            color=line.get_color(),
+            alpha=0.6,
+            label=str(negotiator),
+        )
+    agreed = offers[offers["state"] == "agreement"]
+    if len(agreed):
+        right.scatter(
+            agreed["edge_utility"].iloc[-1:],
+            agreed["center_utility"].iloc[-1:],
+            marker="*",
+            s=300,
+            color="black",
+            zorder=3,
+            label="agreement",
+        )
+    left.set(xlabel="Relative Time", ylabel="Utility")
+    right.set(xlabel="Edge Utility", ylabel="Center Utility")
+    for ax in (left, right):
+        if ax.has_data():
+            ax.legend(fontsize="small")
+    if title:
+        fig.suptitle(title)
+    return fig
+
+
+def _render(trace: pd.DataFrame, title: str, path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    plot_trace(trace, title).savefig(path)
+    return path
+
+
+def render_plots(
+    path: Path | str,
+    output: Path | str | None = None,
+    sessions: list[str] | tuple[str, ...] | None = None,
+    n_jobs: int | None = None,
+    overwrite: bool = False,
+) -> list[Path]:
+    """Renders plots of negotiation threads from stored traces.
+
+    Args:
+        path: A results directory (e.g. a tournament path with a `TRACES_FOLDER_NAME` folder), a folder
+              of trace files or a single trace file.
+        output: Folder to save plots to. Defaults to `PLOTS_FOLDER_NAME` under `path` (or next to a trace file).
+        sessions: Names (or glob patterns) of the sessions to plot. All sessions are plotted if not given.
+        n_jobs: Number of processes to use. None (and negative numbers) mean serially, 0 means use all cores.
+        overwrite: Render plots that already exist again.
+
+    Remarks:
+        - Plots are saved as `<output>/<session>/n<thread>.png`.
+
+    Returns:
+        The paths of the rendered plots.
+    """
+    path = Path(path)
+    if output is None:
+        output = (path.parent if path.is_file() else path) / PLOTS_FOLDER_NAME
+    output = Path(output)
+    if (path / TRACES_FOLDER_NAME).is_dir():
+        path = path / TRACES_FOLDER_NAME
+    reader = TraceReader(path)
+    names = [
+        _
+        for _ in reader.sessions()
+        if not sessions or any(fnmatch(_, pattern) for pattern in sessions)
+    ]
+    table = reader.table
+    tasks = []
+    for session in names:
+        df = table.filter(pc.equal(table.column("session"), session)).to_pandas()
+        for thread, trace in df.groupby("thread", sort=True):
+            target = output / session / f"n{thread}.png"
+            if overwrite or not target.is_file():
+                tasks.append((trace, f"{session}: thread {thread}", target))
+    if n_jobs is not None and n_jobs == 0:
+        n_jobs = cpu_count()
+    if n_jobs is None or n_jobs < 0 or len(tasks) < 2:
+        return [_render(*_) for _ in tasks]
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as executor:
+        return list(executor.map(_render, *zip(*tasks)))
@@ -1,17 +1,18 @@
+import threading
+from contextlib import contextmanager
 from copy import deepcopy
 from time import perf_counter
 import traceback
 from rich import print
 from typing import Any
-from random import choice
 import pandas as pd
-from attr import define, field
+from attr import define, evolve, field
 from pathlib import Path
-import matplotlib.pyplot as plt
 from negmas import ControlledNegotiator
 from negmas.outcomes import Outcome
-from negmas.sao import SAOMechanism
+from negmas.sao import SAOMechanism, SAOState
 from negmas.helpers import unique_name
+from negmas.serialization import dump
 
 from anl2025.ufun import CenterUFun, make_side_ufun
 from anl2025.negotiator import (
@@ -22,7 +23,21 @@ from anl2025.negotiator import (
     Random2025,
 )
 from anl2025.scenario import MultidealScenario, make_multideal_scenario
-from anl2025.common import SEQUENTIAL_METHOD, get_agent_class, RunParams, DEFAULT_METHOD
+from anl2025.traces import trace_writer
+from anl2025.plots import plot_trace
+from anl2025.common import (
+    SEQUENTIAL_METHOD,
+    OUTPUT_FULL,
+    OUTPUT_NONE,
+    OUTPUT_TRACE,
+    check_output_tier,
+    derive_seed,
+    get_agent_class,
+    make_rng,
+    RunParams,
+    DEFAULT_METHOD,
+    DEFAULT_OUTPUT_TIER,
+)
 
 
 __all__ = [
@@ -32,8 +47,32 @@ __all__ = [
     "RunParams",
     "AssignedScenario",
     "assign_scenario",
+    "SUMMARY_FILE_NAME",
 ]
 
+_running_scenarios: set[int] = set()
+_running_lock = threading.Lock()
+
+
+@contextmanager
+def _exclusive(scenario: MultidealScenario):
+    """Marks a scenario as used by a session (scenarios are changed while sessions run)."""
+    with _running_lock:
+        if id(scenario) in _running_scenarios:
+            raise RuntimeError(
+                f"Scenario {scenario.name} is already used by a running session. "
+                f"Sessions running at the same time need their own copies of the scenario"
+            )
+        _running_scenarios.add(id(scenario))
+    try:
+        yield
+    finally:
+        with _running_lock:
+            _running_scenarios.discard(id(scenario))
+
+
+SUMMARY_FILE_NAME = "summary.yaml"
+"""File name (inside the session output folder) of the final results of a session"""
 TRACE_COLS = (
     "time",
     "relative_time",
@@ -57,6 +96,8 @@ class SessionResults:
         center_utility: The utility received by the center.
         edge_utilities: The utilities of all edges.
         run_error: If the run failed, this will contain the exception text thrown by SAOMechanism.runall().
+        final_states: The final state of every negotiation thread (kept by `compact`).
+        thread_ids: The IDs of the center and edge negotiators in every thread (kept by `compact`).
     """
 
     mechanisms: list[SAOMechanism]
@@ -71,15 +112,35 @@ class SessionResults:
     total_time: float
     times: list[float]
     run_error: str = ""
+    final_states: list[SAOState | None] = field(factory=list)
+    thread_ids: list[tuple[str, str]] = field(factory=list)
 
     def __attrs_post_init__(self):
+        if not self.final_states:
+            self.final_states = [
+                _.state if _ is not None else None for _ in self.mechanisms
+            ]
+        if not self.thread_ids:
+            self.thread_ids = [
+                (_.nmi.annotation["center_id"], _.nmi.annotation["edge_id"])
+                for _ in self.mechanisms
+                if _ is not None
+            ]
         self.n_succeeded = len([_ for _ in self.agreements if _ is not None])
         self.n_timedout = len(
-            [_ for _ in self.mechanisms if _ is not None and _.state.timedout]
+            [_ for _ in self.final_states if _ is not None and _.timedout]
         )
         self.n_failed = len(self.agreements) - self.n_succeeded - self.n_timedout
 
-    # final_states: list[SAOState]
+    def compact(self) -> "SessionResults":
+        """Returns a copy without the mechanisms and agents (keeping final states and thread IDs)."""
+        n = len(self.mechanisms)
+        return evolve(
+            self,
+            mechanisms=[None] * n,
+            center=None,
+            edges=[None] * len(self.edges),
+        )
 
 
 @define
@@ -91,16 +152,22 @@ class AssignedScenario:
         run_params: `RunParams` controlling how the session is run
         center: The center agent
         edges: edge agents
+
+    Remarks:
+        - The scenario is not copied. A snapshot of its mutable state (see `MultidealScenario.save_state`)
+          is taken on assignment and restored before scoring so scores use the original scenario. It is
+          restored again when the session ends so a scenario can be run by many sessions one after another
+          but not by two sessions at the same time.
     """
 
     scenario: MultidealScenario
     run_params: RunParams
     center: ANL2025Negotiator
     edges: list[ANL2025Negotiator]
-    _saved_scenario: MultidealScenario = field(init=False)
+    _saved_state: dict[str, Any] = field(init=False)
 
     def __attrs_post_init__(self):
-        self._saved_scenario = deepcopy(self.scenario)
+        self._saved_state = self.scenario.save_state()
 
     def run(
         self,
@@ -109,8 +176,58 @@ class AssignedScenario:
         verbose: bool = False,
         dry: bool = False,
         normalize_scores: bool = False,
+        traces: Path | str | None = None,
+        output_tier: str | None = None,
+    ) -> SessionResults:
+        """Runs a multi-deal negotiation and gets the results
+
+        Args:
+            name: The session name (a unique name is generated if not given).
+            output: Folder to store the output of the session in (inside a folder with the session name).
+            verbose: Print progress.
+            dry: Do not really run the negotiations.
+            normalize_scores: Normalize utilities to the range of each ufun.
+            traces: Folder of the trace store to use instead of the session output folder.
+            output_tier: Overrides the output tier of the run parameters (see `RunParams.output_tier`).
+
+        Remarks:
+            - Nothing is written with the none tier. Otherwise, final results are saved to `SUMMARY_FILE_NAME`
+              in the session output folder (if an `output` is given).
+            - With the trace and full tiers, the traces of all threads are appended to the trace store of the process
+              in the `traces` folder (see `anl2025.traces.trace_writer`). By default, the session output folder is used.
+            - With the full tier, a csv log and a plot of every thread are also saved in the `log` and `plots`
+              folders of the session output folder. Otherwise, nothing is plotted while running and plots are
+              rendered from the traces on demand (see `anl2025.plots`).
+            - The scenario is restored to its state on assignment when the session ends, however it ends.
+              A scenario can only be run by one session at a time (a `RuntimeError` is raised otherwise).
+        """
+        with _exclusive(self.scenario):
+            try:
+                return self._run(
+                    name=name,
+                    output=output,
+                    verbose=verbose,
+                    dry=dry,
+                    normalize_scores=normalize_scores,
+                    traces=traces,
+                    output_tier=output_tier,
+                )
+            finally:
+                self.scenario.restore_state(self._saved_state)
+
+    def _run(
+        self,
+        name: str = "",
+        output: Path | str | None = None,
+        verbose: bool = False,
+        dry: bool = False,
+        normalize_scores: bool = False,
+        traces: Path | str | None = None,
+        output_tier: str | None = None,
     ) -> SessionResults:
-        """Runs a multi-deal negotiation and gets the results"""
+        tier = check_output_tier(
+            output_tier if output_tier else self.run_params.output_tier
+        )
         if output and isinstance(output, str):
             output = Path(output)
 
@@ -211,37 +328,27 @@ class AssignedScenario:
                 # final_states=[_.state for _ in mechanisms],
             )
 
-        base = None
-        if output:
-            base = output / name
-            (base / "log").mkdir(parents=True, exist_ok=True)
-            (base / "plots").mkdir(parents=True, exist_ok=True)
+        if not name:
+            name = unique_name("session", sep=".")
+        base = output / name if output and tier != OUTPUT_NONE else None
+        writer = None
+        if tier in (OUTPUT_TRACE, OUTPUT_FULL) and (traces or base):
+            writer = trace_writer(traces if traces else base)  # type: ignore
+        full = tier == OUTPUT_FULL and base is not None
+
+        def finish(r: SessionResults) -> SessionResults:
+            if base is not None:
+                _save_summary(base / SUMMARY_FILE_NAME, name, r)
+            return r
+
         try:
             center.init()
         except Exception as e:
             print(
                 f"Failed to initialize the center agent: {center.id} ({type(center).__name__}): {e}"
             )
-            return SessionResults(
-                mechanisms=mechanisms,
-                center=deepcopy(center),
-                center_utility=0.0,
-                edge_utilities=[0.0] * len(edges),
-                edges=deepcopy(edges),
-                agreements=[None] * len(edges),
-                total_time=0.0,
-                times=[0.0] * len(mechanisms),
-                run_error=f"Failed to initialize the center agent: {center.id} ({type(center).__name__}): {e}",
-                # final_states=[_.state for _ in mechanisms],
-            )
-        for edge in edges:
-            try:
-                edge.init()
-            except Exception as e:
-                print(
-                    f"Failed to initialize the edge agent: {edge.id} ({type(edge).__name__}): {e}"
-                )
-                return SessionResults(
+            return finish(
+                SessionResults(
                     mechanisms=mechanisms,
                     center=deepcopy(center),
                     center_utility=0.0,
@@ -250,34 +357,56 @@ class AssignedScenario:
                     agreements=[None] * len(edges),
                     total_time=0.0,
                     times=[0.0] * len(mechanisms),
-                    run_error=f"Failed to initialize the edge agent: {edge.id} ({type(edge).__name__}): {e}",
+                    run_error=f"Failed to initialize the center agent: {center.id} ({type(center).__name__}): {e}",
                     # final_states=[_.state for _ in mechanisms],
                 )
+            )
+        for edge in edges:
+            try:
+                edge.init()
+            except Exception as e:
+                print(
+                    f"Failed to initialize the edge agent: {edge.id} ({type(edge).__name__}): {e}"
+                )
+                return finish(
+                    SessionResults(
+                        mechanisms=mechanisms,
+                        center=deepcopy(center),
+                        center_utility=0.0,
+                        edge_utilities=[0.0] * len(edges),
+                        edges=deepcopy(edges),
+                        agreements=[None] * len(edges),
+                        total_time=0.0,
+                        times=[0.0] * len(mechanisms),
+                        run_error=f"Failed to initialize the edge agent: {edge.id} ({type(edge).__name__}): {e}",
+                        # final_states=[_.state for _ in mechanisms],
+                    )
+                )
 
-        def plot_result(i, m, base=base):
-            assert base is not None
+        def record_trace(i, m):
+            assert writer is not None
             try:
+                batch = writer.add(name, i, m)
+                if not full or base is None:
+                    return
                 trace = list(m.full_trace)  # type: ignore
-                # negmas >= 0.15 adds extra trace fields (e.g. text, data) so we
-                # read the column names from the trace element itself when possible
-                # instead of assuming the legacy 7-column layout.
-                columns = list(getattr(trace[0], "_fields", TRACE_COLS)) if trace else list(TRACE_COLS)
-                df = pd.DataFrame(data=trace, columns=columns)  # type: ignore
-                df.to_csv(base / "log" / f"{m.id}.csv", index_label="index")
-                m.plot(
-                    save_fig=True,
-                    path=str(base / "plots"),
-                    fig_name=f"n{i}.png",
-                    show=False,
+                # negmas >= 0.15 adds extra trace fields (e.g. text, data)
+                columns = (
+                    list(getattr(trace[0], "_fields", TRACE_COLS))
+                    if trace
+                    else list(TRACE_COLS)
+                )
+                (base / "log").mkdir(parents=True, exist_ok=True)
+                pd.DataFrame(data=trace, columns=columns).to_csv(  # type: ignore
+                    base / "log" / f"{m.id}.csv", index_label="index"
+                )
+                (base / "plots").mkdir(parents=True, exist_ok=True)
+                plot_trace(batch.to_pandas(), f"{name}: thread {i}").savefig(
+                    base / "plots" / f"n{i}.png"
                 )
-                plt.close()
             except Exception as e:
                 if verbose:
-                    print(f"Could not plot {m.id}: {e}")
-                try:
-                    plt.close()
-                except Exception:
-                    pass
+                    print(f"Could not record the trace of {m.id}: {e}")
 
         _strt = perf_counter()
         # be compatible with negmas before 0.11.4
@@ -286,34 +415,34 @@ class AssignedScenario:
                 mechanisms,
                 method=self.run_params.method,
                 keep_order=self.run_params.keep_order,
-                completion_callback=plot_result if output else None,
+                completion_callback=record_trace if writer is not None else None,
                 ignore_mechanism_exceptions=self.run_params.ignore_mechanism_exceptions,  # type: ignore
             )  # type: ignore
         except Exception as e:
             print(
                 f"Failed to run the the mechanisms: {e}\n{traceback.format_exc(limit=5)}"
             )
-            return SessionResults(
-                mechanisms=mechanisms,
-                center=center,
-                agreements=[None] * len(mechanisms),
-                center_utility=self._saved_scenario.center_ufun.reserved_value,
-                edge_utilities=[
-                    u.reserved_value for u in self._saved_scenario.edge_ufuns
-                ],
-                edges=edges,
-                total_time=perf_counter() - _strt,
-                times=[m.time for m in mechanisms],
-                run_error=f"Failed to run the the mechanisms: {e}\n{traceback.format_exc(limit=5)}",
+            self.scenario.restore_state(self._saved_state)
+            return finish(
+                SessionResults(
+                    mechanisms=mechanisms,
+                    center=center,
+                    agreements=[None] * len(mechanisms),
+                    center_utility=self.scenario.center_ufun.reserved_value,
+                    edge_utilities=[u.reserved_value for u in self.scenario.edge_ufuns],
+                    edges=edges,
+                    total_time=perf_counter() - _strt,
+                    times=[m.time for m in mechanisms],
+                    run_error=f"Failed to run the the mechanisms: {e}\n{traceback.format_exc(limit=5)}",
+                )
             )
         total_time = perf_counter() - _strt
-        if not name:
-            name = unique_name("session", sep=".")
         agreements = tuple(_.agreement for _ in mechanisms)
-        center_utility = float(self._saved_scenario.center_ufun(agreements))
+        self.scenario.restore_state(self._saved_state)
+        center_utility = float(self.scenario.center_ufun(agreements))
         edge_utilities = [
             float(edge_ufun(_)) if edge_ufun else float("nan")
-            for edge_ufun, _ in zip(self._saved_scenario.edge_ufuns, agreements)
+            for edge_ufun, _ in zip(self.scenario.edge_ufuns, agreements)
         ]
         if normalize_scores:
             _strt = perf_counter()
@@ -336,19 +465,40 @@ class AssignedScenario:
                 mn + u * (mx - mn) for u, (mn, mx) in zip(edge_utilities, edge_minmax)
             ]
 
-        return SessionResults(
-            mechanisms=mechanisms,
-            center=center,
-            agreements=list(agreements),
-            center_utility=center_utility,
-            edge_utilities=edge_utilities,
-            edges=edges,
-            total_time=total_time,
-            times=[m.time for m in mechanisms],
-            # final_states=[_.state for _ in mechanisms],
+        return finish(
+            SessionResults(
+                mechanisms=mechanisms,
+                center=center,
+                agreements=list(agreements),
+                center_utility=center_utility,
+                edge_utilities=edge_utilities,
+                edges=edges,
+                total_time=total_time,
+                times=[m.time for m in mechanisms],
+                # final_states=[_.state for _ in mechanisms],
+            )
         )
 
 
+def _save_summary(path: Path, name: str, r: SessionResults) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    dump(
+        {
+            "name": name,
+            "center_utility": r.center_utility,
+            "edge_utilities": r.edge_utilities,
+            "agreements": [list(_) if _ is not None else None for _ in r.agreements],
+            "n_succeeded": r.n_succeeded,
+            "n_timedout": r.n_timedout,
+            "n_failed": r.n_failed,
+            "total_time": r.total_time,
+            "times": r.times,
+            "run_error": r.run_error,
+        },
+        path,
+    )
+
+
 def assign_scenario(
     scenario: MultidealScenario,
     run_params: RunParams,
@@ -363,6 +513,7 @@ def assign_scenario(
     edge_params: list[dict[str, Any]] | None = None,
     verbose: bool = False,
     sample_edges: bool = False,
+    seed: int | None = None,
 ) -> AssignedScenario:
     """Assigns a multidal scenario to negotiators
 
@@ -376,6 +527,8 @@ def assign_scenario(
         verbose: Print progress
         sample_edges: If true, the `edge_types` will be used as a pool to sample from
                       instead of being assigned to edges in order
+        seed: If given, edges are sampled and the random generators of agents (`ANL2025Negotiator.rng`)
+              are seeded with seeds derived from it and the agent ID.
 
     Returns:
         An `AssignedScenario` ready to run.
@@ -383,6 +536,7 @@ def assign_scenario(
     center_ufun = scenario.center_ufun
     edge_ufuns = scenario.edge_ufuns
     nedges = len(edge_ufuns)
+    rng = make_rng(seed)
 
     if not edge_params:
         edge_params = [dict() for _ in range(nedges)]
@@ -399,11 +553,15 @@ def assign_scenario(
         )
     for i, (edge_ufun, edge_p) in enumerate(zip(edge_ufuns, edge_params)):
         if sample_edges:
-            edget = choice(agents)
+            edget = agents[int(rng.integers(len(agents)))]
         else:
             edget = agents[i % len(edge_types)]
         edge = edget(ufun=edge_ufun, id=f"edge{i}", n_edges=nedges, **edge_p)
         edges.append(edge)
+    if seed is not None:
+        for agent in [center] + edges:
+            if isinstance(agent, ANL2025Negotiator):
+                agent.rng = make_rng(derive_seed(seed, agent.id))
     assert isinstance(center.ufun, CenterUFun)
     return AssignedScenario(
         scenario=scenario,
@@ -440,11 +598,12 @@ def run_generated_session(
     share_ufuns: bool = True,
     atomic: bool = False,
     # output and logging
-    output: Path | str | None = Path.home() / "negmas" / "anl2025" / "session",
+    output: Path | str | None = None,
     name: str = "",
     dry: bool = False,
     method=DEFAULT_METHOD,
     verbose: bool = False,
+    output_tier: str = DEFAULT_OUTPUT_TIER,
 ) -> SessionResults:
     """Generates a multideal negotiation session and runs it.
 
@@ -468,10 +627,11 @@ def run_generated_session(
         keep_order: Keep the order of edges when advancing the negotiation.
         share_ufuns: If given, agents will have access to partner ufuns through `self.opponent_ufun`.
         atomic: If given, one step corresponds to one offer instead of a full round.
-        output: Folder to store the logs and results within.
+        output: Folder to store the logs and results within. Nothing is written if not given.
         name: Name of the session
         dry: IF true, nothing will be run.
         verbose: Print progress
+        output_tier: How much is written to `output` (see `RunParams.output_tier`).
 
     Returns:
         `SessionResults` giving the results of the multideal negotiation session.
@@ -498,6 +658,7 @@ def run_generated_session(
         share_ufuns=share_ufuns,
         atomic=atomic,
         method=method,
+        output_tier=output_tier,
     )
     assigned = assign_scenario(
         scenario=scenario,
@@ -528,12 +689,13 @@ def run_session(
     share_ufuns: bool = True,
     atomic: bool = False,
     # output and logging
-    output: Path | None = Path.home() / "negmas" / "anl2025" / "session",
+    output: Path | str | None = None,
     name: str = "",
     dry: bool = False,
     method=DEFAULT_METHOD,
     verbose: bool = False,
     sample_edges: bool = False,
+    output_tier: str = DEFAULT_OUTPUT_TIER,
 ) -> SessionResults:
     """Runs a multideal negotiation session and runs it.
 
@@ -551,10 +713,11 @@ def run_session(
         keep_order: Keep the order of edges when advancing the negotiation.
         share_ufuns: If given, agents will have access to partner ufuns through `self.opponent_ufun`.
         atomic: If given, one step corresponds to one offer instead of a full round.
-        output: Folder to store the logs and results within.
+        output: Folder to store the logs and results within. Nothing is written if not given.
         name: Name of the session
         dry: IF true, nothing will be run.
         verbose: Print progress
+        output_tier: How much is written to `output` (see `RunParams.output_tier`).
         sample_edges: If true, the `edge_types` will be used as a pool to sample from otherwise edges will
                       be of the types defined by edge_types in order
 
@@ -569,6 +732,7 @@ def run_session(
         share_ufuns=share_ufuns,
         atomic=atomic,
         method=method,
+        output_tier=output_tier,
     )
     # if not sample_edges:
     #     assert (
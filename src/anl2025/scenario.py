@@ -1,27 +1,50 @@
 import sys
 import copy
 from typing import Any, Optional
-from negmas.helpers import unique_name
-from negmas.preferences import UtilityFunction
+import numpy as np
+from negmas.outcomes import DiscreteCartesianOutcomeSpace, Outcome, make_issue, make_os
+from negmas.preferences import (
+    LinearAdditiveUtilityFunction,
+    TableFun,
+    UtilityFunction,
+)
 from attr import define, field
 from pathlib import Path
 from negmas.serialization import serialize, deserialize
-from negmas.preferences.generators import generate_multi_issue_ufuns
 
 from negmas.helpers.inout import load, dump
-from anl2025.ufun import CenterUFun, SideUFunAdapter
+from anl2025.ufun import (
+    CenterUFun,
+    LinearCombinationCenterUFun,
+    SideUFunAdapter,
+    is_index,
+)
+from anl2025.cache import (
+    cache_file,
+    cached_load,
+    content_hash,
+    unload_shadowed_modules,
+)
 from anl2025.common import (
     TYPES_MAP,
     CENTER_FILE_NAME,
     EDGES_FOLDER_NAME,
     SIDES_FOLDER_NAME,
     TYPE_IDENTIFIER,
+    make_rng,
+    random_name,
     sample_between,
     get_ufun_class,
 )
 
 
-__all__ = ["MultidealScenario", "make_multideal_scenario"]
+__all__ = [
+    "MultidealScenario",
+    "make_multideal_scenario",
+    "make_opposing_ufuns",
+    "make_random_linear_ufun",
+    "make_random_os",
+]
 
 EPSILON = 1e-6
 TRACE_COLS = (
@@ -60,11 +83,52 @@ class MultidealScenario:
 
     def __attrs_post_init__(self):
         if self.public_graph:
+            # all edges share a single (read-only) copy of the outcome spaces
+            outcome_spaces = tuple(
+                copy.deepcopy(_) for _ in self.center_ufun.outcome_spaces
+            )
             for e in self.edge_ufuns:
                 e.n_edges = self.center_ufun.n_edges  # type: ignore
-                e.oucome_spaces = [  # type: ignore
-                    copy.deepcopy(_) for _ in self.center_ufun.outcome_spaces
-                ]
+                e.outcome_spaces = outcome_spaces  # type: ignore
+
+    def save_state(self) -> dict[str, Any]:
+        """Returns a snapshot of the state negotiators can change while running the scenario.
+
+        Remarks:
+            - Only the center state (see `CenterUFun.save_state`) and the reserved values of edge ufuns
+              are kept so snapshots are cheap compared with copying the scenario.
+        """
+        return {
+            "center": self.center_ufun.save_state(),
+            "edges": [_._reserved_value for _ in self.edge_ufuns],
+        }
+
+    def restore_state(self, state: dict[str, Any]) -> None:
+        """Restores a snapshot returned by `save_state`."""
+        self.center_ufun.restore_state(state["center"])
+        for u, r in zip(self.edge_ufuns, state["edges"]):
+            u._reserved_value = r
+
+    def encode_agreements(
+        self, agreements: tuple[Outcome | None, ...] | int | None
+    ) -> int:
+        """Converts the agreements of all threads to a single integer (see `OutcomeEncoding`)."""
+        return self.center_ufun.encode_outcome(agreements)
+
+    def decode_agreements(self, index: int) -> tuple[Outcome | None, ...]:
+        """Converts an integer (see `encode_agreements`) to the agreements of all threads."""
+        return self.center_ufun._combiner.separated_outcomes(index)  # type: ignore
+
+    def utilities(
+        self, agreements: tuple[Outcome | None, ...] | int
+    ) -> tuple[float, tuple[float, ...]]:
+        """Returns the utility of the center and every edge for the given agreements (or their index)."""
+        if is_index(agreements):
+            agreements = self.decode_agreements(agreements)  # type: ignore
+        return float(self.center_ufun(agreements)), tuple(
+            float(u(_))
+            for u, _ in zip(self.edge_ufuns, agreements)  # type: ignore
+        )
 
     def save(
         self,
@@ -92,6 +156,8 @@ class MultidealScenario:
         public_graph: bool = True,
         python_class_identifier: str = TYPE_IDENTIFIER,
         type_marker=f"{TYPE_IDENTIFIER}:",
+        use_cache: bool = False,
+        cache_path: Path | str | None = None,
     ) -> Optional["MultidealScenario"]:
         """
         Loads a multi-deal scenario from the given folder.
@@ -104,12 +170,51 @@ class MultidealScenario:
                                 negotiation thread.
             python_class_identifier: the key in the yaml to define a type.
             type_marker: A marker at the beginning of a string to define a type (for future proofing).
+            use_cache: If given, the loaded scenario is compiled (pickled) into a cache file and later loads
+                       use the compiled version as long as no file in the folder (or code it uses) changes.
+            cache_path: The folder to keep compiled scenarios in. By default, the cache file is a hidden
+                        file next to the scenario folder (see `anl2025.cache.cache_file`).
         """
         folder = Path(folder)
         folder = folder.resolve()
         center_file = folder / CENTER_FILE_NAME
         if not center_file.is_file():
             return None
+        params = {
+            "folder": folder,
+            "name": name,
+            "public_graph": public_graph,
+            "python_class_identifier": python_class_identifier,
+            "type_marker": type_marker,
+        }
+        if not use_cache:
+            return cls._from_folder(**params)  # type: ignore
+        key = content_hash(
+            [folder],
+            str(folder),
+            cls.__name__,
+            name,
+            public_graph,
+            python_class_identifier,
+            type_marker,
+        )
+        return cached_load(
+            key,
+            lambda: cls._from_folder(**params),  # type: ignore
+            cache_file(folder, cache_path),
+            sys_paths=[folder],
+        )
+
+    @classmethod
+    def _from_folder(
+        cls,
+        folder: Path,
+        name: str | None,
+        public_graph: bool,
+        python_class_identifier: str,
+        type_marker: str,
+    ) -> Optional["MultidealScenario"]:
+        center_file = folder / CENTER_FILE_NAME
         code_files = dict()
         for f in folder.glob("**/*.py"):
             path = str(f.relative_to(folder))
@@ -117,12 +222,8 @@ class MultidealScenario:
                 code_files[path] = file.read()
         added_paths = []
         if code_files:
-            for code_file in code_files.keys():
-                module = str(Path(code_file).parent)
-                try:
-                    del module
-                except Exception:
-                    pass
+            # other scenarios may have loaded code files with the same names
+            unload_shadowed_modules(folder)
             _added_path = str(folder.resolve())
             added_paths.append(_added_path)
             sys.path.insert(0, _added_path)
@@ -152,21 +253,17 @@ class MultidealScenario:
                 u.outcome_space = os
                 if isinstance(u, SideUFunAdapter):
                     u._base_ufun.outcome_space = os
-        if public_graph:
-            for u in edge_ufuns:
-                u.n_edges = center_ufun.n_edges  # type: ignore
-                u.outcome_spaces = tuple(  # type: ignore
-                    copy.deepcopy(_) for _ in center_ufun.outcome_spaces
-                )
         side_ufuns = load_ufuns(folder / SIDES_FOLDER_NAME)
         for p in added_paths:
             sys.path.remove(p)
 
+        # edges get n_edges and outcome_spaces in __attrs_post_init__ if public_graph
         return cls(
             center_ufun=center_ufun,
             edge_ufuns=tuple(edge_ufuns),
             side_ufuns=side_ufuns,
             name=folder.name if name is None else name,
+            public_graph=public_graph,
             code_files=code_files,
         )
 
@@ -245,6 +342,101 @@ class MultidealScenario:
         )  # type: ignore
 
 
+def make_random_os(
+    nissues: int,
+    nvalues: int | tuple[int, int],
+    rng: np.random.Generator | int | None = None,
+    name: str | None = None,
+) -> DiscreteCartesianOutcomeSpace:
+    """Generates an outcome space with `nissues` issues named i1, i2, ... with values v1, v2, ...
+
+    Args:
+        nissues: Number of issues.
+        nvalues: Number of values of every issue or a min-max range to sample it from (for every issue).
+        rng: Generator (or seed) used to sample issue sizes.
+        name: Name of the outcome space.
+    """
+    rng = make_rng(rng)
+    sizes = [
+        int(rng.integers(nvalues[0], nvalues[-1] + 1))
+        if isinstance(nvalues, tuple)
+        else nvalues
+        for _ in range(nissues)
+    ]
+    os = make_os(
+        [
+            make_issue([f"v{k + 1}" for k in range(n)], name=f"i{i + 1}")
+            for i, n in enumerate(sizes)
+        ],
+        name=name,
+    )
+    assert isinstance(os, DiscreteCartesianOutcomeSpace)
+    return os
+
+
+def make_opposing_ufuns(
+    os: DiscreteCartesianOutcomeSpace,
+    rng: np.random.Generator | int | None = None,
+    names: tuple[str | None, str | None] = (None, None),
+    reserved_values: tuple[float, float] = (0.0, 0.0),
+) -> tuple[LinearAdditiveUtilityFunction, LinearAdditiveUtilityFunction]:
+    """Generates a pair of linear additive ufuns with opposing interests over the outcome space.
+
+    Remarks:
+        - The values of each issue lie on a random convex or concave frontier so that the better
+          a value is for one ufun, the worse it is for the other.
+        - Both ufuns use the same (random) issue weights.
+    """
+    rng = make_rng(rng)
+    values: tuple[list[TableFun], list[TableFun]] = ([], [])
+    for issue in os.issues:
+        # a random point on the frontier x^p + y^p = 1 for each value of the issue
+        p = float(np.exp(rng.uniform(-1.0, 1.0)))
+        x = rng.random(int(issue.cardinality))
+        y = (1.0 - x**p) ** (1.0 / p)
+        for v, vals in zip((x, y), values):
+            mx = v.max()
+            v = v / mx if mx > 0 else np.ones_like(v)
+            vals.append(TableFun(dict(zip(issue.all, v.tolist()))))
+    weights = rng.dirichlet(np.ones(len(os.issues))).tolist()
+    return tuple(  # type: ignore
+        LinearAdditiveUtilityFunction(
+            values=vals,
+            weights=weights,
+            outcome_space=os,
+            name=name,
+            reserved_value=r,
+        )
+        for vals, name, r in zip(values, names, reserved_values)
+    )
+
+
+def make_random_linear_ufun(
+    os: DiscreteCartesianOutcomeSpace,
+    rng: np.random.Generator | int | None = None,
+    reserved_value: tuple[float, float] | float = (0.0, 1.0),
+    name: str | None = None,
+) -> LinearAdditiveUtilityFunction:
+    """Generates a linear additive ufun with random (normalized) weights and values over the outcome space."""
+    rng = make_rng(rng)
+    weights = rng.dirichlet(np.ones(len(os.issues))).tolist()
+    values = []
+    for issue in os.issues:
+        v = rng.random(int(issue.cardinality))
+        mx = v.max()
+        v = v / mx if mx > 0 else np.ones_like(v)
+        values.append(TableFun(dict(zip(issue.all, v.tolist()))))
+    if isinstance(reserved_value, tuple):
+        reserved_value = sample_between(*reserved_value, rng=rng)
+    return LinearAdditiveUtilityFunction(
+        values=values,
+        weights=weights,
+        outcome_space=os,
+        name=name,
+        reserved_value=reserved_value,
+    )
+
+
 def make_multideal_scenario(
     nedges: int = 5,
     nissues: int = 3,
@@ -258,24 +450,33 @@ def make_multideal_scenario(
     edge_reserved_value_min: float = 0.0,
     edge_reserved_value_max: float = 0.3,
     name: str | None = None,
+    seed: int | np.random.Generator | None = None,
 ) -> MultidealScenario:
+    """Generates a random multideal scenario (reproducible if a `seed` or a generator is given)"""
+    rng = make_rng(seed)
     ufuns = [
-        generate_multi_issue_ufuns(
-            nissues, nvalues, os_name=unique_name("s", add_time=False, sep="")
+        make_opposing_ufuns(
+            make_random_os(nissues, nvalues, rng, name=random_name("s", rng, sep="")),
+            rng,
+            names=("u1", "u2"),
         )
         for _ in range(nedges)
     ]
     edge_ufuns = [_[0] for _ in ufuns]
     for u in edge_ufuns:
         u.reserved_value = sample_between(
-            edge_reserved_value_min, edge_reserved_value_max
+            edge_reserved_value_min, edge_reserved_value_max, rng=rng
         )
     # side ufuns are utilities of the center on individual threads (may or may not be used, see next comment)
     side_ufuns = tuple(_[1] for _ in ufuns)
     # create center ufun using side-ufuns if possible and without them otherwise.
-    center_r = sample_between(center_reserved_value_min, center_reserved_value_max)
+    center_r = sample_between(
+        center_reserved_value_min, center_reserved_value_max, rng=rng
+    )
     utype = get_ufun_class(center_ufun_type)
-    center_ufun_params = center_ufun_params if center_ufun_params else dict()
+    center_ufun_params = center_ufun_params if center_ufun_params else {}
+    if issubclass(utype, LinearCombinationCenterUFun):
+        center_ufun_params = {"rng": rng, **center_ufun_params}
     try:
         center_ufun = utype(
             side_ufuns=side_ufuns,
@@ -300,7 +501,7 @@ def make_multideal_scenario(
             )
 
     return MultidealScenario(
-        name=name if name else unique_name("random", add_time=False, sep="_"),
+        name=name if name else random_name("random", rng),
         center_ufun=center_ufun,
         side_ufuns=side_ufuns,
         edge_ufuns=tuple(edge_ufuns),
@@ -1,19 +1,22 @@
 __all__ = ["make_dinners_scenario"]
 
 import itertools
-import random
-from typing import Iterable
+from collections.abc import Iterable, Sequence
 import numpy as np
-from negmas.helpers import unique_name
-from anl2025.scenario import MultidealScenario
-from anl2025.ufun import LambdaCenterUFun
-from negmas import LinearUtilityAggregationFunction, make_issue, make_os
+from anl2025.common import make_rng, random_name, sample_between
+from anl2025.scenario import MultidealScenario, make_random_linear_ufun
+from anl2025.ufun import CompiledEvaluator, LambdaCenterUFun
+from negmas import Outcome, make_issue, make_os
 
 __all__ = ["make_dinners_scenario"]
 
 
 class DinnersEvaluator:
-    """Evaluates the center utility value of a set of agreements/disagreements"""
+    """Evaluates the center utility value of a set of agreements/disagreements
+
+    Remarks:
+        - If no `values` are given, they are drawn from `rng` (a generator or a seed).
+    """
 
     def __init__(
         self,
@@ -22,6 +25,7 @@ class DinnersEvaluator:
         reserved_value=0.0,
         values: dict[tuple[int, ...], float] | None = None,
         days: list | None = None,
+        rng: np.random.Generator | int | None = None,
     ):
         assert n_days is not None or days is not None
         if n_days is not None and days is not None:
@@ -35,7 +39,7 @@ class DinnersEvaluator:
             # days = [self.days for _ in range(n_friends)]
             days = [[0, 1]] * n_days
             all_days = list(itertools.product(*days))
-            v = np.random.rand(len(all_days))
+            v = make_rng(rng).random(len(all_days))
             mn, mx = np.min(v), np.max(v)
             if np.all(np.abs(mx - mn)) > 1e-6:
                 v -= mn
@@ -49,17 +53,37 @@ class DinnersEvaluator:
         self.n_days = len(self.days)
         self.values = values
 
+    def _day_indices(self) -> dict:
+        # created lazily so that evaluators pickled before it existed keep working
+        day_index = self.__dict__.get("_day_index", None)
+        if day_index is None:
+            day_index = self._day_index = {day: i for i, day in enumerate(self.days)}
+        return day_index
+
     def __call__(self, agreements):
         if not agreements:
             return self.reserved_value
-        outings = dict(zip(self.days, itertools.repeat(0)))
+        day_index = self._day_indices()
+        outings = [0] * self.n_days
         for agreement in agreements:
             if agreement is None:
                 continue
             # day is a tuple of one value which is the day selected
-            outings[agreement[0]] += 1
-        x = tuple(outings[day] for day in self.days)
-        return self.values.get(x, self.reserved_value)
+            outings[day_index[agreement[0]]] += 1
+        return self.values.get(tuple(outings), self.reserved_value)
+
+    def compile(
+        self, thread_outcomes: Sequence[Sequence[Outcome]]
+    ) -> CompiledEvaluator:
+        """Compiles the evaluator for the given outcomes of each thread (see `CompiledEvaluator`)."""
+        day_index = self._day_indices()
+        counts = []
+        for outcomes in thread_outcomes:
+            c = np.zeros((len(outcomes) + 1, self.n_days), dtype=np.int64)
+            for i, outcome in enumerate(outcomes):
+                c[i + 1, day_index[outcome[0]]] = 1
+            counts.append(c)
+        return CompiledEvaluator(counts, self.values, self.reserved_value)
 
 
 def make_dinners_scenario(
@@ -71,6 +95,7 @@ def make_dinners_scenario(
     values: dict[tuple[int, ...], float] | None = None,
     public_graph: bool = True,
     name: str | None = None,
+    seed: int | np.random.Generator | None = None,
 ) -> MultidealScenario:
     """Creates a variation of the Dinners multideal scenario
 
@@ -83,17 +108,19 @@ def make_dinners_scenario(
         values: A mapping from the number of dinners per day (a tuple of n_days integers) to utility value of the center
         public_graph: Should edges know n_edges and outcome_spaces?
         name: The name of the scenario. If `None`, it will start with "dinners".
+        seed: A seed or a generator for the random parts of the scenario (values, reserved values, edge ufuns).
 
     Returns:
         An initialized `MultidealScenario`.
     """
+    rng = make_rng(seed)
     if n_days is None:
         n_days = n_friends
     if not friend_names:
         friend_names = tuple(f"Friend{i + 1}" for i in range(n_friends))
-    assert (
-        len(friend_names) == n_friends
-    ), f"You passed {len(friend_names)} friend names but {n_friends=}"
+    assert len(friend_names) == n_friends, (
+        f"You passed {len(friend_names)} friend names but {n_friends=}"
+    )
     outcome_spaces = [
         make_os([make_issue(n_days, name="Day")], name=f"{name}Day")
         for name in friend_names
@@ -101,15 +128,13 @@ def make_dinners_scenario(
     if not isinstance(center_reserved_value, Iterable):
         r = float(center_reserved_value)
     else:
-        r = center_reserved_value[0] + random.random() * (
-            center_reserved_value[-1] - center_reserved_value[0]
+        r = sample_between(
+            center_reserved_value[0], center_reserved_value[-1], eps=0.0, rng=rng
         )
     return MultidealScenario(
-        name=name if name else unique_name("dinners", add_time=False, sep="_"),
+        name=name if name else random_name("dinners", rng),
         edge_ufuns=tuple(
-            LinearUtilityAggregationFunction.random(
-                os, reserved_value=edge_reserved_values, normalized=True
-            )
+            make_random_linear_ufun(os, rng, reserved_value=edge_reserved_values)  # type: ignore
             for os in outcome_spaces
         ),
         center_ufun=LambdaCenterUFun(
@@ -119,6 +144,7 @@ def make_dinners_scenario(
                 n_days=n_days,
                 n_friends=n_friends,
                 values=values,
+                rng=rng,
             ),
             reserved_value=r,
         ),
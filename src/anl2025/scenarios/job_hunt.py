@@ -1,8 +1,8 @@
+import numpy as np
 from negmas.outcomes import make_os, make_issue, DiscreteCartesianOutcomeSpace
-from negmas.helpers import unique_name
 from anl2025.ufun import MaxCenterUFun
-from anl2025.scenario import MultidealScenario
-from negmas.preferences.generators import generate_ufuns_for
+from anl2025.common import make_rng, random_name
+from anl2025.scenario import MultidealScenario, make_opposing_ufuns
 
 __all__ = ["make_job_hunt_scenario"]
 
@@ -15,6 +15,7 @@ def make_job_hunt_scenario(
     employer_names: list[str] | None = None,
     employee_name: str = "Employee",
     name: str | None = None,
+    seed: int | np.random.Generator | None = None,
 ) -> MultidealScenario:
     """Creates a job hunt scenario with multiple employers and a single employee.
 
@@ -26,10 +27,12 @@ def make_job_hunt_scenario(
         employer_names: Employer names. If not given, we will use employer01, employer02, etc.
         employee_name: Employee name (the center of the scenario)
         name: Name of the scenario. If not given, it will be generated automatically and will start with "job-hunt".
+        seed: A seed or a generator used to generate the ufuns.
 
     Returns:
         A MultidealScenario instance representing the job hunt scenario.
     """
+    rng = make_rng(seed)
     if employer_names is None:
         employer_names = [f"employer{_ + 1:02}" for _ in range(n_employers)]
     os = make_os(
@@ -38,7 +41,7 @@ def make_job_hunt_scenario(
     )
     assert isinstance(os, DiscreteCartesianOutcomeSpace)
     ufun_pairs = [
-        generate_ufuns_for(os, ufun_names=(f"with_{ename}", f"{ename}"))
+        make_opposing_ufuns(os, rng, names=(f"with_{ename}", f"{ename}"))
         for ename in employer_names
     ]
     side_ufuns = tuple(_[0] for _ in ufun_pairs)
@@ -56,5 +59,5 @@ def make_job_hunt_scenario(
         edge_ufuns,
         side_ufuns=side_ufuns,
         public_graph=public_graph,
-        name=name if name else unique_name("job-hunt", add_time=False, sep="_"),
+        name=name if name else random_name("job-hunt", rng),
     )
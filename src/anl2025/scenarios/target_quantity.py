@@ -1,16 +1,16 @@
-import random
 from itertools import product
-from numpy import argmin
-from typing import Iterable
-from negmas import LinearAdditiveUtilityFunction, TableFun
-from negmas.helpers import unique_name
+import numpy as np
+from numpy import argmin, asarray
+from collections.abc import Iterable, Sequence
+from negmas import LinearAdditiveUtilityFunction, Outcome, TableFun
 from negmas.outcomes import (
     make_os,
     make_issue,
     DiscreteCartesianOutcomeSpace,
     ContiguousIssue,
 )
-from anl2025.ufun import LambdaCenterUFun
+from anl2025.ufun import CompiledEvaluator, LambdaCenterUFun
+from anl2025.common import make_rng, random_name
 from anl2025.scenario import MultidealScenario
 
 
@@ -20,15 +20,15 @@ FloatRange = tuple[float, float] | float
 IntRange = tuple[int, int] | list[int] | int
 
 
-def float_in(x: FloatRange):
+def float_in(x: FloatRange, rng: np.random.Generator | None = None):
     if isinstance(x, Iterable):
-        return x[0] + (x[1] - x[0]) * random.random()
+        return x[0] + (x[1] - x[0]) * float(make_rng(rng).random())
     return x
 
 
-def int_in(x: IntRange):
+def int_in(x: IntRange, rng: np.random.Generator | None = None):
     if isinstance(x, Iterable):
-        return random.randint(min(x), max(x))
+        return int(make_rng(rng).integers(min(x), max(x) + 1))
     return x
 
 
@@ -42,18 +42,29 @@ class TargetEvaluator:
     def __call__(self, agreements):
         if not agreements:
             return self.reserved_value
-
-        # outings = dict(zip(self.days, itertools.repeat(0)))
-        quantity_sum = 0
-        for agreement in agreements:
-            if agreement is None:
-                continue
-            quantity_sum += int(agreement[0])
+        quantity_sum = sum(int(_[0]) for _ in agreements if _ is not None)
         return float(self.values.get(quantity_sum, self.reserved_value))
 
+    def compile(
+        self, thread_outcomes: Sequence[Sequence[Outcome]]
+    ) -> CompiledEvaluator:
+        """Compiles the evaluator for the given outcomes of each thread (see `CompiledEvaluator`)."""
+        return CompiledEvaluator(
+            [
+                asarray([0] + [int(_[0]) for _ in outcomes])
+                for outcomes in thread_outcomes
+            ],
+            {(k,): v for k, v in self.values.items()},
+            self.reserved_value,
+        )
+
 
 def make_values(
-    qs: list[int], target: int, shortfall: FloatRange, excess: FloatRange
+    qs: list[int],
+    target: int,
+    shortfall: FloatRange,
+    excess: FloatRange,
+    rng: np.random.Generator | None = None,
 ) -> dict[int, float]:
     if target not in qs:
         dists = [abs(_ - target) for _ in qs]
@@ -67,9 +78,9 @@ def make_values(
     values = [0.0] * len(qs)
     values[target] = 1.0
     for i in range(target - 1, -1, -1):
-        values[i] = max(0.0, values[i + 1] - float_in(shortfall))
+        values[i] = max(0.0, values[i + 1] - float_in(shortfall, rng))
     for i in range(target + 1, len(values)):
-        values[i] = max(0.0, values[i - 1] - float_in(excess))
+        values[i] = max(0.0, values[i - 1] - float_in(excess, rng))
     return dict(zip(qs, values))
 
 
@@ -87,6 +98,7 @@ def make_target_quantity_scenario(
     supplier_shortfall_penalty: FloatRange | None = (0.3, 0.9),
     supplier_excess_penalty: FloatRange | None = (0.3, 0.9),
     name: str | None = None,
+    seed: int | np.random.Generator | None = None,
 ) -> MultidealScenario:
     """Creates a target-quantity type scenario
 
@@ -104,11 +116,13 @@ def make_target_quantity_scenario(
         supplier_shortfall_penalty: suppliers' penalty for buying an item less than their target. Can be a range to sample form it
         supplier_excess_penalty: suppliers' penalty for buying an item more than their target. Can be a range to sample form it
         name: Name of the scenario. If not given, it will be generated automatically and will start wit "target-quantity"
+        seed: A seed or a generator used for all sampled values.
 
     Remarks:
         - Supplier's target value is sampled uniformly from the range of values
     """
-    n_suppliers = int_in(n_suppliers)
+    rng = make_rng(seed)
+    n_suppliers = int_in(n_suppliers, rng)
     if supplier_shortfall_penalty is None:
         supplier_shortfall_penalty = shortfall_penalty
     if supplier_excess_penalty is None:
@@ -129,23 +143,28 @@ def make_target_quantity_scenario(
         outcome_space=os,
         evaluator=TargetEvaluator(
             values=make_values(
-                totals, int_in(target_quantity), shortfall_penalty, excess_penalty
+                totals,
+                int_in(target_quantity, rng),
+                shortfall_penalty,
+                excess_penalty,
+                rng,
             )
         ),
         name=collector_name,
-        reserved_value=float_in(collector_reserved_value),
+        reserved_value=float_in(collector_reserved_value, rng),
     )
     edge_ufuns = tuple(
         LinearAdditiveUtilityFunction(
             outcome_space=os,
-            reserved_value=float_in(supplier_reserved_values),
+            reserved_value=float_in(supplier_reserved_values, rng),
             values=(
                 TableFun(
                     make_values(
                         quantities,
-                        int_in((os.issues[0].min_value, os.issues[0].max_value)),
-                        float_in(supplier_shortfall_penalty),
-                        float_in(supplier_excess_penalty),
+                        int_in((os.issues[0].min_value, os.issues[0].max_value), rng),
+                        float_in(supplier_shortfall_penalty, rng),
+                        float_in(supplier_excess_penalty, rng),
+                        rng,
                     )
                 ),
             ),
@@ -159,5 +178,5 @@ def make_target_quantity_scenario(
         center_ufun,
         edge_ufuns,
         public_graph=public_graph,
-        name=name if name else unique_name("target-quantity", add_time=False, sep="_"),
+        name=name if name else random_name("target-quantity", rng),
     )
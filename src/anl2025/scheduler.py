@@ -0,0 +1,354 @@
+import heapq
+import math
+from collections import defaultdict
+from collections.abc import Callable, Hashable, Iterator
+from itertools import count
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Generic, TypeVar
+
+import numpy as np
+from negmas.helpers.inout import load
+from negmas.serialization import dump
+
+__all__ = [
+    "CHUNK_SECONDS",
+    "EXTRAPOLATION_FACTOR",
+    "FAILURES_TO_SKIP",
+    "LOOKAHEAD",
+    "MAX_CHUNK_SIZE",
+    "SKIP_FACTOR",
+    "CostModel",
+    "CostProfile",
+    "JobScheduler",
+    "WorkerUtilization",
+]
+
+T = TypeVar("T")
+
+LOOKAHEAD = 256
+"""Number of generated jobs considered when choosing what to submit next"""
+CHUNK_SECONDS = 0.5
+"""Target estimated duration of a chunk of short jobs submitted together"""
+MAX_CHUNK_SIZE = 64
+"""Maximum number of jobs in a chunk"""
+EXTRAPOLATION_FACTOR = 10.0
+"""Sessions with outcome-spaces this much larger than any observed for their agent are deferred"""
+SKIP_FACTOR = 2.0
+"""Sessions predicted to need this multiple of a budget are skipped"""
+FAILURES_TO_SKIP = 3
+"""Number of failed sessions of an agent (budget overruns or dead workers) before larger sessions of it are skipped"""
+
+
+class CostModel:
+    """
+    Estimates the duration of jobs from a static cost and observed timings.
+
+    Remarks:
+        - The static cost is any positive number that grows with the expected duration
+          (e.g. the cardinality of the center outcome-space).
+        - Jobs of a group (e.g. a scenario with a given center type) are estimated by the mean
+          observed duration of the group. Jobs of other groups are estimated from their cost
+          using the observed seconds per unit of cost.
+        - Before any observation, `estimate` returns `None` and only costs can be compared.
+    """
+
+    def __init__(self):
+        self._group_time: dict[Hashable, float] = defaultdict(float)
+        self._group_count: dict[Hashable, int] = defaultdict(int)
+        self._total_time = 0.0
+        self._total_cost = 0.0
+
+    def observe(self, group: Hashable, cost: float, duration: float) -> None:
+        """Records the duration of a completed job."""
+        self._group_time[group] += duration
+        self._group_count[group] += 1
+        if math.isfinite(cost):
+            self._total_time += duration
+            self._total_cost += cost
+
+    def estimate(self, group: Hashable, cost: float) -> float | None:
+        """Returns the estimated duration (in seconds) of a job or `None` if nothing is observed yet."""
+        n = self._group_count.get(group, 0)
+        if n:
+            return self._group_time[group] / n
+        if self._total_cost <= 0:
+            return None
+        return cost * self._total_time / self._total_cost
+
+    def priority(self, group: Hashable, cost: float) -> float:
+        """Larger priorities are submitted first."""
+        estimate = self.estimate(group, cost)
+        return cost if estimate is None else estimate
+
+
+class CostProfile:
+    """
+    Learns the CPU time and memory used by agents (in the center) as a function of outcome-space cardinality.
+
+    Args:
+        cpu_limit: The CPU time budget of a session in seconds (see `RunParams.session_cpu_limit`).
+        memory_limit: The memory budget of a session in MB (see `RunParams.session_memory_limit`).
+        failures_to_skip: Number of failed sessions of an agent with outcome-spaces up to a given size
+                          before sessions of the agent with outcome-spaces at least as large are skipped.
+        use_saved_failures: Skip sessions because of failures loaded from a saved profile (see `update`).
+                            Otherwise, only failures observed by this profile are used.
+
+    Remarks:
+        - Usage is modeled as a power law of the cardinality fitted to the mean usage at every observed cardinality.
+        - Sessions predicted to need more than `SKIP_FACTOR` times a budget are skipped. Without budgets,
+          nothing is skipped.
+        - The profile can be saved and loaded so that later tournaments start with what was learned. Saved
+          failures are kept but only skip sessions if `use_saved_failures` is given.
+    """
+
+    def __init__(
+        self,
+        cpu_limit: float | None = None,
+        memory_limit: float | None = None,
+        failures_to_skip: int = FAILURES_TO_SKIP,
+        use_saved_failures: bool = False,
+    ):
+        self.cpu_limit = cpu_limit
+        self.memory_limit = memory_limit
+        self.failures_to_skip = max(1, failures_to_skip)
+        self.use_saved_failures = use_saved_failures
+        # agent -> cardinality -> [count, total cpu seconds, total memory MB]
+        self._usage: dict[str, dict[float, list[float]]] = defaultdict(dict)
+        # agent -> cardinalities of sessions that failed (observed here and loaded)
+        self._failures: dict[str, list[float]] = defaultdict(list)
+        self._saved_failures: dict[str, list[float]] = defaultdict(list)
+
+    def observe(
+        self, agent: str, cardinality: float, cpu: float, memory: float
+    ) -> None:
+        """Records the usage of a completed session with the given agent in the center."""
+        if not math.isfinite(cardinality):
+            return
+        usage = self._usage[agent].setdefault(cardinality, [0, 0.0, 0.0])
+        usage[0] += 1
+        usage[1] += cpu
+        usage[2] += max(0.0, memory)
+
+    def observe_failure(self, agent: str, cardinality: float) -> None:
+        """Records that a session with the given agent in the center exceeded its budget (or killed its worker)."""
+        if not math.isfinite(cardinality):
+            return
+        self._failures[agent].append(cardinality)
+
+    def exceeded(self, agent: str) -> float:
+        """The smallest cardinality from which sessions of the agent are skipped because of failures (`inf` if none)."""
+        failures = list(self._failures.get(agent, []))
+        if self.use_saved_failures:
+            failures += self._saved_failures.get(agent, [])
+        if len(failures) < self.failures_to_skip:
+            return math.inf
+        # the smallest cardinality with enough failures at or below it
+        return sorted(failures)[self.failures_to_skip - 1]
+
+    def _fit(self, agent: str, cardinality: float, column: int) -> float | None:
+        usage = self._usage.get(agent, None)
+        if not usage:
+            return None
+        x = np.asarray(list(usage.keys()), dtype=float)
+        y = np.asarray([_[column] / _[0] for _ in usage.values()], dtype=float)
+        valid = (x > 0) & (y > 0)
+        if not valid.any():
+            return 0.0
+        x, y = x[valid], y[valid]
+        if len(x) < 2:
+            # a single point: assume usage grows linearly
+            return float(y[0] * cardinality / x[0])
+        slope, intercept = np.polyfit(np.log(x), np.log(y), 1)
+        return float(np.exp(intercept + max(slope, 0.0) * np.log(cardinality)))
+
+    def predict(
+        self, agent: str, cardinality: float
+    ) -> tuple[float | None, float | None]:
+        """Returns the predicted CPU time (seconds) and memory (MB) of a session (`None` if nothing is known)."""
+        if not math.isfinite(cardinality) or cardinality <= 0:
+            return None, None
+        return self._fit(agent, cardinality, 1), self._fit(agent, cardinality, 2)
+
+    def check(self, agent: str, cardinality: float) -> str | None:
+        """Returns the reason to skip a session with the given agent in the center (`None` to run it)."""
+        if not math.isfinite(cardinality):
+            return None
+        exceeded = self.exceeded(agent)
+        if cardinality >= exceeded:
+            return f"Skipped: {agent} failed {self.failures_to_skip} times with center outcome-spaces up to size {exceeded:g} (this one has {cardinality:g})"
+        cpu, memory = self.predict(agent, cardinality)
+        for name, predicted, limit, unit in (
+            ("CPU time", cpu, self.cpu_limit, "s"),
+            ("memory", memory, self.memory_limit, "MB"),
+        ):
+            if (
+                limit is not None
+                and predicted is not None
+                and predicted > SKIP_FACTOR * limit
+            ):
+                return f"Skipped: {agent} is predicted to need {predicted:.3g}{unit} of {name} (budget {limit}{unit}) for a center outcome-space of size {cardinality:g}"
+        return None
+
+    def is_uncertain(self, agent: str, cardinality: float) -> bool:
+        """Whether a session is much larger than any observed for the agent (see `EXTRAPOLATION_FACTOR`)."""
+        usage = self._usage.get(agent, None)
+        if not usage or not math.isfinite(cardinality):
+            return False
+        return cardinality > EXTRAPOLATION_FACTOR * max(usage.keys())
+
+    def to_dict(self) -> dict[str, Any]:
+        failures = defaultdict(list)
+        for d in (self._saved_failures, self._failures):
+            for agent, cardinalities in d.items():
+                failures[agent] += cardinalities
+        return {
+            "usage": {
+                agent: [[c, *u] for c, u in sorted(usage.items())]
+                for agent, usage in self._usage.items()
+            },
+            "failures": {agent: sorted(c) for agent, c in failures.items() if c},
+        }
+
+    def update(self, d: dict[str, Any]) -> None:
+        """Adds the usage and failures stored in a dict (see `to_dict`).
+
+        Remarks:
+            - Failures are added as saved failures (see `use_saved_failures`).
+        """
+        for agent, rows in d.get("usage", {}).items():
+            for c, n, cpu, memory in rows:
+                usage = self._usage[agent].setdefault(float(c), [0, 0.0, 0.0])
+                usage[0] += n
+                usage[1] += cpu
+                usage[2] += memory
+        for agent, cardinalities in d.get("failures", {}).items():
+            self._saved_failures[agent] += [float(_) for _ in cardinalities]
+
+    def save(self, path: Path | str) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        dump(self.to_dict(), path)
+
+    @classmethod
+    def load(
+        cls,
+        path: Path | str | None,
+        cpu_limit: float | None = None,
+        memory_limit: float | None = None,
+        use_saved_failures: bool = False,
+    ) -> "CostProfile":
+        """Loads a saved profile (an empty profile is returned if the file does not exist)."""
+        profile = cls(cpu_limit, memory_limit, use_saved_failures=use_saved_failures)
+        if path is not None and Path(path).is_file():
+            profile.update(load(path))
+        return profile
+
+
+class JobScheduler(Generic[T]):
+    """
+    Orders generated jobs longest-first and batches short jobs into chunks.
+
+    Args:
+        jobs: The jobs to schedule (consumed lazily).
+        group: Returns the group of a job (jobs of a group are expected to take similar time).
+        cost: Returns the static cost of a job (see `CostModel`).
+        model: The cost model (shared with whoever observes job durations).
+        lookahead: Number of jobs buffered for ordering.
+        chunk_seconds: Short jobs are chunked until their estimated total duration reaches this.
+        max_chunk_size: Maximum number of jobs in a chunk.
+        defer: Returns `True` for jobs to submit after all other jobs in the lookahead buffer.
+        skip: Called for every job just before it is submitted. Returns `True` if the job should not run
+              (the callback is responsible for recording it).
+
+    Remarks:
+        - Ordering is longest-first within the lookahead buffer so memory stays bounded.
+        - Jobs are only chunked once the model can estimate durations.
+    """
+
+    def __init__(
+        self,
+        jobs: Iterator[T],
+        group: Callable[[T], Hashable],
+        cost: Callable[[T], float],
+        model: CostModel | None = None,
+        lookahead: int = LOOKAHEAD,
+        chunk_seconds: float = CHUNK_SECONDS,
+        max_chunk_size: int = MAX_CHUNK_SIZE,
+        defer: Callable[[T], bool] | None = None,
+        skip: Callable[[T], bool] | None = None,
+    ):
+        self.model = model if model is not None else CostModel()
+        self._defer = defer
+        self._skip = skip
+        self._jobs = jobs
+        self._group = group
+        self._cost = cost
+        self._lookahead = max(1, lookahead)
+        self._chunk_seconds = chunk_seconds
+        self._max_chunk_size = max(1, max_chunk_size)
+        self._buffer: list[tuple[bool, float, int, T]] = []
+        self._order = count()
+        self._exhausted = False
+
+    def _fill(self) -> None:
+        while not self._exhausted and len(self._buffer) < self._lookahead:
+            try:
+                job = next(self._jobs)
+            except StopIteration:
+                self._exhausted = True
+                return
+            priority = self.model.priority(self._group(job), self._cost(job))
+            deferred = self._defer is not None and self._defer(job)
+            heapq.heappush(self._buffer, (deferred, -priority, next(self._order), job))
+
+    def _pop(self) -> T | None:
+        """Removes the next job to run from the buffer skipping jobs that should not run."""
+        while self._buffer:
+            job = heapq.heappop(self._buffer)[-1]
+            if self._skip is None or not self._skip(job):
+                return job
+            self._fill()
+        return None
+
+    def _estimate(self, job: T) -> float | None:
+        return self.model.estimate(self._group(job), self._cost(job))
+
+    def next_chunk(self) -> list[T]:
+        """Returns the next jobs to submit together (an empty list when all jobs are scheduled)."""
+        self._fill()
+        job = self._pop()
+        if job is None:
+            return []
+        chunk, total = [job], self._estimate(job)
+        while total is not None and self._buffer and len(chunk) < self._max_chunk_size:
+            nxt = self._estimate(self._buffer[0][-1])
+            if nxt is None or total + nxt > self._chunk_seconds:
+                break
+            job = self._pop()
+            if job is None:
+                break
+            chunk.append(job)
+            total += nxt
+        return chunk
+
+
+class WorkerUtilization:
+    """Tracks the time each worker process spends running jobs."""
+
+    def __init__(self):
+        self.start = perf_counter()
+        self.busy: dict[Hashable, float] = defaultdict(float)
+        self.n_jobs: dict[Hashable, int] = defaultdict(int)
+
+    def add(self, worker: Hashable, seconds: float, n_jobs: int = 1) -> None:
+        """Records that the given worker spent `seconds` running `n_jobs` jobs."""
+        self.busy[worker] += seconds
+        self.n_jobs[worker] += n_jobs
+
+    def report(self) -> dict[str, float]:
+        """Returns the fraction of the elapsed time each worker was busy."""
+        elapsed = perf_counter() - self.start
+        if elapsed <= 0:
+            return {}
+        return {str(k): min(1.0, v / elapsed) for k, v in self.busy.items()}
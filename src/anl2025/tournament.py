@@ -1,11 +1,26 @@
+import csv
+import gc
+import json
+import os
+import sys
+import threading
 from collections import defaultdict
-from time import perf_counter, sleep
+from collections.abc import Iterable, Iterator
+from functools import partial
+from time import perf_counter, process_time, sleep
+import psutil
 import numpy as np
 from attr import asdict, field
 from copy import deepcopy
-from rich.progress import track
-from multiprocessing import cpu_count
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import cpu_count, get_context
+from multiprocessing.queues import SimpleQueue
+from concurrent.futures.process import BrokenProcessPool
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
 from negmas.helpers import humanize_time, unique_name
 from negmas.serialization import dump
 from rich import print
@@ -13,7 +28,6 @@ from collections.abc import Sequence
 from typing import TypedDict
 from pathlib import Path
 from typing import Self
-import random
 from anl2025.ufun import CenterUFun
 from negmas.helpers.types import get_class, get_full_type_name
 from negmas.serialization import serialize, deserialize
@@ -28,20 +42,38 @@ from anl2025.negotiator import (
     Conceder2025,
 )
 from anl2025.runner import (
-    AssignedScenario,
     MultidealScenario,
     RunParams,
     SessionResults,
     assign_scenario,
     make_multideal_scenario,
 )
-from anl2025.common import DEFAULT_METHOD, TYPE_IDENTIFIER
+from anl2025.cache import cache_file, cached_load, content_hash
+from anl2025.jobqueue import LEASE_SECONDS, POLL_SECONDS, JobQueue
+from anl2025.traces import TRACES_FOLDER_NAME
+from anl2025.scheduler import CostProfile, JobScheduler, WorkerUtilization
+from anl2025.common import (
+    DEFAULT_METHOD,
+    TYPE_IDENTIFIER,
+    derive_seed,
+    make_rng,
+    session_budget,
+    SessionBudgetExceeded,
+    BUDGET_ERROR_PREFIX,
+    OUTPUT_FULL,
+    OUTPUT_NONE,
+    OUTPUT_TRACE,
+    check_output_tier,
+)
 from attr import define
 
 __all__ = [
     "Tournament",
     "TournamentResults",
+    "ScoreAggregator",
     "anl2025_tournament",
+    "merge_shards",
+    "run_worker",
     "DEFAULT_TOURNAMENT_PATH",
     "DEFAULT_ANL2025_COMPETITORS",
 ]
@@ -49,6 +81,23 @@ __all__ = [
 DEFAULT_TOURNAMENT_PATH = Path.home() / "negmas" / "anl2025" / "tournaments"
 """Default location to store tournament logs"""
 
+STREAM_FOLDER_NAME = "stream"
+"""Folder (inside the tournament path) to stream results to"""
+SCORES_FILE_NAME = "scores.csv"
+"""File name for streamed score records"""
+SESSIONS_FILE_NAME = "sessions.csv"
+"""File name for streamed session summaries"""
+CHECKPOINT_FILE_NAME = "checkpoint.yaml"
+"""File name for the information needed to resume an interrupted tournament (seed, etc)"""
+MAX_PENDING_JOBS_PER_WORKER = 4
+"""Maximum number of sessions (or chunks of sessions) submitted but not yet completed per worker process"""
+MAX_SESSION_ATTEMPTS = 3
+"""Number of times a session is run before it is recorded as failed if its worker process keeps dying"""
+PROFILE_FILE_NAME = "profile.yaml"
+"""Suggested file name for the learned usage of agents (see the `profile` parameter of `Tournament.run`)"""
+QUEUE_BATCH_SIZE = 256
+"""Number of jobs added to a job queue in a single transaction"""
+
 DEFAULT_ANL2025_COMPETITORS = (
     TimeBased2025,
     Random2025,
@@ -80,6 +129,7 @@ def scenario_maker(
     target_quantity: float | None = None,
     others: float | None = None,
     verbose: bool = False,
+    seed: int | np.random.Generator | None = None,
 ) -> MultidealScenario:
     """
     Generates a MultidealScenario with customizable parameters for negotiation tournaments.
@@ -98,25 +148,27 @@ def scenario_maker(
         job_hunt (float): Fraction of scenarios with "job_hunt" type.
         target_quantity (float): Fraction of scenarios with "target_quantity" type.
         others (float): Fraction of scenarios with other types.
+        seed (int | np.random.Generator | None): A seed or a generator for the type and contents of the scenario.
 
     Returns:
         MultidealScenario: The generated scenario object.
     """
+    rng = make_rng(seed)
     if dinners is None:
-        dinners = random.random()
+        dinners = float(rng.random())
     if job_hunt is None:
-        job_hunt = random.random()
+        job_hunt = float(rng.random())
     if target_quantity is None:
-        target_quantity = random.random()
+        target_quantity = float(rng.random())
     if others is None:
-        others = random.random()
+        others = float(rng.random())
     s = dinners + job_hunt + target_quantity + others
     assert s > 0, "The sum of scenario weights must be positive"
     dinners /= s
     job_hunt /= s
     target_quantity /= s
     others /= s
-    r = random.random()
+    r = float(rng.random())
     if r <= others:
         if verbose:
             print("Generating a random scenario")
@@ -130,6 +182,7 @@ def scenario_maker(
             center_ufun_params=center_ufun_params,
             edge_reserved_value_min=edge_reserved_value_min,
             edge_reserved_value_max=edge_reserved_value_max,
+            seed=rng,
         )
     if r <= others + dinners:
         if verbose:
@@ -146,6 +199,7 @@ def scenario_maker(
             edge_reserved_values=(edge_reserved_value_min, edge_reserved_value_max),
             values=None,
             public_graph=True,
+            seed=rng,
         )
     if r <= others + dinners + job_hunt:
         if verbose:
@@ -156,6 +210,7 @@ def scenario_maker(
             n_employers=nedges,
             work_days=nvalues,
             salary=[50 * (2 + _) for _ in range(nvalues)],
+            seed=rng,
         )
     from anl2025.scenarios.target_quantity import make_target_quantity_scenario
 
@@ -165,8 +220,12 @@ def scenario_maker(
         n_suppliers=nedges,
         quantity=(1, nvalues + 1),
         target_quantity=(2, nvalues * nedges),
-        collector_reserved_value=(center_reserved_value_min, center_reserved_value_max),
+        collector_reserved_value=(
+            center_reserved_value_min,
+            center_reserved_value_max,
+        ),
         supplier_reserved_values=(edge_reserved_value_min, edge_reserved_value_max),
+        seed=rng,
     )
 
 
@@ -208,7 +267,18 @@ class ScoreRecord(TypedDict):
 
 @define
 class JobInfo:
-    assigned: AssignedScenario
+    """A lightweight description of a single negotiation session in a tournament.
+
+    Remarks:
+        - The scenario itself is not part of the job. Workers receive all scenarios once
+          (see `init_worker`) and find the scenario using `scenario_index`.
+        - `seed` is derived from the tournament seed and `run_index` only (see `derive_seed`) so
+          any job can be regenerated independently of the others.
+        - Negotiation traces are written to the trace store of the worker process in the `traces` folder
+          (see `anl2025.traces.trace_writer`) and `output` is only given with the full output tier
+          (see `RunParams.output_tier`).
+    """
+
     output: Path | None
     sname: str
     rep_index: int
@@ -221,6 +291,8 @@ class JobInfo:
     edge_info: list[tuple[type, dict[str, Any] | None]]
     nedges_counted: int
     run_index: int
+    seed: int | None = None
+    traces: Path | None = None
 
 
 @define
@@ -263,34 +335,448 @@ class TournamentResults:
     scores: list[ScoreRecord]  # Raw scores of agents in all negotiations
     session_results: list[SessionInfo]
     path: Path | None = None
-    n_threads_succeeded: int = field(init=False)
-    n_threads_timedout: int = field(init=False)
-    n_threads_failed: int = field(init=False)
+    n_threads_succeeded: int = -1  # calculated from session_results if not given
+    n_threads_timedout: int = -1  # calculated from session_results if not given
+    n_threads_failed: int = -1  # calculated from session_results if not given
     center_factor: dict[str, float] = field(
         factory=dict
     )  # the multiplier for center utility in each scenario
     edge_factor: dict[str, float] = field(
         factory=dict
     )  # the multiplier for edge utility in each scenario
+    worker_utilization: dict[str, float] = field(
+        factory=dict
+    )  # fraction of the time each worker process (by pid) was running sessions (parallel runs only)
 
     def __attrs_post_init__(self):
-        self.n_threads_succeeded = sum(
-            [_.results.n_succeeded for _ in self.session_results]
+        if self.n_threads_succeeded < 0:
+            self.n_threads_succeeded = sum(
+                [_.results.n_succeeded for _ in self.session_results]
+            )
+        if self.n_threads_timedout < 0:
+            self.n_threads_timedout = sum(
+                [_.results.n_timedout for _ in self.session_results]
+            )
+        if self.n_threads_failed < 0:
+            self.n_threads_failed = sum(
+                [_.results.n_failed for _ in self.session_results]
+            )
+
+
+@define
+class ScoreAggregator:
+    """Incrementally aggregates score records (see `ScoreRecord`) into the final scores of a tournament.
+
+    Remarks:
+        - Only running sums and counts are kept, so memory does not grow with the number of sessions.
+    """
+
+    avoid_inf_nan: bool = True
+    acc_scores: dict[str, float] = field(factory=lambda: defaultdict(float))
+    raw_scores: dict[str, float] = field(factory=lambda: defaultdict(float))
+    weighted_scores_center: dict[str, float] = field(factory=lambda: defaultdict(float))
+    weighted_scores_edge: dict[str, float] = field(factory=lambda: defaultdict(float))
+    count_center: dict[str, float] = field(factory=lambda: defaultdict(float))
+    count_edge: dict[str, float] = field(factory=lambda: defaultdict(float))
+    center_factor: dict[str, float] = field(factory=dict)
+    edge_factor: dict[str, float] = field(factory=dict)
+    n_threads_succeeded: int = 0
+    n_threads_timedout: int = 0
+    n_threads_failed: int = 0
+
+    def add(self, records: Iterable[ScoreRecord]) -> None:
+        """Adds score records (center records have index zero)"""
+        for record in records:
+            agent, utility = record["agent"], record["utility"]
+            raw = record["raw_utility"]
+            if self.avoid_inf_nan and (np.isinf(raw) or np.isnan(raw)):
+                raw = 0.0
+            self.acc_scores[agent] += utility
+            self.raw_scores[agent] += raw
+            if record["index"] == 0:
+                self.weighted_scores_center[agent] += utility
+                self.count_center[agent] += 1
+            else:
+                self.weighted_scores_edge[agent] += utility
+                self.count_edge[agent] += 1
+
+    def add_factors(
+        self, scenario: str, center_factor: float, edge_factor: float
+    ) -> None:
+        """Records the multipliers used for center and edge utilities in a scenario"""
+        self.center_factor[scenario] = center_factor
+        self.edge_factor[scenario] = edge_factor
+
+    def add_thread_counts(self, succeeded: int, timedout: int, failed: int) -> None:
+        """Adds the number of threads that succeeded, timed out and failed in a session"""
+        self.n_threads_succeeded += succeeded
+        self.n_threads_timedout += timedout
+        self.n_threads_failed += failed
+
+    def results(
+        self,
+        scores: list[ScoreRecord] | None = None,
+        session_results: list[SessionInfo] | None = None,
+        path: Path | None = None,
+    ) -> TournamentResults:
+        """Calculates the final scores"""
+        # weighted_average_* are the average scores of each agent when they are in the center or edge position
+        weighted_average = {}
+        for agent in self.acc_scores.keys():
+            weighted_average_edge = (
+                self.weighted_scores_edge[agent] / self.count_edge[agent]
+                if self.count_edge[agent] > 0
+                else 0
+            )
+            weighted_average_center = (
+                self.weighted_scores_center[agent] / self.count_center[agent]
+                if self.count_center[agent] > 0
+                else 0
+            )
+            weighted_average[agent] = 0.5 * (
+                weighted_average_center + weighted_average_edge
+            )
+        # total count for each agent
+        count: dict[str, float] = defaultdict(float)
+        for k, v in self.count_edge.items():
+            count[k] += v
+        for k, v in self.count_center.items():
+            count[k] += v
+
+        return TournamentResults(
+            final_scores={k: v for k, v in self.acc_scores.items()},
+            edge_count={k: v for k, v in self.count_edge.items()},
+            center_count={k: v for k, v in self.count_center.items()},
+            final_scoresC={k: v for k, v in self.weighted_scores_center.items()},
+            final_scoresE={k: v for k, v in self.weighted_scores_edge.items()},
+            weighted_average={k: v for k, v in weighted_average.items()},
+            center_factor={k: v for k, v in self.center_factor.items()},
+            edge_factor={k: v for k, v in self.edge_factor.items()},
+            raw_scores={k: v for k, v in self.raw_scores.items()},
+            unweighted_average={
+                k: (v / count[k]) if count[k] else v for k, v in self.acc_scores.items()
+            },
+            scores=scores if scores is not None else [],
+            session_results=session_results if session_results is not None else [],
+            path=path,
+            n_threads_succeeded=self.n_threads_succeeded,
+            n_threads_timedout=self.n_threads_timedout,
+            n_threads_failed=self.n_threads_failed,
         )
-        self.n_threads_timedout = sum(
-            [_.results.n_timedout for _ in self.session_results]
+
+
+_worker_scenarios: Sequence[MultidealScenario] = ()
+_worker_run_params: RunParams | None = None
+_worker_started: SimpleQueue | None = None
+
+
+def init_worker(
+    scenarios: Sequence[MultidealScenario],
+    run_params: RunParams,
+    started: SimpleQueue | None = None,
+) -> None:
+    """Stores the scenarios and run parameters of a tournament in the current process.
+
+    Remarks:
+        - Used as the initializer of tournament worker processes so that scenarios are sent
+          to each worker once instead of with every job.
+        - If `started` is given, the process ID and run index of every session are put in it
+          when the session starts (see `run_sessions`).
+    """
+    global _worker_scenarios, _worker_run_params, _worker_started
+    _worker_scenarios, _worker_run_params = scenarios, run_params
+    _worker_started = started
+
+
+def _failed_session(nedges: int, run_error: str) -> SessionResults:
+    return SessionResults(
+        mechanisms=[None] * nedges,  # type: ignore
+        center=None,  # type: ignore
+        agreements=[None] * nedges,
+        center_utility=0.0,
+        edge_utilities=[0.0] * nedges,  # type: ignore
+        edges=[None] * nedges,  # type: ignore
+        total_time=0,
+        times=[0] * nedges,  # type: ignore
+        run_error=run_error,
+    )
+
+
+def _failed_info(job: JobInfo, run_error: str) -> "SessionInfo":
+    """The information of a session of the given job that could not run."""
+    return SessionInfo(
+        scenario_name=job.sname,
+        repetition=job.rep_index,
+        rotation=job.competitor_index,
+        center_type_name=get_full_type_name(job.center),
+        center_params=job.center_params if job.center_params else {},
+        edge_type_names=[get_full_type_name(_) for _ in job.edges],
+        edge_params=job.edge_params,  # type: ignore
+        results=_failed_session(len(job.edges), run_error),
+    )
+
+
+def _type_name(x):
+    return get_full_type_name(x).replace("anl2025.negotiator.", "")
+
+
+def _agent_name(agent_type: type, params: dict[str, Any] | None) -> str:
+    return (
+        _type_name(agent_type)
+        if not params
+        else f"{_type_name(agent_type)}_{hash(str(params))}"
+    )
+
+
+def _score_records(
+    job: JobInfo,
+    r: SessionResults,
+    cfactor: float,
+    efactor: float,
+    avoid_inf_nan: bool = True,
+) -> list[ScoreRecord]:
+    """Creates the score records of the center and counted edges of a session"""
+    states = [_ for _ in r.final_states if _ is not None]
+    center_ids = [_[0] for _ in r.thread_ids]
+    edge_ids = [_[1] for _ in r.thread_ids]
+    cname = _agent_name(job.center, job.center_params)
+    eutilities = [
+        _ if not avoid_inf_nan or (not np.isinf(_) and not np.isnan(_)) else 0.0
+        for _ in r.edge_utilities
+    ]
+    mean_edge_utility = sum(eutilities) / len(eutilities)
+    cutility = r.center_utility
+    if avoid_inf_nan and (np.isinf(cutility) or np.isnan(cutility)):
+        cutility = 0.0
+    records: list[ScoreRecord] = [
+        {  # type: ignore
+            "agent": cname,
+            "utility": cutility * cfactor,
+            "raw_utility": cutility,
+            "partner_average_utility": mean_edge_utility,
+            "scenario": job.sname,
+            "repetition": job.rep_index,
+            "rotation": job.competitor_index,
+            "scenario_index": job.scenario_index,
+            "index": 0,
+            "time": r.total_time,
+            "errors": sum(
+                [
+                    s.has_error and s.erred_negotiator == cid
+                    for s, cid in zip(states, center_ids)
+                ]
+            )
+            if center_ids
+            else 0,
+            "self_error_details": (
+                "".join(
+                    [
+                        f"{s.error_details}\n" if s.erred_negotiator == cid else ""
+                        for s, cid in zip(states, center_ids)
+                    ]
+                )
+            ).strip()
+            if center_ids
+            else "",
+            "partner_error_details": (
+                "".join(
+                    [
+                        f"{s.error_details}\n" if s.erred_negotiator != cid else ""
+                        for s, cid in zip(states, center_ids)
+                    ]
+                )
+            ).strip()
+            if center_ids
+            else "",
+            "partner_errors": sum(
+                [
+                    s.has_error and s.erred_negotiator != cid
+                    for s, cid in zip(states, center_ids)
+                ]
+            )
+            if center_ids
+            else 0,
+            # TODO: get the correct number of mechanism errors
+            "mechanism_errors": int(bool(r.run_error)),
+            "mechanism_error_details": r.run_error,
+            "run_index": job.run_index,
+        }
+    ]
+    for e, (c, p) in enumerate(job.edge_info[: job.nedges_counted]):
+        records.append(
+            {  # type: ignore
+                "agent": _agent_name(c, p),
+                "utility": eutilities[e] * efactor,
+                "raw_utility": r.edge_utilities[e],
+                "partner_average_utility": cutility,
+                "scenario": job.sname,
+                "repetition": job.rep_index,
+                "rotation": job.competitor_index,
+                "scenario_index": job.scenario_index,
+                "index": e + 1,
+                "time": r.times[e],
+                "errors": sum(
+                    [
+                        s.has_error and s.erred_negotiator == eid
+                        for s, eid in zip(states, edge_ids)
+                    ]
+                )
+                if edge_ids
+                else 0,
+                "partner_errors": sum(
+                    [
+                        s.has_error and s.erred_negotiator != eid
+                        for s, eid in zip(states, edge_ids)
+                    ]
+                )
+                if edge_ids
+                else 0,
+                "self_error_details": "".join(
+                    [
+                        f"{s.error_details}\n" if s.erred_negotiator == eid else ""
+                        for s, eid in zip(states, edge_ids)
+                    ]
+                )
+                if edge_ids
+                else "",
+                "partner_error_details": "".join(
+                    [
+                        f"{s.error_details}\n" if s.erred_negotiator != eid else ""
+                        for s, eid in zip(states, edge_ids)
+                    ]
+                )
+                if edge_ids
+                else "",
+                # TODO: get the correct number of mechanism errors
+                "mechanism_errors": int(bool(r.run_error)),
+                "mechanism_error_details": r.run_error,
+                "run_index": job.run_index,
+            }
         )
-        self.n_threads_failed = sum([_.results.n_failed for _ in self.session_results])
+    return records
+
+
+def _session_row(job: JobInfo, info: SessionInfo) -> dict[str, Any]:
+    """A compact summary of a session (a row in the sessions file)"""
+    r = info.results
+    return {
+        "run_index": job.run_index,
+        "scenario": info.scenario_name,
+        "scenario_index": job.scenario_index,
+        "repetition": info.repetition,
+        "rotation": info.rotation,
+        "center_type": info.center_type_name,
+        "center_params": str(info.center_params),
+        "edge_types": json.dumps(info.edge_type_names),
+        "edge_params": str(info.edge_params),
+        "agreements": str(r.agreements),
+        "center_utility": r.center_utility,
+        "edge_utilities": json.dumps(list(r.edge_utilities)),
+        "total_time": r.total_time,
+        "times": json.dumps(list(r.times)),
+        "n_succeeded": r.n_succeeded,
+        "n_timedout": r.n_timedout,
+        "n_failed": r.n_failed,
+        "run_error": r.run_error,
+    }
+
+
+def _append_csv(path: Path, rows: Sequence[dict[str, Any]]) -> None:
+    """Appends rows to a csv file (writing the header if the file is new)"""
+    if not rows:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    new = not path.exists() or path.stat().st_size == 0
+    with open(path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        if new:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def _read_csv(path: Path) -> list[dict[str, Any]]:
+    """Reads complete rows of a csv file written by `_append_csv` (partially written rows are dropped)"""
+    if not path.is_file():
+        return []
+    with open(path, newline="") as f:
+        return [
+            row
+            for row in csv.DictReader(f)
+            if None not in row and None not in row.values()
+        ]
+
+
+def _read_completed(folder: Path) -> tuple[list[dict[str, Any]], list[ScoreRecord]]:
+    """Reads the sessions and score records of completed sessions from a stream folder.
+
+    Remarks:
+        - A session is completed only if its summary was written (it is written after its score records).
+    """
+    sessions, completed = [], set()
+    for row in _read_csv(folder / SESSIONS_FILE_NAME):
+        try:
+            run_index = int(row["run_index"])
+        except ValueError:
+            continue
+        if run_index in completed:
+            continue
+        completed.add(run_index)
+        sessions.append(row)
+    types = ScoreRecord.__annotations__
+    records = []
+    for row in _read_csv(folder / SCORES_FILE_NAME):
+        try:
+            record = {k: types[k](v) if k in types else v for k, v in row.items()}
+        except ValueError:
+            continue
+        if record["run_index"] in completed:
+            records.append(record)
+    return sessions, records  # type: ignore
+
+
+def _load_checkpoint(folder: Path) -> tuple[list[dict[str, Any]], list[ScoreRecord]]:
+    """Loads the sessions and score records of completed sessions from a stream folder.
+
+    Remarks:
+        - The files are rewritten with the completed sessions only so that rerunning incomplete ones
+          does not duplicate their records.
+    """
+    sessions, records = _read_completed(folder)
+    for name, rows in ((SCORES_FILE_NAME, records), (SESSIONS_FILE_NAME, sessions)):
+        (folder / name).unlink(missing_ok=True)
+        _append_csv(folder / name, rows)
+    return sessions, records  # type: ignore
 
 
 def run_session(
-    job: JobInfo, dry: bool, verbose: bool, normalize_scores: bool = False
+    job: JobInfo,
+    dry: bool,
+    verbose: bool,
+    normalize_scores: bool = False,
+    compact: bool = False,
+    scenarios: Sequence[MultidealScenario] | None = None,
+    run_params: RunParams | None = None,
 ) -> tuple[JobInfo, SessionInfo]:
+    """Runs a single tournament session in a process initialized with `init_worker`.
+
+    Remarks:
+        - If `scenarios` and `run_params` are given, they are used instead of the ones stored by `init_worker`.
+        - If `compact` is given, mechanisms and agents are dropped from the results (see `SessionResults.compact`).
+        - Agents get random generators derived from the seed of the job (see `assign_scenario`).
+        - Sessions in a process share its scenarios. Their state is restored after every session
+          (see `MultidealScenario.save_state`) instead of copying the scenario for each session.
+        - Sessions exceeding `session_cpu_limit` or `session_memory_limit` of the run parameters are
+          interrupted and recorded as failed with the reason as their `run_error`.
+    """
     print(
-        f"{job.run_index:04}: START {job.assigned.scenario.name}: center: {job.center.__name__}, edges: {[_.__name__ for _ in job.edges]}",
+        f"{job.run_index:04}: START {job.sname}: center: {job.center.__name__}, edges: {[_.__name__ for _ in job.edges]}",
         flush=True,
     )
-    assigned = job.assigned
+    if scenarios is None:
+        scenarios = _worker_scenarios
+    if run_params is None:
+        run_params = _worker_run_params
+    assert run_params is not None, "init_worker was not called"
     output = job.output
     sname = job.sname
     i = job.rep_index
@@ -300,37 +786,52 @@ def run_session(
     edges = job.edges
     edge_params = job.edge_params
     _strt = perf_counter()
+    scenario = scenarios[job.scenario_index]
+    # sessions share the scenario and undo whatever the agents changed in it
+    state = scenario.save_state()
     try:
-        r = assigned.run(
-            output=output,
-            name=f"{sname}_{j}_{i}",
-            dry=dry,
-            verbose=verbose,
-            normalize_scores=normalize_scores,
-        )
+        with session_budget(
+            run_params.session_cpu_limit,
+            run_params.session_memory_limit,
+        ):
+            assigned = assign_scenario(
+                scenario=scenario,
+                run_params=run_params,
+                center_type=center,
+                center_params=center_params,
+                edge_types=edges,  # type: ignore
+                edge_params=edge_params,  # type: ignore
+                verbose=verbose,
+                sample_edges=False,
+                seed=job.seed,
+            )
+            r = assigned.run(
+                output=output,
+                name=f"{sname}_{j}_{i}",
+                dry=dry,
+                verbose=verbose,
+                normalize_scores=normalize_scores,
+                traces=job.traces,
+            )
         if r.run_error:
             print(
-                f"{job.run_index:04}: [orange]DONE[/orange] {job.assigned.scenario.name}: center: {job.center.__name__}, edges: {[_.__name__ for _ in job.edges]} in {humanize_time(r.total_time)} ([red]{r.run_error}[/red])",
+                f"{job.run_index:04}: [orange]DONE[/orange] {job.sname}: center: {job.center.__name__}, edges: {[_.__name__ for _ in job.edges]} in {humanize_time(r.total_time)} ([red]{r.run_error}[/red])",
                 flush=True,
             )
         else:
             print(f"<{job.run_index}>", end="", flush=True)
-    except Exception as e:
+    except (Exception, SessionBudgetExceeded) as e:
         print(
-            f"{job.run_index:04}: [red]FAILED[/red] {job.assigned.scenario.name}: center: {job.center.__name__}, edges: {[_.__name__ for _ in job.edges]} in {humanize_time(perf_counter() - _strt)} ({e})",
+            f"{job.run_index:04}: [red]FAILED[/red] {job.sname}: center: {job.center.__name__}, edges: {[_.__name__ for _ in job.edges]} in {humanize_time(perf_counter() - _strt)} ({e})",
             flush=True,
         )
-        r = SessionResults(
-            mechanisms=[None] * len(job.assigned.scenario.edge_ufuns),  # type: ignore
-            center=None,  # type: ignore
-            agreements=[None] * len(job.assigned.scenario.edge_ufuns),
-            center_utility=0.0,
-            edge_utilities=[0.0] * len(job.assigned.scenario.edge_ufuns),  # type: ignore
-            edges=[None] * len(job.assigned.scenario.edge_ufuns),  # type: ignore
-            total_time=0,
-            times=[0] * len(job.assigned.scenario.edge_ufuns),  # type: ignore
-            run_error=str(e),
-        )
+        r = _failed_session(len(edges), str(e))
+        if isinstance(e, SessionBudgetExceeded):
+            gc.collect()
+    finally:
+        scenario.restore_state(state)
+    if compact:
+        r = r.compact()
     return job, SessionInfo(
         scenario_name=sname,
         repetition=i,
@@ -343,6 +844,195 @@ def run_session(
     )
 
 
+def run_sessions(
+    jobs: list[JobInfo],
+    dry: bool,
+    verbose: bool,
+    normalize_scores: bool = False,
+    compact: bool = False,
+    scenarios: Sequence[MultidealScenario] | None = None,
+    run_params: RunParams | None = None,
+) -> tuple[int, list[tuple[JobInfo, SessionInfo, float, float, float]]]:
+    """Runs a chunk of sessions (see `run_session`).
+
+    Returns:
+        The process ID and, for each session, its duration, CPU time (both in seconds) and the growth of the
+        resident memory of the process (in MB).
+    """
+    results = []
+    process = psutil.Process()
+    for job in jobs:
+        if _worker_started is not None:
+            _worker_started.put((os.getpid(), job.run_index))
+        _strt, _cpu = perf_counter(), process_time()
+        rss = process.memory_info().rss
+        job, info = run_session(
+            job,
+            dry,
+            verbose,
+            normalize_scores,
+            compact=compact,
+            scenarios=scenarios,
+            run_params=run_params,
+        )
+        results.append(
+            (
+                job,
+                info,
+                perf_counter() - _strt,
+                process_time() - _cpu,
+                (process.memory_info().rss - rss) / 2**20,
+            )
+        )
+    return os.getpid(), results
+
+
+def _parse_shard(shard: str | tuple[int, int] | None) -> tuple[int, int] | None:
+    """Parses a shard specification (e.g. "3/8" for the third of eight shards)."""
+    if shard is None:
+        return None
+    if isinstance(shard, str):
+        try:
+            k, n = (int(_) for _ in shard.split("/"))
+        except ValueError:
+            raise ValueError(
+                f"Invalid shard {shard}: expected k/n (e.g. 3/8 for the third of eight shards)"
+            )
+    else:
+        k, n = shard
+    if not 1 <= k <= n:
+        raise ValueError(f"Invalid shard {k}/{n}: expected 1 <= {k} <= {n}")
+    return k, n
+
+
+def merge_shards(
+    paths: Iterable[Path | str], avoid_inf_nan: bool = True
+) -> TournamentResults:
+    """Combines the results of the shards of a tournament (see the `shard` parameter of `Tournament.run`).
+
+    Args:
+        paths: The paths the shards were run with (each has a `STREAM_FOLDER_NAME` folder).
+        avoid_inf_nan: Count infinite and NaN utilities as zeros.
+
+    Remarks:
+        - The shards must come from the same tournament run with the same seed and each shard can only be given once.
+        - Only completed sessions are merged. Missing shards are reported but do not stop the merge.
+    """
+    aggregator = ScoreAggregator(avoid_inf_nan=avoid_inf_nan)
+    scores: list[ScoreRecord] = []
+    expected, first, n_shards = None, None, None
+    shards: set[int] = set()
+    for path in paths:
+        folder = Path(path) / STREAM_FOLDER_NAME
+        if not (folder / CHECKPOINT_FILE_NAME).is_file():
+            raise FileNotFoundError(
+                f"Cannot find the results of a tournament in {path}"
+            )
+        checkpoint = load(folder / CHECKPOINT_FILE_NAME)
+        k, n = checkpoint.pop("shard", None) or (1, 1)
+        if expected is None:
+            expected, first, n_shards = checkpoint, path, n
+        elif checkpoint != expected or n != n_shards:
+            raise ValueError(f"{path} is not a shard of the same tournament as {first}")
+        if k in shards:
+            raise ValueError(f"Shard {k}/{n} is given more than once")
+        shards.add(k)
+        sessions, records = _read_completed(folder)
+        for row in sessions:
+            aggregator.add_thread_counts(
+                int(row["n_succeeded"]), int(row["n_timedout"]), int(row["n_failed"])
+            )
+        aggregator.add(records)
+        scores.extend(records)
+    if n_shards is not None and len(shards) < n_shards:
+        missing = sorted(set(range(1, n_shards + 1)) - shards)
+        print(
+            f"[yellow]Missing shards {', '.join(f'{_}/{n_shards}' for _ in missing)}[/yellow]"
+        )
+    return aggregator.results(scores=scores)
+
+
+def _died_error(attempts: int) -> str:
+    return f"The worker process died {attempts} times while running the session (e.g. out of memory)"
+
+
+def run_worker(
+    queue: Path | str,
+    lease_seconds: float = LEASE_SECONDS,
+    max_sessions: int | None = None,
+) -> int:
+    """Runs sessions from a job queue filled by `Tournament.run` (see its `queue` parameter).
+
+    Args:
+        queue: The job queue database.
+        lease_seconds: Seconds a session stays reserved for this worker. The lease is renewed while the session runs.
+        max_sessions: Maximum number of sessions to run (unlimited if not given).
+
+    Remarks:
+        - Workers can start before the tournament fills the queue. They wait for sessions until the
+          tournament added all of them and no session is left to run.
+        - Sessions of workers that crash are run again by other workers once their lease expires.
+        - Each worker keeps its own copy of the scenarios so workers can share a process. Session budgets
+          are only enforced on the main thread though (see `session_budget`) so workers are best run as
+          separate processes (e.g. with `anl2025 worker`).
+
+    Returns:
+        The number of sessions run.
+    """
+    jobs = JobQueue(queue, lease_seconds)
+    worker = f"{JobQueue.worker_name()}:{threading.get_ident()}"
+    settings, n = None, 0
+    try:
+        while max_sessions is None or n < max_sessions:
+            leased = jobs.lease(worker)
+            if leased is None:
+                if jobs.is_finished():
+                    break
+                sleep(POLL_SECONDS)
+                continue
+            if settings is None:
+                # every worker unpickles its own copy of the scenarios
+                settings = jobs.get("settings")
+            id, job = leased
+            done = threading.Event()
+
+            def renew(id: int, done: threading.Event):
+                # sqlite connections cannot be shared between threads
+                leases = JobQueue(queue, lease_seconds)
+                while not done.wait(lease_seconds / 3):
+                    leases.renew(id, worker)
+                leases.close()
+
+            renewer = threading.Thread(target=renew, args=(id, done), daemon=True)
+            renewer.start()
+            try:
+                _, outputs = run_sessions(
+                    [job],
+                    settings["dry"],
+                    settings["verbose"],
+                    settings["normalize_scores"],
+                    compact=settings["compact"],
+                    scenarios=settings["scenarios"],
+                    run_params=settings["run_params"],
+                )
+            finally:
+                done.set()
+                renewer.join()
+            _, info, duration, cpu, memory = outputs[0]
+            jobs.complete(id, (worker, info, duration, cpu, memory))
+            n += 1
+    finally:
+        jobs.close()
+    return n
+
+
+def _scenario_cost(scenario: MultidealScenario) -> float:
+    try:
+        return float(scenario.center_ufun.outcome_space.cardinality)  # type: ignore
+    except Exception:
+        return float("inf")
+
+
 def anl2025_tournament(
     scenarios: tuple[MultidealScenario, ...],
     competitors: tuple[str | type[ANL2025Negotiator], ...],
@@ -426,6 +1116,19 @@ def make_tournament_name():
     return unique_name("t", sep="_")
 
 
+def _load_scenario_file(
+    path: Path, python_class_identifier=TYPE_IDENTIFIER
+) -> MultidealScenario:
+    """Loads a scenario saved by `Tournament.save`"""
+    s = deserialize(load(path), python_class_identifier=python_class_identifier)
+    if isinstance(s, dict):
+        # `MultidealScenario.to_dict` does not record the type
+        s = MultidealScenario(
+            **{k: v for k, v in s.items() if k != python_class_identifier}
+        )
+    return s  # type: ignore
+
+
 @define
 class Tournament:
     """Represents a tournament
@@ -469,6 +1172,7 @@ class Tournament:
         fraction_job_hunt: float | None = None,
         fraction_target_quantity: float | None = None,
         fraction_others: float | None = None,
+        seed: int | None = None,
     ) -> Self:
         """Loads a tournament from the given scenarios (optionally generating new ones)
 
@@ -492,6 +1196,7 @@ class Tournament:
             generated_job_hunt: fraction of generated scenarios that are job hunt scenarios
             generated_target_quantity: fraction of generated scenarios that are target quantity scenarios
             generated_others: fraction of generated scenarios that are random scenarios
+            seed: If given, generated scenarios will be the same every time (each is generated with a seed derived from it)
 
         Returns:
             A `Tournament` ready to run
@@ -500,6 +1205,7 @@ class Tournament:
         #     raise ValueError(
         #         f"We have {len(competitors)} competitors which is not enough for {nedges} edges"
         #     )
+        rng = make_rng(seed)
         return cls(
             name=name if name else make_tournament_name(),
             competitors=tuple(competitors),
@@ -523,6 +1229,7 @@ class Tournament:
                         others=fraction_others,
                         target_quantity=fraction_target_quantity,
                         job_hunt=fraction_job_hunt,
+                        seed=int(rng.integers(2**32)),
                     )
                     for _ in range(n_generated)
                 ]
@@ -578,8 +1285,20 @@ class Tournament:
         dump(data, path)
 
     @classmethod
-    def load(cls, path: Path | str, python_class_identifier=TYPE_IDENTIFIER):
-        """Loads the tournament information."""
+    def load(
+        cls,
+        path: Path | str,
+        python_class_identifier=TYPE_IDENTIFIER,
+        use_cache: bool = False,
+    ):
+        """Loads the tournament information.
+
+        Args:
+            path: The file the tournament was saved to (see `save`).
+            python_class_identifier: the key in the yaml to define a type.
+            use_cache: If given, scenario files are compiled (pickled) into hidden cache files next to them
+                       and only parsed again if they change (see `anl2025.cache.cached_load`).
+        """
 
         path = path if isinstance(path, Path) else Path(path)
         info = load(path)
@@ -589,18 +1308,30 @@ class Tournament:
         else:
             info["scenarios"] = list(info["scenarios"])
 
+        scenarios = [
+            deserialize(_, python_class_identifier=python_class_identifier)
+            for _ in info["scenarios"]
+        ]
         if base.exists():
-            info["scenarios"] += [
-                deserialize(f, python_class_identifier=python_class_identifier)
-                for f in base.glob("*.yaml")
-            ]
+            for f in sorted(base.glob("*.yaml")):
+                loader = partial(
+                    _load_scenario_file,
+                    f,
+                    python_class_identifier=python_class_identifier,
+                )
+                scenarios.append(
+                    cached_load(
+                        content_hash([f], cls.__name__, python_class_identifier),
+                        loader,
+                        cache_file(f),
+                    )
+                    if use_cache
+                    else loader()
+                )
 
         return cls(
             competitors=info["competitors"],
-            scenarios=[
-                deserialize(_, python_class_identifier=python_class_identifier)
-                for _ in info["scenarios"]
-            ],  # type: ignore
+            scenarios=scenarios,  # type: ignore
             run_params=RunParams(**info["run_params"]),
             competitor_params=None  # type: ignore
             if not info.get("competitor_params", None)
@@ -624,6 +1355,13 @@ class Tournament:
         edge_multiplier: float | None = None,
         normalize_scores: bool = False,
         avoid_inf_nan: bool = True,
+        stream: bool = False,
+        seed: int | None = None,
+        resume: bool = False,
+        profile: Path | str | None = None,
+        use_saved_failures: bool = False,
+        shard: str | tuple[int, int] | None = None,
+        queue: Path | str | None = None,
     ) -> TournamentResults:
         """Run the tournament
 
@@ -642,12 +1380,70 @@ class Tournament:
                                to give more or less value to being a center. If None, it will be equal to the number of edges.
             edge_multiplier: A number to multiply edge utilities with before calculating the score. Can be used
                                to give more or less value to being an edge. If None it will be one over the number of edges (to emphasize the center).
+            normalize_scores: Normalize utilities to the range of each ufun before scoring.
+            avoid_inf_nan: Count infinite and NaN utilities as zeros.
+            stream: If given, score records and session summaries are not kept in memory. Only final aggregates
+                    are returned (`scores` and `session_results` will be empty). Records are still written to the
+                    `stream` folder under `path` (see `STREAM_FOLDER_NAME`) unless the output tier is none.
+            seed: The seed used for assigning competitors to sessions. If not given, a random one is used.
+            resume: Resume a tournament that was run before with the same `path` skipping sessions that were completed.
+            profile: A file to load the learned usage of agents from and save it to (see `anl2025.scheduler.CostProfile`).
+                     If not given, nothing is loaded or saved.
+            use_saved_failures: Skip sessions because of failures stored in `profile` by earlier tournaments.
+                                By default, only failures of this run are used.
+            shard: Run only a slice of the sessions given as k/n (e.g. "3/8" or (3, 8)) for the k-th of n shards
+                   (starting from 1). Use `merge_shards` to combine the results of all shards.
+            queue: A job queue database to add sessions to instead of running them. Sessions are run by workers
+                   started separately on any host that can access the database (see `run_worker` and the
+                   `anl2025 worker` command) and `run` returns once all of them are done. `n_jobs` is ignored.
+
+        Remarks:
+            - What is written under `path` depends on the output tier of the run parameters (see
+              `RunParams.output_tier`): nothing with none, streamed results with summary,
+              also negotiation traces with trace (the default) and also the output of every session (including
+              csv logs and plots) under `results` with full.
+            - If a `path` is given, score records and session summaries are appended to csv files in the `stream`
+              folder under it as sessions complete. Together with the seed (stored in `CHECKPOINT_FILE_NAME`), this
+              allows resuming an interrupted tournament by calling `run` again with `resume=True`.
+            - When resuming, the same sessions are generated from the stored seed and completed ones are not run again.
+              Their scores are read back from disk (but `session_results` will only contain the new sessions).
+            - When running in parallel, sessions expected to take longer (by the cardinality of the center
+              outcome-space and the observed durations of similar sessions) are submitted first and
+              short sessions are submitted in chunks (see `anl2025.scheduler.JobScheduler`). The fraction
+              of time each worker was busy is reported in `worker_utilization`.
+            - If a worker process dies (e.g. killed for using too much memory), the process pool is restarted.
+              Sessions that were waiting are submitted again. Sessions that were running are retried one at a
+              time in a separate worker process (while the pool keeps running other sessions) so that only a
+              session killing its worker is charged an attempt. Sessions are recorded as failed after
+              `MAX_SESSION_ATTEMPTS` attempts.
+            - Sessions whose results cannot be received from their worker are recorded as failed.
+            - The CPU time and memory used by every agent in the center is learned versus the cardinality of the
+              center outcome-space. Sessions predicted to exceed `session_cpu_limit` or `session_memory_limit`
+              (or at least as large as `anl2025.scheduler.FAILURES_TO_SKIP` failed sessions of their center)
+              are skipped and recorded as failed. Sessions with outcome-spaces much larger than any observed
+              for their center are run after others. The learned profile is saved to `profile` (if given)
+              to be used by later tournaments.
+            - All shards generate the same list of sessions (the seed defaults to one derived from the
+              tournament instead of a random one) and run every n-th of them. Shards can run on different
+              machines, each with its own `path`.
 
         Returns:
             `TournamentResults` with all scores and final-scores
         """
         if path is not None:
             path = path if isinstance(path, Path) else Path(path)
+        tier = check_output_tier(self.run_params.output_tier)
+        if resume and tier == OUTPUT_NONE:
+            raise ValueError(
+                f"Cannot resume a tournament with the {OUTPUT_NONE} output tier (nothing is stored to resume from)"
+            )
+        shard = _parse_shard(shard)
+        cost_profile = CostProfile.load(
+            profile,
+            self.run_params.session_cpu_limit,
+            self.run_params.session_memory_limit,
+            use_saved_failures=use_saved_failures,
+        )
         if n_jobs is not None:
             if isinstance(n_jobs, float) and n_jobs < 1.0:
                 n_jobs = int(0.5 + cpu_count() * n_jobs)
@@ -660,21 +1456,56 @@ class Tournament:
 
         results = []
         assert isinstance(self.competitor_params, tuple)
-        acc_scores = defaultdict(float)
-        raw_scores = defaultdict(float)
-        weighted_scores_center = defaultdict(float)
-        weighted_scores_edge = defaultdict(float)
-        count_edge = defaultdict(float)
-        count_center = defaultdict(float)
-        center_factor = defaultdict(float)
-        edge_factor = defaultdict(float)
-
+        aggregator = ScoreAggregator(avoid_inf_nan=avoid_inf_nan)
         scores = []
+        stream_path = (
+            path / STREAM_FOLDER_NAME if path and tier != OUTPUT_NONE else None
+        )
+        completed: set[int] = set()
+        checkpoint = {
+            "n_repetitions": n_repetitions,
+            "no_double_scores": no_double_scores,
+            "competitors": [get_full_type_name(get_class(_)) for _ in self.competitors],
+            "scenarios": [_.name for _ in self.scenarios],
+            "shard": list(shard) if shard else None,
+        }
+        if stream_path and resume and (stream_path / CHECKPOINT_FILE_NAME).is_file():
+            saved = load(stream_path / CHECKPOINT_FILE_NAME)
+            if seed is None:
+                seed = saved["seed"]
+            for k, v in checkpoint.items():
+                if saved.get(k, None) != v:
+                    raise ValueError(
+                        f"Cannot resume the tournament at {path}: {k} changed from {saved.get(k, None)} to {v}"
+                    )
+            sessions, records = _load_checkpoint(stream_path)
+            for row in sessions:
+                completed.add(int(row["run_index"]))
+                aggregator.add_thread_counts(
+                    int(row["n_succeeded"]),
+                    int(row["n_timedout"]),
+                    int(row["n_failed"]),
+                )
+            aggregator.add(records)
+            if not stream:
+                scores.extend(records)
+            print(f"Resuming: {len(completed)} sessions were already completed")
+        elif stream_path:
+            for name in (SCORES_FILE_NAME, SESSIONS_FILE_NAME):
+                (stream_path / name).unlink(missing_ok=True)
+        if seed is None and shard is not None:
+            # every shard must generate the same sessions
+            seed = derive_seed({k: v for k, v in checkpoint.items() if k != "shard"})
+        if seed is None:
+            seed = int(make_rng().integers(2**32))
+        if stream_path:
+            stream_path.mkdir(parents=True, exist_ok=True)
+            dump(dict(seed=seed, **checkpoint), stream_path / CHECKPOINT_FILE_NAME)
+        # all random choices in assigning competitors to sessions use this generator
+        # so that the same sessions are generated when resuming.
+        rng = make_rng(seed)
 
-        def type_name(x):
-            return get_full_type_name(x).replace("anl2025.negotiator.", "")
-
-        def process_info(job: JobInfo, info: SessionInfo):
+        def factors(job: JobInfo) -> tuple[float, float]:
             cfactor = (
                 center_multiplier
                 if center_multiplier is not None
@@ -685,148 +1516,21 @@ class Tournament:
                 if edge_multiplier is not None
                 else (1.0 / len(job.edge_info))
             )
+            return cfactor, efactor
+
+        def process_info(job: JobInfo, info: SessionInfo):
+            cfactor, efactor = factors(job)
             r = info.results
-            center_ids = [m.nmi.annotation["center_id"] for m in r.mechanisms if m]
-            edge_ids = [m.nmi.annotation["edge_id"] for m in r.mechanisms if m]
-            results.append(info)
-            center, center_params = job.center, job.center_params
-            cname = (
-                type_name(center)
-                if not center_params
-                else f"{type_name(center)}_{hash(str(center_params))}"
-            )
-            eutilities = [
-                _ if not avoid_inf_nan or (not np.isinf(_) and not np.isnan(_)) else 0.0
-                for _ in r.edge_utilities
-            ]
-            mean_edge_utility = sum(eutilities) / len(eutilities)
-            center_factor[job.sname] = cfactor
-            edge_factor[job.sname] = efactor
-            cutility = r.center_utility
-            if avoid_inf_nan and (np.isinf(cutility) or np.isnan(cutility)):
-                cutility = 0.0
-            scores.append(
-                dict(
-                    agent=cname,
-                    utility=cutility * cfactor,
-                    raw_utility=cutility,
-                    partner_average_utility=mean_edge_utility,
-                    scenario=job.sname,
-                    repetition=job.rep_index,
-                    rotation=job.competitor_index,
-                    scenario_index=job.scenario_index,
-                    index=0,
-                    time=r.total_time,
-                    errors=sum(
-                        [
-                            m.state.has_error and m.state.erred_negotiator == cid
-                            for m, cid in zip(r.mechanisms, center_ids)
-                        ]
-                    )
-                    if center_ids
-                    else 0,
-                    self_error_details=(
-                        "".join(
-                            [
-                                f"{m.state.error_details}\n"
-                                if m.state.erred_negotiator == cid
-                                else ""
-                                for m, cid in zip(r.mechanisms, center_ids)
-                            ]
-                        )
-                    ).strip()
-                    if center_ids
-                    else "",
-                    partner_error_details=(
-                        "".join(
-                            [
-                                f"{m.state.error_details}\n"
-                                if m.state.erred_negotiator != cid
-                                else ""
-                                for m, cid in zip(r.mechanisms, center_ids)
-                            ]
-                        )
-                    ).strip()
-                    if center_ids
-                    else "",
-                    partner_errors=sum(
-                        [
-                            m.state.has_error and m.state.erred_negotiator != cid
-                            for m, cid in zip(r.mechanisms, center_ids)
-                        ]
-                    )
-                    if center_ids
-                    else 0,
-                    # TODO: get the correct number of mechanism errors
-                    mechanism_errors=int(bool(r.run_error)),
-                    mechanism_error_details=r.run_error,
-                    run_index=job.run_index,
-                )
-            )
-            acc_scores[cname] += cutility * cfactor
-            weighted_scores_center[cname] += cutility * cfactor
-            raw_scores[cname] += cutility
-            count_center[cname] += 1
-            for e, (c, p) in enumerate(job.edge_info[: job.nedges_counted]):
-                ename = type_name(c) if not p else f"{type_name(c)}_{hash(str(p))}"
-                scores.append(
-                    dict(
-                        agent=ename,
-                        utility=eutilities[e] * efactor,
-                        raw_utility=r.edge_utilities[e],
-                        partner_average_utility=cutility,
-                        scenario=job.sname,
-                        repetition=job.rep_index,
-                        rotation=job.competitor_index,
-                        scenario_index=job.scenario_index,
-                        index=e + 1,
-                        time=r.times[e],
-                        errors=sum(
-                            [
-                                m.state.has_error and m.state.erred_negotiator == eid
-                                for m, eid in zip(r.mechanisms, edge_ids)
-                            ]
-                        )
-                        if edge_ids
-                        else 0,
-                        partner_errors=sum(
-                            [
-                                m.state.has_error and m.state.erred_negotiator != eid
-                                for m, eid in zip(r.mechanisms, edge_ids)
-                            ]
-                        )
-                        if edge_ids
-                        else 0,
-                        self_error_details="".join(
-                            [
-                                f"{m.state.error_details}\n"
-                                if m.state.erred_negotiator == eid
-                                else ""
-                                for m, eid in zip(r.mechanisms, edge_ids)
-                            ]
-                        )
-                        if edge_ids
-                        else "",
-                        partner_error_details="".join(
-                            [
-                                f"{m.state.error_details}\n"
-                                if m.state.erred_negotiator != eid
-                                else ""
-                                for m, eid in zip(r.mechanisms, edge_ids)
-                            ]
-                        )
-                        if edge_ids
-                        else "",
-                        # TODO: get the correct number of mechanism errors
-                        mechanism_errors=int(bool(r.run_error)),
-                        mechanism_error_details=r.run_error,
-                        run_index=job.run_index,
-                    )
-                )
-                acc_scores[ename] += eutilities[e] * efactor
-                weighted_scores_edge[ename] += eutilities[e] * efactor
-                raw_scores[ename] += eutilities[e]
-                count_edge[ename] += 1
+            records = _score_records(job, r, cfactor, efactor, avoid_inf_nan)
+            aggregator.add(records)
+            aggregator.add_factors(job.sname, cfactor, efactor)
+            aggregator.add_thread_counts(r.n_succeeded, r.n_timedout, r.n_failed)
+            if stream_path:
+                _append_csv(stream_path / SCORES_FILE_NAME, records)  # type: ignore
+                _append_csv(stream_path / SESSIONS_FILE_NAME, [_session_row(job, info)])
+            if not stream:
+                results.append(info)
+                scores.extend(records)
 
             if verbose:
                 print(f"Center Utility: {r.center_utility}")
@@ -847,207 +1551,398 @@ class Tournament:
         else:
             non_competitors = None
 
-        jobs = []
+        def in_shard(run_index: int) -> bool:
+            return shard is None or run_index % shard[1] == shard[0] - 1
+
+        n_sessions = n_repetitions * len(self.scenarios) * len(self.competitors)
+        n_to_run = sum(
+            1 for _ in range(n_sessions) if in_shard(_) and _ not in completed
+        )
         print(
-            f"Will use {len(self.scenarios)} scenarios and {len(self.competitors)} competitors"
+            f"Will use {len(self.scenarios)} scenarios and {len(self.competitors)} competitors "
+            f"({n_to_run} of {n_sessions} negotiations to run"
+            + (f" in shard {shard[0]}/{shard[1]})" if shard else ")")
         )
-        run_index = 0
 
-        for i in track(range(n_repetitions), "Preparing Negotiation Sessions"):
-            competitors = [
-                (get_class(c), p)
-                for c, p in zip(self.competitors, self.competitor_params, strict=True)
-            ]
-            for k, scenario in enumerate(self.scenarios):
-                nedges = len(scenario.edge_ufuns)
-                sname = scenario.name if scenario.name else f"s{k:03}"
-                if not verbose:
-                    print(
-                        f"Repetition {i}: Scenario {sname}. Will run with {len(competitors)} competitors"
+        def generate_jobs() -> Iterator[JobInfo]:
+            """Generates the jobs to run (sessions skipped because of `center_os_limit` are processed directly)."""
+            run_index = 0
+            for i in range(n_repetitions):
+                competitors = [
+                    (get_class(c), p)
+                    for c, p in zip(
+                        self.competitors, self.competitor_params, strict=True
                     )
-                random.shuffle(competitors)
-                # put each competitor in center once per scenario
-                for j in range(len(competitors)):
-                    if len(competitors) >= nedges + 1:
-                        players = [_ for _ in competitors]
-                        # players = competitors[: nedges + 1]
-                    else:
-                        # add extra players at the end if not enough competitors are available
-                        players = competitors + list(
-                            random.choices(
-                                non_competitors if non_competitors else competitors,
-                                k=nedges + 1 - len(competitors),
-                            )
+                ]
+                for k, scenario in enumerate(self.scenarios):
+                    nedges = len(scenario.edge_ufuns)
+                    sname = scenario.name if scenario.name else f"s{k:03}"
+                    if not verbose:
+                        print(
+                            f"Repetition {i}: Scenario {sname}. Will run with {len(competitors)} competitors"
+                        )
+                    rng.shuffle(competitors)
+                    # put each competitor in center once per scenario
+                    for j in range(len(competitors)):
+                        if len(competitors) >= nedges + 1:
+                            players = [_ for _ in competitors]
+                            # players = competitors[: nedges + 1]
+                        else:
+                            # add extra players at the end if not enough competitors are available
+                            pool = non_competitors if non_competitors else competitors
+                            players = competitors + [
+                                pool[_]
+                                for _ in rng.integers(
+                                    len(pool), size=nedges + 1 - len(competitors)
+                                )
+                            ]
+                        # ignore the randomly added edges if no-double-scores is set
+                        nedges_counted = (
+                            nedges
+                            if not no_double_scores
+                            else min(len(competitors) - 1, nedges)
+                        )
+                        if path and tier == OUTPUT_FULL:
+                            output = path / "results" / sname / f"r{i:03}t{j:03}"
+                        else:
+                            output = None
+                        # if verbose:
+                        #     print(f"{j=}, {players=}")
+                        center, center_params = deepcopy(players[0])
+                        edge_info = deepcopy(players[1 : nedges + 1])
+                        # not sure if the following shuffle is useful!
+                        # It tries to randomize the order of the edges to avoid
+                        # having a systematic bias but we randomize competitors anyway.
+                        rng.shuffle(edge_info)
+                        edges = [_[0] for _ in edge_info]
+                        edge_params = [_[1] if _[1] else {} for _ in edge_info]
+                        job = JobInfo(
+                            output,
+                            sname,
+                            i,
+                            j,
+                            k,
+                            center,
+                            center_params,
+                            edges,
+                            edge_params,
+                            edge_info,
+                            nedges_counted,
+                            run_index,
+                            derive_seed(seed, run_index),
+                            path / TRACES_FOLDER_NAME
+                            if path and tier in (OUTPUT_TRACE, OUTPUT_FULL)
+                            else None,
                         )
-                    # ignore the randomly added edges if no-double-scores is set
-                    nedges_counted = (
-                        nedges
-                        if not no_double_scores
-                        else min(len(competitors) - 1, nedges)
-                    )
-                    if path:
-                        output = path / "results" / sname / f"r{i:03}t{j:03}"
-                    else:
-                        output = None
-                    # if verbose:
-                    #     print(f"{j=}, {players=}")
-                    center, center_params = deepcopy(players[0])
-                    edge_info = deepcopy(players[1 : nedges + 1])
-                    # not sure if the following shuffle is useful!
-                    # It tries to randomize the order of the edges to avoid
-                    # having a systematic bias but we randomize competitors anyway.
-                    random.shuffle(edge_info)
-                    edges = [_[0] for _ in edge_info]
-                    edge_params = [_[1] if _[1] else dict() for _ in edge_info]
-                    assigned = assign_scenario(
-                        scenario=scenario,
-                        run_params=self.run_params,
-                        center_type=center,
-                        center_params=center_params,
-                        edge_types=edges,  # type: ignore
-                        edge_params=edge_params,
-                        verbose=verbose,
-                        sample_edges=False,
-                    )
-                    job = JobInfo(
-                        assigned,
-                        output,
-                        sname,
-                        i,
-                        j,
-                        k,
-                        center,
-                        center_params,
-                        edges,
-                        edge_params,
-                        edge_info,
-                        nedges_counted,
-                        run_index,
-                    )
 
-                    if self.run_params.center_os_limit:
-                        cardinality = scenario.center_ufun.outcome_space.cardinality  # type: ignore
-                    else:
-                        cardinality = 0
-                    add_this_job = True
-                    for key, limit in self.run_params.center_os_limit.items():
-                        if (
-                            isinstance(key, str)
-                            and get_full_type_name(center).endswith(key)
-                            or (key == center)
-                        ) and limit < cardinality:
-                            if verbose:
-                                print(
-                                    f"Avoiding running {center} with limit {self.run_params.center_os_limit[key]} for a center os of size {cardinality}"
-                                )  # type: ignore
-                            else:
-                                print(
-                                    f"{center}-{scenario.name}[red]x[/red]",
-                                    end=" ",
-                                    flush=True,
+                        if self.run_params.center_os_limit:
+                            cardinality = scenario.center_ufun.outcome_space.cardinality  # type: ignore
+                        else:
+                            cardinality = 0
+                        add_this_job = (
+                            in_shard(run_index) and run_index not in completed
+                        )
+                        if not add_this_job:
+                            aggregator.add_factors(sname, *factors(job))
+                        for key, limit in self.run_params.center_os_limit.items():
+                            if (
+                                (
+                                    isinstance(key, str)
+                                    and get_full_type_name(center).endswith(key)
+                                    or (key == center)
                                 )
+                                and limit < cardinality
+                                and add_this_job
+                            ):
+                                if verbose:
+                                    print(
+                                        f"Avoiding running {center} with limit {self.run_params.center_os_limit[key]} for a center os of size {cardinality}"
+                                    )  # type: ignore
+                                else:
+                                    print(
+                                        f"{center}-{scenario.name}[red]x[/red]",
+                                        end=" ",
+                                        flush=True,
+                                    )
 
-                            r = SessionResults(
-                                mechanisms=[None]
-                                * len(job.assigned.scenario.edge_ufuns),  # type: ignore
-                                center=None,  # type: ignore
-                                agreements=[None]
-                                * len(job.assigned.scenario.edge_ufuns),
-                                center_utility=0.0,
-                                edge_utilities=[0.0]
-                                * len(job.assigned.scenario.edge_ufuns),  # type: ignore
-                                edges=[None] * len(job.assigned.scenario.edge_ufuns),  # type: ignore
-                                total_time=0,
-                                times=[0] * len(job.assigned.scenario.edge_ufuns),  # type: ignore
-                                run_error=f"Large outcome-space: Avoiding running {center} with limit {self.run_params.center_os_limit[key]} for a center os of size {cardinality}",
-                            )
-                            session_info = SessionInfo(
-                                scenario_name=sname,
-                                repetition=i,
-                                rotation=j,
-                                center_type_name=get_full_type_name(center),
-                                center_params=center_params
-                                if center_params
-                                else dict(),
-                                edge_type_names=[get_full_type_name(_) for _ in edges],
-                                edge_params=edge_params,  # type: ignore
-                                results=r,
+                                session_info = _failed_info(
+                                    job,
+                                    f"Large outcome-space: Avoiding running {center} with limit {self.run_params.center_os_limit[key]} for a center os of size {cardinality}",
+                                )
+                                process_info(job, session_info)
+                                add_this_job = False
+                        if add_this_job:
+                            yield job
+                        run_index += 1
+                        # This rotation guarantees that every competitor is
+                        # the center once per scenario per repetition
+                        competitors = competitors[1:] + [competitors[0]]
+
+        costs = [_scenario_cost(_) for _ in self.scenarios]
+
+        def job_cost(job: JobInfo) -> float:
+            return costs[job.scenario_index]
+
+        def skip(job: JobInfo) -> bool:
+            """Records sessions predicted to exceed their budgets as failed instead of running them."""
+            reason = cost_profile.check(get_full_type_name(job.center), job_cost(job))
+            if reason is None:
+                return False
+            if verbose:
+                print(reason)
+            else:
+                print(f"{job.center}-{job.sname}[red]x[/red]", end=" ", flush=True)
+            process_info(job, _failed_info(job, reason))
+            return True
+
+        def observe(job: JobInfo, info: SessionInfo, cpu: float, memory: float):
+            run_error = info.results.run_error
+            if run_error and run_error.startswith(BUDGET_ERROR_PREFIX):
+                cost_profile.observe_failure(
+                    get_full_type_name(job.center), job_cost(job)
+                )
+            else:
+                cost_profile.observe(
+                    get_full_type_name(job.center), job_cost(job), cpu, memory
+                )
+            process_info(job, info)
+
+        worker_utilization: dict[str, float] = {}
+        if queue is not None:
+            jobs = JobQueue(queue, max_attempts=MAX_SESSION_ATTEMPTS)
+            if not resume:
+                jobs.clear()
+            utilization = WorkerUtilization()
+            try:
+                jobs.set(
+                    "settings",
+                    {
+                        "scenarios": self.scenarios,
+                        "run_params": self.run_params,
+                        "dry": dry,
+                        "verbose": verbose,
+                        "normalize_scores": normalize_scores,
+                        "compact": stream,
+                    },
+                )
+                # workers of a resumed queue must wait for the new sessions
+                jobs.set("sealed", False)
+                batch = []
+                for job in generate_jobs():
+                    if skip(job):
+                        continue
+                    cost = job_cost(job)
+                    # sessions much larger than observed ones run last
+                    if cost_profile.is_uncertain(get_full_type_name(job.center), cost):
+                        cost = -cost
+                    batch.append((job.run_index, job, cost))
+                    if len(batch) >= QUEUE_BATCH_SIZE:
+                        jobs.put(batch)
+                        batch = []
+                jobs.put(batch)
+                jobs.seal()
+                print(f"Added sessions to {queue}. Waiting for workers", flush=True)
+                while True:
+                    finished = jobs.is_finished()
+                    for _, job, result, attempts in jobs.collect():
+                        if result is None:
+                            cost_profile.observe_failure(
+                                get_full_type_name(job.center), job_cost(job)
                             )
-                            process_info(job, session_info)
-                            add_this_job = False
-                    if add_this_job:
-                        jobs.append(job)
-                    run_index += 1
-                    # This rotation guarantees that every competitor is
-                    # the center once per scenario per repetition
-                    competitors = competitors[1:] + [competitors[0]]
-        print(f"Will run {len(jobs)} negotiations (max run-index {run_index - 1})")
-
-        if n_jobs is None:
-            # for job in track(jobs, "Running Negotiations"):
-            for job in jobs:
-                job, info = run_session(job, dry, verbose, normalize_scores)
-                process_info(job, info)
+                            process_info(job, _failed_info(job, _died_error(attempts)))
+                            continue
+                        worker, info, duration, cpu, memory = result
+                        utilization.add(worker, duration)
+                        observe(job, info, cpu, memory)
+                    if finished:
+                        break
+                    sleep(POLL_SECONDS)
+            finally:
+                jobs.close()
+            worker_utilization = utilization.report()
+        elif n_jobs is None:
+            init_worker(self.scenarios, self.run_params)
+            try:
+                for job in generate_jobs():
+                    if skip(job):
+                        continue
+                    _, outputs = run_sessions(
+                        [job], dry, verbose, normalize_scores, compact=stream
+                    )
+                    for job, info, _, cpu, memory in outputs:
+                        observe(job, info, cpu, memory)
+            finally:
+                init_worker((), None)  # type: ignore
         else:
             assert n_jobs > 0
-            try:
-                with ProcessPoolExecutor(max_workers=n_jobs) as executor:
-                    # Submit all jobs and store the futures
-                    futures = [
-                        executor.submit(
-                            run_session, job, dry, verbose, normalize_scores
-                        )
-                        for job in jobs
-                    ]
 
-                    # Process results as they become available
-                    for future in as_completed(futures):
-                        try:
-                            job, info = future.result()
-                            process_info(job, info)
-                        except Exception as e:
-                            print(f"Job failed with exception: {e}")
-            except Exception as e:
-                print(f"Parallel execution failed with error {e}. Continuing")
-
-        sleep(10)
-        # weighted_average_* are the average scores of each agent when they are in the center or edge position
-        weighted_average = {}
-        for agent in acc_scores.keys():
-            weighted_average_edge = (
-                weighted_scores_edge[agent] / count_edge[agent]
-                if count_edge[agent] > 0
-                else 0
-            )
-            weighted_average_center = (
-                weighted_scores_center[agent] / count_center[agent]
-                if count_center[agent] > 0
-                else 0
-            )
-            weighted_average[agent] = 0.5 * (
-                weighted_average_center + weighted_average_edge
+            def job_group(job: JobInfo) -> tuple[int, str]:
+                return job.scenario_index, get_full_type_name(job.center)
+
+            def defer(job: JobInfo) -> bool:
+                return cost_profile.is_uncertain(
+                    get_full_type_name(job.center), job_cost(job)
+                )
+
+            scheduler = JobScheduler(
+                generate_jobs(), group=job_group, cost=job_cost, defer=defer, skip=skip
             )
-        # total count for each agent
-        count: dict[str, float] = dict()
-        for k, v in count_edge.items():
-            count[k] = v
-        for k, v in count_center.items():
-            count[k] += v
+            utilization = WorkerUtilization()
+            # workers report the sessions they start so that we know which sessions
+            # were running when a worker process died
+            started = get_context().SimpleQueue()
+            running: dict[int, int] = {}
+            # chunks lost with a broken pool without running (submitted again as they are)
+            requeued: list[list[JobInfo]] = []
+            # sessions running when a worker died. They run alone in their own worker
+            # so that only the session killing it is charged an attempt
+            suspects: list[JobInfo] = []
+            attempts: dict[int, int] = defaultdict(int)
 
-        return TournamentResults(
-            final_scores={k: v for k, v in acc_scores.items()},
-            edge_count={k: v for k, v in count_edge.items()},
-            center_count={k: v for k, v in count_center.items()},
-            final_scoresC={k: v for k, v in weighted_scores_center.items()},
-            final_scoresE={k: v for k, v in weighted_scores_edge.items()},
-            weighted_average={k: v for k, v in weighted_average.items()},
-            center_factor={k: v for k, v in center_factor.items()},
-            edge_factor={k: v for k, v in edge_factor.items()},
-            raw_scores={k: v for k, v in raw_scores.items()},
-            unweighted_average={
-                k: (v / count[k]) if count[k] else v for k, v in acc_scores.items()
-            },
-            scores=scores,
-            session_results=results,
-            path=path,
+            def new_pool(n: int) -> ProcessPoolExecutor:
+                # scenarios are sent once to each worker and jobs refer to them by index
+                return ProcessPoolExecutor(
+                    max_workers=n,
+                    initializer=init_worker,
+                    initargs=(self.scenarios, self.run_params, started),
+                )
+
+            def submit(pool: ProcessPoolExecutor, chunk: list[JobInfo]) -> Future:
+                return pool.submit(
+                    run_sessions, chunk, dry, verbose, normalize_scores, compact=stream
+                )
+
+            def update_running() -> None:
+                while not started.empty():
+                    pid, run_index = started.get()
+                    running[pid] = run_index
+
+            def charge(job: JobInfo) -> None:
+                """Counts an attempt of a session that killed its worker process."""
+                attempts[job.run_index] += 1
+                if attempts[job.run_index] < MAX_SESSION_ATTEMPTS:
+                    suspects.append(job)
+                    return
+                cost_profile.observe_failure(
+                    get_full_type_name(job.center), job_cost(job)
+                )
+                process_info(
+                    job, _failed_info(job, _died_error(attempts[job.run_index]))
+                )
+
+            def collect(future: Future, chunk: list[JobInfo]) -> bool:
+                """Processes the results of a chunk. Returns `False` if the worker running it died."""
+                try:
+                    pid, outputs = future.result()
+                except BrokenProcessPool:
+                    return False
+                except Exception as e:
+                    # the sessions may have run but their results are lost
+                    print(
+                        f"[red]Failed to get the results of {len(chunk)} sessions[/red]: {e}",
+                        flush=True,
+                    )
+                    for job in chunk:
+                        process_info(job, _failed_info(job, f"{type(e).__name__}: {e}"))
+                    return True
+                for job, info, duration, cpu, memory in outputs:
+                    scheduler.model.observe(job_group(job), job_cost(job), duration)
+                    utilization.add(pid, duration)
+                    observe(job, info, cpu, memory)
+                if running.get(pid, None) in {_.run_index for _ in chunk}:
+                    del running[pid]
+                return True
+
+            # jobs are generated while running and only a bounded number
+            # of them is submitted at any time to keep memory flat
+            max_pending = n_jobs * MAX_PENDING_JOBS_PER_WORKER
+            pool, isolated = new_pool(n_jobs), None
+            pending: dict[Future, list[JobInfo]] = {}
+            isolated_pending: dict[Future, JobInfo] = {}
+            try:
+                while True:
+                    lost: list[list[JobInfo]] = []
+                    broken = False
+                    while len(pending) < max_pending:
+                        chunk = requeued.pop(0) if requeued else scheduler.next_chunk()
+                        if not chunk:
+                            break
+                        try:
+                            pending[submit(pool, chunk)] = chunk
+                        except BrokenProcessPool:
+                            # never started so it is not suspected of killing the worker
+                            requeued.insert(0, chunk)
+                            broken = True
+                            break
+                    if suspects and not isolated_pending:
+                        if isolated is None:
+                            isolated = new_pool(1)
+                        job = suspects.pop(0)
+                        isolated_pending[submit(isolated, [job])] = job
+                    if not pending and not isolated_pending and not broken:
+                        break
+                    done = set()
+                    if not broken:
+                        done, _ = wait(
+                            list(pending) + list(isolated_pending),
+                            return_when=FIRST_COMPLETED,
+                        )
+                    update_running()
+                    for future in done:
+                        if future in isolated_pending:
+                            job = isolated_pending.pop(future)
+                            if not collect(future, [job]):
+                                # the session was running alone so it killed the worker
+                                charge(job)
+                                isolated.shutdown()  # type: ignore
+                                isolated = None
+                            continue
+                        chunk = pending.pop(future)
+                        if not collect(future, chunk):
+                            lost.append(chunk)
+                    if not lost and not broken:
+                        continue
+                    # a dead worker breaks the pool and everything still pending in it
+                    wait(pending)
+                    update_running()
+                    lost += [c for f, c in pending.items() if not collect(f, c)]
+                    pending.clear()
+                    suspected = set(running.values())
+                    if not suspected & {_.run_index for c in lost for _ in c}:
+                        # the worker died outside sessions so any of them may be the cause
+                        suspected = {_.run_index for c in lost for _ in c}
+                    for chunk in lost:
+                        suspects.extend(_ for _ in chunk if _.run_index in suspected)
+                        rest = [_ for _ in chunk if _.run_index not in suspected]
+                        if rest:
+                            requeued.append(rest)
+                    running.clear()
+                    pool.shutdown()
+                    pool = new_pool(n_jobs)
+                    print(
+                        "[yellow]A worker process died. Restarting the process pool[/yellow]",
+                        flush=True,
+                    )
+            finally:
+                pool.shutdown(cancel_futures=True)
+                if isolated is not None:
+                    isolated.shutdown(cancel_futures=True)
+            worker_utilization = utilization.report()
+            if worker_utilization:
+                values = list(worker_utilization.values())
+                print(
+                    f"Worker utilization: {sum(values) / len(values):.0%} on average "
+                    f"({min(values):.0%} to {max(values):.0%}) over {len(values)} workers"
+                )
+
+        # shutting the pools down waits for all workers. We just need to make
+        # sure that everything printed so far is visible.
+        sys.stdout.flush()
+        sys.stderr.flush()
+        tournament_results = aggregator.results(
+            scores=scores, session_results=results, path=path
         )
+        tournament_results.worker_utilization = worker_utilization
+        if profile is not None:
+            cost_profile.save(profile)
+        return tournament_results
@@ -0,0 +1,262 @@
+import atexit
+import os
+import socket
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from negmas.helpers import unique_name
+from negmas.outcomes import Outcome, OutcomeSpace
+from negmas.sao import SAOMechanism
+
+__all__ = [
+    "NO_OFFER",
+    "TRACES_FOLDER_NAME",
+    "TRACE_FILE_SUFFIX",
+    "TRACE_SCHEMA",
+    "UNKNOWN_OFFER",
+    "TraceReader",
+    "TraceWriter",
+    "trace_writer",
+]
+
+TRACES_FOLDER_NAME = "traces"
+"""Folder (inside a tournament path) to store negotiation traces in"""
+TRACE_FILE_SUFFIX = ".arrow"
+"""Suffix of trace files (Arrow IPC streams)"""
+NO_OFFER = 0
+"""The offer index used when no offer was made"""
+UNKNOWN_OFFER = -1
+"""The offer index used for offers not in an enumerable outcome-space"""
+TRACE_SCHEMA = pa.schema(
+    [
+        ("session", pa.string()),
+        ("thread", pa.int32()),
+        ("mechanism", pa.string()),
+        ("step", pa.int32()),
+        ("time", pa.float64()),
+        ("relative_time", pa.float64()),
+        ("negotiator", pa.string()),
+        ("offer", pa.int64()),
+        ("accepted_by", pa.list_(pa.string())),
+        ("state", pa.string()),
+        ("text", pa.string()),
+        ("proposer_utility", pa.float64()),
+        ("center_utility", pa.float64()),
+        ("edge_utility", pa.float64()),
+    ]
+)
+"""Columns of trace files (one row per offer in every negotiation thread)"""
+
+
+class TraceWriter:
+    """
+    Appends the traces of negotiation threads to a compressed columnar file.
+
+    Args:
+        path: The file to write (created on the first write).
+
+    Remarks:
+        - Every thread is written as a single record batch of an Arrow IPC stream compressed with zstd and flushed
+          immediately so that traces of completed threads survive a crash of the process.
+        - Offers are stored as their index in the enumerated outcome-space of the thread starting from one
+          (`NO_OFFER` if no offer was made, `UNKNOWN_OFFER` if the outcome-space cannot be enumerated). Use
+          `TraceReader` to get them back as outcomes.
+        - The utilities of every offer for the center (its side ufun) and the edge are stored with it.
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._sink: Any = None
+        self._writer: pa.ipc.RecordBatchStreamWriter | None = None
+        # outcome-space id -> (outcome-space, outcome -> index)
+        self._indices: dict[int, tuple[OutcomeSpace, dict[Outcome, int] | None]] = {}
+
+    def _offer_indices(self, os: OutcomeSpace | None) -> dict[Outcome, int] | None:
+        if os is None:
+            return None
+        cached = self._indices.get(id(os), None)
+        if cached is not None and cached[0] is os:
+            return cached[1]
+        try:
+            indices = {o: i + 1 for i, o in enumerate(os.enumerate())}  # type: ignore
+        except Exception:
+            indices = None
+        self._indices[id(os)] = (os, indices)
+        return indices
+
+    def batch(
+        self, session: str, thread: int, mechanism: SAOMechanism
+    ) -> pa.RecordBatch:
+        """Returns the trace of a negotiation thread (center first then edge negotiator) without writing it"""
+        indices = self._offer_indices(mechanism.outcome_space)
+        ufuns = {n.id: n.ufun for n in mechanism.negotiators}
+        center, edge = (
+            mechanism.negotiators[0].ufun,
+            mechanism.negotiators[-1].ufun,
+        )
+
+        def utility(ufun, offer) -> float | None:
+            if ufun is None or offer is None:
+                return None
+            try:
+                return float(ufun(offer))
+            except Exception:
+                return None
+
+        columns: dict[str, list] = {_: [] for _ in TRACE_SCHEMA.names}
+        for e in mechanism.full_trace:
+            offer = e.offer
+            columns["step"].append(e.step)
+            columns["time"].append(e.time)
+            columns["relative_time"].append(e.relative_time)
+            columns["negotiator"].append(e.negotiator)
+            columns["offer"].append(
+                NO_OFFER
+                if offer is None
+                else (
+                    indices.get(offer, UNKNOWN_OFFER)
+                    if indices is not None
+                    else UNKNOWN_OFFER
+                )
+            )
+            columns["accepted_by"].append(list(e.responses.keys()))
+            columns["state"].append(e.state)
+            columns["text"].append(getattr(e, "text", None))
+            columns["proposer_utility"].append(
+                utility(ufuns.get(e.negotiator, None), offer)
+            )
+            columns["center_utility"].append(utility(center, offer))
+            columns["edge_utility"].append(utility(edge, offer))
+        n = len(columns["step"])
+        columns["session"] = [session] * n
+        columns["thread"] = [thread] * n
+        columns["mechanism"] = [mechanism.id] * n
+        return pa.RecordBatch.from_pydict(columns, schema=TRACE_SCHEMA)
+
+    def add(self, session: str, thread: int, mechanism: SAOMechanism) -> pa.RecordBatch:
+        """Writes the trace of a negotiation thread (center first then edge negotiator) and returns it"""
+        batch = self.batch(session, thread, mechanism)
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._sink = pa.OSFile(str(self.path), "wb")
+            self._writer = pa.ipc.new_stream(
+                self._sink,
+                TRACE_SCHEMA,
+                options=pa.ipc.IpcWriteOptions(compression="zstd"),
+            )
+        self._writer.write_batch(batch)
+        self._sink.flush()
+        return batch
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+            self._writer = self._sink = None
+
+
+_writers: dict[tuple[int, Path], TraceWriter] = {}
+
+
+def trace_writer(folder: Path | str) -> TraceWriter:
+    """Returns the trace writer of the current process for the given folder.
+
+    Remarks:
+        - All sessions run by a process write to the same file in the folder. Files are named after
+          the host and process so that workers on several machines can share the folder.
+        - Writers are closed when the process exits.
+    """
+    key = (os.getpid(), Path(folder).resolve())
+    writer = _writers.get(key, None)
+    if writer is None:
+        name = unique_name(f"{socket.gethostname()}-{os.getpid()}", sep="-")
+        writer = _writers[key] = TraceWriter(
+            Path(folder) / f"{name}{TRACE_FILE_SUFFIX}"
+        )
+    return writer
+
+
+@atexit.register
+def _close_writers() -> None:
+    for key, writer in list(_writers.items()):
+        if key[0] == os.getpid():
+            writer.close()
+    _writers.clear()
+
+
+class TraceReader:
+    """
+    Reads traces written by `TraceWriter`.
+
+    Args:
+        path: A trace file or a folder of trace files (e.g. the `TRACES_FOLDER_NAME` folder of a tournament).
+
+    Remarks:
+        - Files are read lazily and can be read while they are still being written (incomplete threads are ignored).
+    """
+
+    def __init__(self, path: Path | str):
+        path = Path(path)
+        self.files = (
+            sorted(path.glob(f"*{TRACE_FILE_SUFFIX}")) if path.is_dir() else [path]
+        )
+        self._table: pa.Table | None = None
+
+    @classmethod
+    def _read(cls, path: Path) -> Iterable[pa.RecordBatch]:
+        try:
+            with pa.ipc.open_stream(pa.memory_map(str(path))) as reader:
+                while True:
+                    try:
+                        yield reader.read_next_batch()
+                    except StopIteration:
+                        return
+        except (pa.ArrowInvalid, OSError):
+            # the writer did not finish (e.g. it was killed while writing)
+            return
+
+    @property
+    def table(self) -> pa.Table:
+        """All traces as an Arrow table"""
+        if self._table is None:
+            batches = [b for f in self.files for b in self._read(f)]
+            self._table = pa.Table.from_batches(batches, schema=TRACE_SCHEMA)
+        return self._table
+
+    def sessions(self) -> list[str]:
+        """The names of all sessions with traces"""
+        return sorted(set(self.table.column("session").to_pylist()))
+
+    def to_pandas(self) -> pd.DataFrame:
+        """All traces as a data-frame (with offer indices)"""
+        return self.table.to_pandas()
+
+    def trace(
+        self,
+        session: str,
+        thread: int | None = None,
+        outcome_space: OutcomeSpace | None = None,
+    ) -> pd.DataFrame:
+        """Returns the trace of a session (or a single thread of it).
+
+        Args:
+            session: The session name.
+            thread: The thread index (all threads if not given).
+            outcome_space: If given, offers are converted from indices to outcomes
+                           (`None` for no offer or unknown offers).
+        """
+        table = self.table
+        mask = pc.equal(table.column("session"), session)
+        if thread is not None:
+            mask = pc.and_(mask, pc.equal(table.column("thread"), thread))
+        df = table.filter(mask).to_pandas()
+        if outcome_space is not None:
+            outcomes = list(outcome_space.enumerate())  # type: ignore
+            df["offer"] = [
+                outcomes[i - 1] if 0 < i <= len(outcomes) else None for i in df["offer"]
+            ]
+        return df
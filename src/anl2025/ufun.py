@@ -1,12 +1,14 @@
+import heapq
 from abc import ABC, abstractmethod
 from copy import deepcopy
 from attrs import define, field
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from collections.abc import Hashable
 from typing import Any, Iterable, Protocol
 from negmas.inout import get_full_type_name
 from negmas.outcomes.optional_issue import OptionalIssue
 from negmas.serialization import serialize, deserialize
-from collections.abc import Sequence, Callable
+from collections.abc import Mapping, Sequence, Callable
 from enum import Enum
 from typing import TypeVar
 from negmas.preferences import UtilityFunction, BaseUtilityFunction
@@ -20,7 +22,7 @@ from negmas.outcomes import (
 )
 from negmas.warnings import warn
 import numpy as np
-from anl2025.common import TYPE_IDENTIFIER
+from anl2025.common import TYPE_IDENTIFIER, make_rng
 
 TRACE_COLS = (
     "time",
@@ -35,6 +37,7 @@ TRACE_COLS = (
 __all__ = [
     "CenterUFunCategory",
     "CenterUFun",
+    "CompiledEvaluator",
     "FlatCenterUFun",
     "LambdaCenterUFun",
     "LambdaUtilityFunction",
@@ -48,6 +51,8 @@ __all__ = [
     "HierarchicalCombiner",
     "DefaultCombiner",
     "OSCombiner",
+    "OutcomeEncoding",
+    "EvalCache",
     "convert_to_center_ufun",
     "make_side_ufun",
 ]
@@ -147,26 +152,113 @@ def _calc_n_issues(outcome_spaces: tuple[OutcomeSpace, ...]):
     )
 
 
+def is_index(x: Any) -> bool:
+    """Checks whether the given outcome is an integer index (see `OutcomeEncoding`)."""
+    return isinstance(x, (int, np.integer)) and not isinstance(x, bool)
+
+
 def is_separated(x: Outcome | tuple[Outcome | None, ...]) -> bool:
     if x is None:
         return True
-    if all(_ is None for _ in x):
-        return True
-    types = set(type(_) for _ in x if _ is not None)
-    if all(issubclass(_, tuple) for _ in types):
-        return True
-    return False
+    for _ in x:
+        if _ is not None and not isinstance(_, tuple):
+            return False
+    return True
 
 
 def is_combined(x: Outcome | tuple[Outcome | None, ...]) -> bool:
     if x is None:
         return True
-    if any(_ is None for _ in x):
-        return False
-    types = set(type(_) for _ in x if _ is not None)
-    if all(issubclass(_, tuple) for _ in types):
-        return False
-    return True
+    all_tuples = True
+    for _ in x:
+        if _ is None:
+            return False
+        if not isinstance(_, tuple):
+            all_tuples = False
+    return not all_tuples
+
+
+class OutcomeEncoding:
+    """
+    Encodes the outcomes of a set of negotiation threads as integers.
+
+    Remarks:
+        - Each thread is a digit of a mixed-radix number with `0` standing for `None` (disagreement)
+          and `k` standing for the k-th outcome of the thread's outcome-space.
+        - The first thread is the most significant digit so indices follow the order
+          of `outcome_space.enumerate()` when a `HierarchicalCombiner` is used.
+        - Raises `ValueError` if any outcome-space is not enumerable.
+        - If the number of outcomes does not fit in a 64-bit integer, only digits are available (`strides` is `None`).
+    """
+
+    def __init__(self, outcome_spaces: Sequence[OutcomeSpace]):
+        try:
+            outcomes = tuple(list(os.enumerate()) for os in outcome_spaces)  # type: ignore
+        except Exception as e:
+            raise ValueError(f"Outcome-spaces are not enumerable: {e}") from e
+        if not outcomes:
+            raise ValueError("No outcome-spaces to encode")
+        self.thread_outcomes: tuple[list[Outcome], ...] = outcomes
+        self.thread_digits: tuple[dict[Outcome, int], ...] = tuple(
+            {o: d + 1 for d, o in enumerate(_)} for _ in outcomes
+        )
+        self.radices = np.asarray([len(_) + 1 for _ in outcomes], dtype=np.int64)
+        self.n_outcomes: int = int(np.prod(self.radices.astype(object)))
+        self.strides: np.ndarray | None = None
+        if self.n_outcomes < np.iinfo(np.int64).max:
+            strides = np.ones_like(self.radices)
+            for i in range(len(strides) - 2, -1, -1):
+                strides[i] = strides[i + 1] * self.radices[i + 1]
+            self.strides = strides
+
+    def encode(self, outcomes: tuple[Outcome | None, ...] | None) -> int:
+        """Converts separated outcomes (one per thread) to an index."""
+        if self.strides is None:
+            raise ValueError(f"Too many outcomes to encode ({self.n_outcomes})")
+        if not outcomes:
+            return 0
+        index = 0
+        for o, digits, stride in zip(
+            outcomes, self.thread_digits, self.strides, strict=True
+        ):
+            if o is None:
+                continue
+            index += digits[o] * int(stride)
+        return index
+
+    def digits(self, indices: np.ndarray) -> np.ndarray:
+        """Returns a (n_outcomes, n_threads) array with the digit of every thread."""
+        if self.strides is None:
+            raise ValueError(f"Too many outcomes to decode ({self.n_outcomes})")
+        return (indices[:, None] // self.strides[None, :]) % self.radices[None, :]
+
+    def outcomes(self, digits: Sequence[int]) -> tuple[Outcome | None, ...]:
+        """Converts the digits of every thread to separated outcomes."""
+        return tuple(
+            None if d == 0 else os[d - 1] for d, os in zip(digits, self.thread_outcomes)
+        )
+
+    def decode(self, index: int) -> tuple[Outcome | None, ...]:
+        """Converts an index to separated outcomes (one per thread)."""
+        return self.outcomes(
+            self.digits(np.asarray([index], dtype=np.int64))[0].tolist()
+        )
+
+
+def _make_encoding(combiner: "OSCombiner") -> OutcomeEncoding | None:
+    if combiner._encoding is None and not combiner._encoding_failed:
+        try:
+            combiner._encoding = OutcomeEncoding(combiner.outcome_spaces)
+        except ValueError:
+            combiner._encoding_failed = True
+    return combiner._encoding
+
+
+def _decode(combiner: "OSCombiner", index: int) -> tuple[Outcome | None, ...]:
+    encoding = _make_encoding(combiner)
+    if encoding is None:
+        raise ValueError("Cannot decode outcomes: outcome-spaces are not enumerable")
+    return encoding.decode(index)
 
 
 @define
@@ -175,6 +267,8 @@ class FlatteningCombiner(OSCombiner):
     issue_name_format: str = "%osname%:%issuename%"
     combined_name: str = "combined"
     outcome_space: CartesianOutcomeSpace = field(init=False, default=None)
+    _encoding: OutcomeEncoding | None = field(init=False, default=None, repr=False)
+    _encoding_failed: bool = field(init=False, default=False, repr=False)
 
     def __attrs_post_init__(self):
         def _name(i: int, os_name: str | None, issue_name: str | None) -> str:
@@ -212,9 +306,15 @@ class FlatteningCombiner(OSCombiner):
     def combined_space(self) -> CartesianOutcomeSpace:
         return self.outcome_space
 
+    def encoding(self) -> OutcomeEncoding | None:
+        """The integer encoding of outcomes (`None` if the outcome-spaces are not enumerable)."""
+        return _make_encoding(self)
+
     def combined_outcome(
-        self, outcomes: tuple[Outcome | None, ...] | Outcome | None
+        self, outcomes: tuple[Outcome | None, ...] | Outcome | int | None
     ) -> Outcome | None:
+        if is_index(outcomes):
+            outcomes = self.separated_outcomes(outcomes)
         if not outcomes:
             return outcomes
         if is_combined(outcomes):
@@ -228,8 +328,10 @@ class FlatteningCombiner(OSCombiner):
         return tuple(values)
 
     def separated_outcomes(
-        self, outcome: Outcome | None
+        self, outcome: Outcome | int | None
     ) -> tuple[Outcome | None, ...] | None:
+        if is_index(outcome):
+            return _decode(self, outcome)  # type: ignore
         if not outcome:
             return outcome
         if is_separated(outcome):
@@ -253,6 +355,8 @@ class HierarchicalCombiner(OSCombiner):
     issue_name_format: str = "agreement%index%"
     combined_name: str = "combined"
     outcome_space: CartesianOutcomeSpace = field(init=False, default=None)
+    _encoding: OutcomeEncoding | None = field(init=False, default=None, repr=False)
+    _encoding_failed: bool = field(init=False, default=False, repr=False)
 
     def __attrs_post_init__(self):
         def _name(i: int, os_name: str | None) -> str:
@@ -278,14 +382,22 @@ class HierarchicalCombiner(OSCombiner):
     def combined_space(self) -> CartesianOutcomeSpace:
         return self.outcome_space
 
+    def encoding(self) -> OutcomeEncoding | None:
+        """The integer encoding of outcomes (`None` if the outcome-spaces are not enumerable)."""
+        return _make_encoding(self)
+
     def combined_outcome(
-        self, outcomes: tuple[Outcome | None, ...] | Outcome | None
+        self, outcomes: tuple[Outcome | None, ...] | Outcome | int | None
     ) -> Outcome | None:
+        if is_index(outcomes):
+            return _decode(self, outcomes)  # type: ignore
         return outcomes
 
     def separated_outcomes(
-        self, outcome: Outcome | None
+        self, outcome: Outcome | int | None
     ) -> tuple[Outcome | None, ...] | None:
+        if is_index(outcome):
+            return _decode(self, outcome)  # type: ignore
         return outcome
 
 
@@ -315,6 +427,71 @@ def convert_to_center_ufun(
     )
 
 
+_MISSING = object()
+
+
+class EvalCache:
+    """
+    A least-recently-used cache of utility values with hit/miss counters.
+
+    Args:
+        maxsize: Maximum number of cached values. `None` means unbounded.
+
+    Remarks:
+        - Unhashable keys are never cached (they count as misses).
+    """
+
+    def __init__(self, maxsize: int | None = None):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._values: OrderedDict[Hashable, float] = OrderedDict()
+
+    def get(self, key: Hashable) -> float | None:
+        """Returns the cached value for the key or `None` if it is not cached."""
+        try:
+            value = self._values.get(key, _MISSING)
+        except TypeError:
+            value = _MISSING
+        if value is _MISSING:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.maxsize is not None:
+            self._values.move_to_end(key)
+        return value  # type: ignore
+
+    def put(self, key: Hashable, value: float) -> None:
+        """Caches a value (evicting the least recently used one if full)."""
+        try:
+            self._values[key] = value
+        except TypeError:
+            return
+        if self.maxsize is not None:
+            self._values.move_to_end(key)
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+
+    def clear(self) -> None:
+        """Removes all cached values (counters are kept)."""
+        self._values.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = 0
+
+    def info(self) -> dict[str, int | None]:
+        """Returns the hits, misses, current size and maximum size of the cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._values),
+            "maxsize": self.maxsize,
+        }
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
 class CenterUFun(UtilityFunction, ABC):
     """
     Base class of center utility functions.
@@ -322,8 +499,19 @@ class CenterUFun(UtilityFunction, ABC):
     Remarks:
         - Can be constructed by either passing a single `outcome_space` and `n_edges` or a tuple of `outcome_spaces`
         - It's eval() method  receives a tuple of negotiation results and returns a float
+        - Outcomes can be integer-encoded (see `encode_outcome`) and evaluated in batches using `eval_batch`.
+          For enumerable outcome-spaces with at most `max_table_size` outcomes, a utility table is materialized
+          lazily and used for `minmax`, `extreme_outcomes` and ranking.
+        - Passing a positive `cache_size` memoizes `eval_with_expected` (and the side ufuns) for stationary
+          ufuns in an `EvalCache` that is cleared whenever an expected outcome or the reserved value is set
+          (including by `restore_state`). Nothing is memoized with the default `cache_size` of zero.
     """
 
+    max_table_size: int = 5_000_000
+    """Maximum number of outcomes for which a utility table is materialized"""
+    batch_size: int = 100_000
+    """Number of outcomes evaluated together when no utility table is available"""
+
     def __init__(
         self,
         *args,
@@ -336,9 +524,12 @@ class CenterUFun(UtilityFunction, ABC):
         stationary: bool = True,
         stationary_sides: bool | None = None,
         side_ufuns: tuple[BaseUtilityFunction | None, ...] | None = None,
+        cache_size: int = 0,
         **kwargs,
     ):
         super().__init__(*args, **kwargs)
+        self._cache_size = cache_size
+        self._eval_cache = EvalCache(cache_size) if cache_size > 0 else None
         if not outcome_spaces and self.outcome_space:
             # Give each negotiation thread its own copy of the outcome space
             # rather than sharing a single object across all of them.
@@ -368,6 +559,15 @@ class CenterUFun(UtilityFunction, ABC):
             if expected_outcomes
             else ([None for _ in range(self.n_edges)])
         )
+        # incremented whenever an expected outcome or the reserved value changes (used to invalidate caches)
+        self._expected_version = 0
+        # integer encoding of outcomes and the utility table (both created lazily)
+        self._thread_outcomes: tuple[list[Outcome], ...] | None = None
+        self._thread_digits: tuple[dict[Outcome, int], ...] | None = None
+        self._radices: np.ndarray | None = None
+        self._strides: np.ndarray | None = None
+        self._own_encoding: OutcomeEncoding | None = None
+        self._utility_table: np.ndarray | None = None
 
         if side_ufuns is None:
             ufuns = tuple(None for _ in range(self.n_edges))
@@ -380,17 +580,98 @@ class CenterUFun(UtilityFunction, ABC):
     def is_stationary(self) -> bool:
         return self.stationary
 
+    @property
+    def reserved_value(self) -> float:
+        return BaseUtilityFunction.reserved_value.fget(self)  # type: ignore
+
+    @reserved_value.setter
+    def reserved_value(self, value: float) -> None:
+        BaseUtilityFunction.reserved_value.fset(self, value)  # type: ignore
+        # may be set by the base class before caches exist
+        if hasattr(self, "_expected_version"):
+            self._invalidate_caches()
+
+    def _invalidate_caches(self) -> None:
+        """Invalidates memoized utilities of the center and its side ufuns."""
+        self._expected_version += 1
+        if self._eval_cache is not None:
+            self._eval_cache.clear()
+
     def set_expected_outcome(self, index: int, outcome: Outcome | None) -> None:
         # print(f"Setting expected outcome for {index} to {outcome}")
         self._expected[index] = outcome
+        self._invalidate_caches()
         # print(f"{self._expected}")
 
+    @property
+    def eval_cache(self) -> EvalCache | None:
+        """The cache of `eval_with_expected` (`None` unless a positive `cache_size` was given)."""
+        return self._eval_cache
+
+    @property
+    def cache_size(self) -> int:
+        """Maximum number of memoized utilities (zero disables memoization)."""
+        return self._cache_size
+
+    @cache_size.setter
+    def cache_size(self, value: int) -> None:
+        self._cache_size = value
+        self._eval_cache = EvalCache(value) if value > 0 else None
+        for side in self._effective_side_ufuns:
+            if isinstance(side, SideUFun):
+                side.clear_cache()
+
+    def save_state(self) -> dict[str, Any]:
+        """Returns a snapshot of the state negotiators can change (see `restore_state`).
+
+        Remarks:
+            - The snapshot covers expected outcomes, stationarity flags and the reserved values
+              of the center and its side ufuns.
+        """
+        return {
+            "expected": list(self._expected),
+            "reserved_value": self._reserved_value,
+            "stationary": self.stationary,
+            "stationary_sides": self.stationary_sides,
+            "sides": [_reserved_state(_) for _ in self._effective_side_ufuns],
+        }
+
+    def restore_state(self, state: dict[str, Any]) -> None:
+        """Restores a snapshot returned by `save_state`."""
+        self._expected = list(state["expected"])
+        self._reserved_value = state["reserved_value"]
+        self._invalidate_caches()
+        self.stationary = state["stationary"]
+        self.stationary_sides = state["stationary_sides"]
+        for side, side_state in zip(self._effective_side_ufuns, state["sides"]):
+            _restore_reserved_state(side, side_state)
+
     @property
     def outcome_spaces(self) -> tuple[OutcomeSpace, ...]:
         return self._outcome_spaces
 
-    def eval_with_expected(self, offer: Outcome | None, use_expected=True) -> float:
+    def eval_with_expected(
+        self, offer: Outcome | int | None, use_expected=True
+    ) -> float:
         """Calculates the utility of a set of offers with control over whether or not to use stored expected outcomes."""
+        cache = self._eval_cache
+        if cache is None or not self.stationary:
+            return self._eval_with_expected(offer, use_expected)
+        key = (offer, tuple(self._expected) if use_expected else None)
+        u = cache.get(key)
+        if u is None:
+            u = self._eval_with_expected(offer, use_expected)
+            cache.put(key, u)
+        return u
+
+    def _eval_with_expected(
+        self, offer: Outcome | int | None, use_expected: bool
+    ) -> float:
+        if is_index(offer):
+            # indices are only decoded if the utility table is not available
+            if self._utility_table is not None:
+                return float(self.eval_batch([offer], use_expected=use_expected)[0])  # type: ignore
+            offer = self.decode_outcome(offer)  # type: ignore
         outcomes = self._combiner.separated_outcomes(offer)
         if outcomes:
             if use_expected:
@@ -404,13 +685,363 @@ class CenterUFun(UtilityFunction, ABC):
             return self.reserved_value
         return self.eval(outcomes)
 
-    def __call__(self, offer: Outcome | None, use_expected=True) -> float:
+    def __call__(self, offer: Outcome | int | None, use_expected=True) -> float:
         """Entry point to calculate the utility of a set of offers (called by the mechanism).
 
         Override to avoid using expected outcomes."""
 
         return self.eval_with_expected(offer, use_expected=use_expected)
 
+    def _ensure_encoding(self) -> bool:
+        """Prepares the integer encoding of outcomes. Returns `False` if the outcome-spaces are not enumerable
+        or the number of outcomes does not fit in a 64-bit integer."""
+        return self._ensure_digits() and self._strides is not None
+
+    def _ensure_digits(self) -> bool:
+        """Prepares the digits of the outcomes of every thread. Returns `False` if the outcome-spaces are not enumerable."""
+        if self._radices is not None:
+            return True
+        encoding = self.encoding()
+        if encoding is None:
+            return False
+        self._thread_outcomes = encoding.thread_outcomes
+        self._thread_digits = encoding.thread_digits
+        self._radices, self._strides = encoding.radices, encoding.strides
+        return True
+
+    def encoding(self) -> OutcomeEncoding | None:
+        """The integer encoding of outcomes (shared with the combiner) or `None` if the outcome-spaces are not enumerable."""
+        encoding = getattr(self._combiner, "encoding", None)
+        if encoding is not None:
+            return encoding()
+        if self._own_encoding is None:
+            try:
+                self._own_encoding = OutcomeEncoding(self._outcome_spaces)
+            except ValueError:
+                return None
+        return self._own_encoding
+
+    @property
+    def n_combined_outcomes(self) -> int:
+        """Number of integer-encoded outcomes (including partial agreements) or zero if not enumerable."""
+        if not self._ensure_encoding():
+            return 0
+        return int(np.prod(self._radices, dtype=object))  # type: ignore
+
+    def encode_outcome(
+        self, outcome: Outcome | tuple[Outcome | None, ...] | int | None
+    ) -> int:
+        """Converts an outcome to its integer index (see `OutcomeEncoding`).
+
+        Remarks:
+            - Indices can be passed anywhere an outcome is expected (e.g. `__call__`, `eval`).
+        """
+        if not self._ensure_encoding():
+            raise ValueError(
+                f"Cannot encode outcomes of {self.name}: outcome-spaces are not enumerable"
+            )
+        if is_index(outcome):
+            return int(outcome)  # type: ignore
+        return self.encoding().encode(self._combiner.separated_outcomes(outcome))  # type: ignore
+
+    def decode_outcome(self, index: int) -> Outcome | None:
+        """Converts an integer index (see `encode_outcome`) back to a (combined) outcome."""
+        if not self._ensure_encoding():
+            raise ValueError(
+                f"Cannot decode outcomes of {self.name}: outcome-spaces are not enumerable"
+            )
+        return self._combiner.combined_outcome(self.encoding().decode(index))  # type: ignore
+
+    def _outcome_from_digits(self, digits: Sequence[int]) -> Outcome | None:
+        return self._combiner.combined_outcome(self.encoding().outcomes(digits))  # type: ignore
+
+    def _digits(self, indices: np.ndarray) -> np.ndarray:
+        """Returns a (n_outcomes, n_edges) array with the digit of every thread."""
+        return self.encoding().digits(indices)  # type: ignore
+
+    def _eval_digits(self, digits: np.ndarray) -> np.ndarray:
+        """Evaluates a batch of outcomes given as thread digits ignoring expected outcomes.
+
+        Remarks:
+            - This default implementation calls `eval` for every row. Subclasses
+              override it to provide vectorized evaluation.
+        """
+        outcomes = self._thread_outcomes
+        return np.fromiter(
+            (
+                self.eval(
+                    tuple(
+                        None if d == 0 else os[d - 1]
+                        for d, os in zip(row, outcomes)  # type: ignore
+                    )
+                )
+                for row in digits.tolist()
+            ),
+            dtype=float,
+            count=len(digits),
+        )
+
+    def _substitute_expected(self, indices: np.ndarray) -> np.ndarray | None:
+        """Replaces disagreements with expected outcomes (returns None if they cannot be encoded)."""
+        for i, expected in enumerate(self._expected):
+            if expected is None:
+                continue
+            d = self._thread_digits[i].get(expected, None)  # type: ignore
+            if d is None:
+                return None
+            stride = self._strides[i]  # type: ignore
+            missing = (indices // stride) % self._radices[i] == 0  # type: ignore
+            indices = np.where(missing, indices + d * stride, indices)
+        return indices
+
+    def utility_table(self) -> np.ndarray | None:
+        """Returns the utility of every integer-encoded outcome ignoring expected outcomes.
+
+        Remarks:
+            - The table is materialized lazily on first access and only for stationary
+              ufuns with at most `max_table_size` outcomes. `None` is returned otherwise.
+            - The entry at index zero (all threads failed) is not meaningful. The
+              reserved value is used for it by `eval_batch`.
+        """
+        if self._utility_table is not None:
+            return self._utility_table
+        n = self.n_combined_outcomes
+        if not n or n > self.max_table_size or not self.stationary:
+            return None
+        table = np.empty(n, dtype=float)
+        for beg in range(0, n, self.batch_size):
+            end = min(n, beg + self.batch_size)
+            table[beg:end] = self._eval_digits(
+                self._digits(np.arange(beg, end, dtype=np.int64))
+            )
+        self._utility_table = table
+        return table
+
+    def clear_utility_table(self) -> None:
+        """Discards the utility table. Call this if the ufun was modified."""
+        self._utility_table = None
+
+    def eval_batch(
+        self, indices: Sequence[int] | np.ndarray, use_expected: bool = True
+    ) -> np.ndarray:
+        """Evaluates a batch of integer-encoded outcomes (see `encode_outcome`).
+
+        Args:
+            indices: Integer indices of the outcomes to evaluate.
+            use_expected: If given, disagreements are replaced with stored expected outcomes (as in `eval_with_expected`).
+
+        Returns:
+            A float array with the utility of each outcome.
+        """
+        if not self._ensure_encoding():
+            raise ValueError(
+                f"Cannot evaluate a batch for {self.name}: outcome-spaces are not enumerable"
+            )
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        if use_expected:
+            substituted = self._substitute_expected(indices)
+            if substituted is None:
+                return np.asarray(
+                    [self(self.decode_outcome(_)) for _ in indices.tolist()],
+                    dtype=float,
+                )
+            indices = substituted
+        table = self.utility_table()
+        if table is not None:
+            values = table[indices]
+        else:
+            values = np.empty(len(indices), dtype=float)
+            for beg in range(0, len(indices), self.batch_size):
+                end = min(len(indices), beg + self.batch_size)
+                values[beg:end] = self._eval_digits(self._digits(indices[beg:end]))
+        values[indices == 0] = self.reserved_value
+        return values
+
+    def _valid_indices(self) -> np.ndarray:
+        """Indices of all outcomes in `outcome_space` (partial agreements are only included for `HierarchicalCombiner`)."""
+        indices = np.arange(self.n_combined_outcomes, dtype=np.int64)
+        if isinstance(self._combiner, HierarchicalCombiner):
+            return indices
+        return indices[np.all(self._digits(indices) > 0, axis=1)]
+
+    def _batch_values(
+        self, outcomes: Iterable[Outcome | None] | None
+    ) -> tuple[np.ndarray, np.ndarray] | None:
+        """Returns indices and utilities of the given outcomes (all outcomes if None) or None if batching is not possible."""
+        n = self.n_combined_outcomes
+        if not n:
+            return None
+        if outcomes is None:
+            if n > self.max_table_size:
+                return None
+            indices = self._valid_indices()
+        else:
+            try:
+                indices = np.asarray(
+                    [self.encode_outcome(_) for _ in outcomes], dtype=np.int64
+                )
+            except Exception:
+                return None
+        if not len(indices):
+            return None
+        return indices, self.eval_batch(indices)
+
+    def extreme_outcomes(
+        self,
+        outcome_space: OutcomeSpace | None = None,
+        issues: Iterable | None = None,
+        outcomes: Iterable[Outcome] | None = None,
+        max_cardinality=100_000,
+    ) -> tuple[Outcome, Outcome]:
+        """Finds the worst and best outcomes using vectorized evaluation when possible."""
+        if outcome_space is None and issues is None:
+            found = self._batch_values(outcomes)
+            if found is not None:
+                indices, values = found
+                if not np.all(np.isnan(values)):
+                    return (
+                        self.decode_outcome(indices[int(np.nanargmin(values))]),  # type: ignore
+                        self.decode_outcome(indices[int(np.nanargmax(values))]),  # type: ignore
+                    )
+        return super().extreme_outcomes(
+            outcome_space,
+            issues,
+            outcomes,
+            max_cardinality,  # type: ignore
+        )
+
+    def argrank_with_weights(
+        self, outcomes: Sequence[Outcome | None], descending=True
+    ) -> list[tuple[list[Outcome | None], float]]:
+        found = self._batch_values(outcomes)
+        if found is None:
+            return super().argrank_with_weights(outcomes, descending)
+        return self._do_rank(zip(range(len(outcomes)), found[1].tolist()), descending)
+
+    def rank_with_weights(
+        self, outcomes: Sequence[Outcome | None], descending=True
+    ) -> list[tuple[list[Outcome | None], float]]:
+        found = self._batch_values(outcomes)
+        if found is None:
+            return super().rank_with_weights(outcomes, descending)
+        return self._do_rank(zip(outcomes, found[1].tolist()), descending)
+
+    def best_completion(
+        self, fixed: Mapping[int, Outcome | None] | None = None
+    ) -> tuple[Outcome | None, float]:
+        """Finds the best outcome given the agreements of some threads.
+
+        Args:
+            fixed: A mapping from thread index to its agreement (`None` for a failed thread). All
+                   other threads are free to end with any of their outcomes or with disagreement.
+
+        Returns:
+            The best (combined) outcome and its utility.
+
+        Remarks:
+            - Expected outcomes are not used. The agreements known so far should be passed in `fixed`.
+            - As in `eval_batch`, the outcome in which all threads fail has the reserved value.
+            - Subclasses exploit their structure to avoid evaluating every completion (see
+              `UtilityCombiningCenterUFun` and `CompiledEvaluator`).
+        """
+        digits, value = self._extreme_completion(self._fixed_digits(fixed), best=True)
+        return self._outcome_from_digits(digits), value
+
+    def worst_completion(
+        self, fixed: Mapping[int, Outcome | None] | None = None
+    ) -> tuple[Outcome | None, float]:
+        """Finds the worst outcome given the agreements of some threads (see `best_completion`)."""
+        digits, value = self._extreme_completion(self._fixed_digits(fixed), best=False)
+        return self._outcome_from_digits(digits), value
+
+    def top_k_completions(
+        self,
+        fixed: Mapping[int, Outcome | None] | None = None,
+        k: int = 10,
+        best: bool = True,
+    ) -> list[tuple[Outcome | None, float]]:
+        """Finds the `k` best (or worst) outcomes given the agreements of some threads (see `best_completion`).
+
+        Returns:
+            A list of (combined) outcomes and their utilities sorted from best to worst (or the reverse if `best` is `False`).
+        """
+        if k < 1:
+            return []
+        return [
+            (self._outcome_from_digits(digits), value)
+            for digits, value in self._top_completions(
+                self._fixed_digits(fixed), k, best
+            )
+        ]
+
+    def _fixed_digits(
+        self, fixed: Mapping[int, Outcome | None] | None
+    ) -> list[int | None]:
+        """Converts agreements of fixed threads to digits (`None` for free threads)."""
+        if not self._ensure_digits():
+            raise ValueError(
+                f"Cannot find completions for {self.name}: outcome-spaces are not enumerable"
+            )
+        digits: list[int | None] = [None] * self.n_edges
+        for i, outcome in (fixed if fixed else {}).items():
+            if not 0 <= i < self.n_edges:
+                raise ValueError(f"Invalid thread index {i} ({self.n_edges=})")
+            if outcome is None:
+                digits[i] = 0
+                continue
+            d = self._thread_digits[i].get(outcome, None)  # type: ignore
+            if d is None:
+                raise ValueError(f"{outcome} is not a valid outcome for thread {i}")
+            digits[i] = d
+        return digits
+
+    def _extreme_completion(
+        self, digits: list[int | None], best: bool
+    ) -> tuple[tuple[int, ...], float]:
+        """Returns the digits and utility of the best/worst completion of the given digits."""
+        return self._top_completions(digits, 1, best)[0]
+
+    def _top_completions(
+        self, digits: list[int | None], k: int, best: bool
+    ) -> list[tuple[tuple[int, ...], float]]:
+        """Returns the digits and utilities of the top `k` completions of the given digits.
+
+        Remarks:
+            - This default implementation evaluates all completions in batches (using the utility table if available).
+        """
+        free = [i for i, d in enumerate(digits) if d is None]
+        base = np.asarray([0 if d is None else d for d in digits], dtype=np.int64)
+        radices = self._radices[free]  # type: ignore
+        sub_strides = np.ones_like(radices)
+        for i in range(len(radices) - 2, -1, -1):
+            sub_strides[i] = sub_strides[i + 1] * radices[i + 1]
+        n = int(np.prod(radices.astype(object)))
+        table = self.utility_table()
+        sign = 1.0 if best else -1.0
+        top_digits = np.empty((0, self.n_edges), dtype=np.int64)
+        top_values = np.empty(0, dtype=float)
+        for beg in range(0, n, self.batch_size):
+            local = np.arange(beg, min(n, beg + self.batch_size), dtype=np.int64)
+            batch = np.repeat(base[None, :], len(local), axis=0)
+            batch[:, free] = (local[:, None] // sub_strides[None, :]) % radices
+            if table is not None:
+                values = table[batch @ self._strides]
+            else:
+                values = self._eval_digits(batch)
+            values[np.all(batch == 0, axis=1)] = self.reserved_value
+            top_digits = np.concatenate((top_digits, batch))
+            top_values = np.concatenate((top_values, values))
+            if len(top_values) > k:
+                keep = np.argpartition(
+                    -sign * np.nan_to_num(top_values, nan=-sign * np.inf), k - 1
+                )[:k]
+                top_digits, top_values = top_digits[keep], top_values[keep]
+        order = np.argsort(-sign * top_values, kind="stable")
+        return [
+            (tuple(top_digits[i].tolist()), float(top_values[i]))
+            for i in order.tolist()
+        ]
+
     @abstractmethod
     def eval(self, offer: tuple[Outcome | None, ...] | Outcome | None) -> float:
         """
@@ -440,6 +1071,7 @@ class CenterUFun(UtilityFunction, ABC):
             u._center_ufun = self
             u._index = i
             u._n_edges = self.n_edges
+            u.clear_cache()
         return ufuns
 
     def to_dict(self, python_class_identifier=TYPE_IDENTIFIER) -> dict[str, Any]:
@@ -466,6 +1098,75 @@ class CenterUFun(UtilityFunction, ABC):
         # return cls(**d)
 
 
+class CompiledEvaluator:
+    """
+    An array-backed center evaluator for utilities that depend only on a sum of per-thread counts.
+
+    Args:
+        counts: For every thread, an integer array of shape (n_outcomes + 1, n_counts) giving the counts
+                contributed by each outcome of the thread. Row zero corresponds to disagreement (`None`)
+                and is usually all zeros.
+        values: A mapping from the total counts (a tuple of `n_counts` integers) to the utility value.
+        default: The value used for totals missing from `values`.
+        max_dense_size: Largest number of possible totals for which a dense lookup table is used. Larger
+                        lookups use a sorted array of the keys in `values`.
+
+    Remarks:
+        - Outcomes are passed as a (n_outcomes, n_edges) array of thread digits (see `CenterUFun.encode_outcome`).
+    """
+
+    def __init__(
+        self,
+        counts: Sequence[np.ndarray],
+        values: dict[tuple[int, ...], float],
+        default: float = 0.0,
+        max_dense_size: int = 1_000_000,
+    ):
+        counts = [np.asarray(_, dtype=np.int64).reshape(len(_), -1) for _ in counts]
+        if any(np.any(_ < 0) for _ in counts):
+            raise ValueError("Counts must be non-negative")
+        bounds = np.sum([_.max(axis=0) for _ in counts], axis=0) + 1
+        if np.prod(bounds.astype(object)) >= np.iinfo(np.int64).max:
+            raise ValueError(f"Too many possible totals ({bounds=})")
+        strides = np.ones_like(bounds)
+        for i in range(len(bounds) - 2, -1, -1):
+            strides[i] = strides[i + 1] * bounds[i + 1]
+        self.default = float(default)
+        # the contribution of every thread outcome to the (scalar) key of the total
+        self.keys = tuple(_ @ strides for _ in counts)
+        known = {
+            int(np.dot(k, strides)): float(v)
+            for k, v in values.items()
+            if len(k) == len(bounds) and all(0 <= a < b for a, b in zip(k, bounds))
+        }
+        n = int(np.prod(bounds))
+        if n <= max_dense_size:
+            self.table = np.full(n, self.default, dtype=float)
+            self.table[list(known.keys())] = list(known.values())
+            self.sorted_keys = None
+        else:
+            self.sorted_keys = np.asarray(sorted(known.keys()), dtype=np.int64)
+            self.table = np.asarray([known[_] for _ in self.sorted_keys.tolist()])
+
+    def eval_digits(self, digits: np.ndarray) -> np.ndarray:
+        """Evaluates a batch of outcomes given as thread digits."""
+        key = np.zeros(len(digits), dtype=np.int64)
+        for i, keys in enumerate(self.keys):
+            key += keys[digits[:, i]]
+        return self.lookup(key)
+
+    def lookup(self, key: np.ndarray) -> np.ndarray:
+        """Returns the values of the given (scalar) keys of totals."""
+        if self.sorted_keys is None:
+            return self.table[key]
+        if not len(self.sorted_keys):
+            return np.full(len(key), self.default, dtype=float)
+        loc = np.minimum(
+            np.searchsorted(self.sorted_keys, key), len(self.sorted_keys) - 1
+        )
+        return np.where(self.sorted_keys[loc] == key, self.table[loc], self.default)
+
+
 class LambdaCenterUFun(CenterUFun):
     """
     A center utility function that implements an arbitrary evaluator
@@ -474,10 +1175,101 @@ class LambdaCenterUFun(CenterUFun):
     def __init__(self, *args, evaluator: CenterEvaluator, **kwargs):
         super().__init__(*args, **kwargs)
         self._evaluator = evaluator
+        self._compiled: CompiledEvaluator | None = None
+        self._compile_failed = False
 
     def eval(self, offer: tuple[Outcome | None, ...] | Outcome | None) -> float:
         return self._evaluator(self._combiner.separated_outcomes(offer))
 
+    def compiled_evaluator(self) -> CompiledEvaluator | None:
+        """Returns the compiled form of the evaluator if it provides one (see `CompiledEvaluator`).
+
+        Remarks:
+            - Evaluators can provide a compiled form by implementing a `compile(thread_outcomes)` method
+              receiving the list of outcomes of every thread and returning a `CompiledEvaluator` (or `None`).
+        """
+        if self._compiled is not None or self._compile_failed:
+            return self._compiled
+        compile = getattr(self._evaluator, "compile", None)
+        if compile is not None and self._ensure_digits():
+            try:
+                self._compiled = compile(self._thread_outcomes)
+            except Exception:
+                # fall back to the python evaluator
+                self._compiled = None
+        self._compile_failed = self._compiled is None
+        return self._compiled
+
+    def clear_utility_table(self) -> None:
+        super().clear_utility_table()
+        self._compiled, self._compile_failed = None, False
+
+    def _eval_digits(self, digits: np.ndarray) -> np.ndarray:
+        compiled = self.compiled_evaluator()
+        if compiled is None:
+            return super()._eval_digits(digits)
+        return compiled.eval_digits(digits)
+
+    def _extreme_completion(
+        self, digits: list[int | None], best: bool
+    ) -> tuple[tuple[int, ...], float]:
+        """Finds the best/worst completion over the reachable totals if the evaluator is compiled.
+
+        Remarks:
+            - The utility depends only on the total of the keys of all threads so we only track
+              the totals reachable by assigning the free threads one at a time (keeping one
+              assignment for each) instead of all completions.
+        """
+        compiled = self.compiled_evaluator()
+        if compiled is None:
+            return super()._extreme_completion(digits, best)
+        fixed = [(i, d) for i, d in enumerate(digits) if d is not None]
+        free = [i for i, d in enumerate(digits) if d is None]
+        base = sum(int(compiled.keys[i][d]) for i, d in fixed)
+        # totals reachable with at least one agreement (with a back-pointer for each) and
+        # the total if all free threads so far failed (only possible without fixed agreements)
+        totals = np.asarray([base] if any(d for _, d in fixed) else [], dtype=np.int64)
+        failed = None if any(d for _, d in fixed) else base
+        steps = []
+        for i in free:
+            keys, first = np.unique(compiled.keys[i], return_index=True)
+            candidates = (totals[:, None] + keys[None, :]).ravel()
+            parents = np.repeat(np.arange(len(totals)), len(keys))
+            choices = np.tile(first, len(totals))
+            if failed is not None:
+                agreed = first > 0
+                # a thread key may be shared by disagreement and an agreement
+                for key in keys[~agreed].tolist():
+                    same = np.flatnonzero(compiled.keys[i] == key)
+                    if np.any(same > 0):
+                        agreed[keys == key] = True
+                        first[keys == key] = same[same > 0][0]
+                candidates = np.concatenate((candidates, failed + keys[agreed]))
+                parents = np.concatenate((parents, np.full(agreed.sum(), -1)))
+                choices = np.concatenate((choices, first[agreed]))
+                failed += int(compiled.keys[i][0])
+            totals, kept = np.unique(candidates, return_index=True)
+            steps.append((parents[kept], choices[kept]))
+        values = compiled.lookup(totals) if len(totals) else np.empty(0)
+        sign = 1.0 if best else -1.0
+        result = list(digits)
+        if len(values) and not np.all(np.isnan(values)):
+            loc = int(np.nanargmax(sign * values))
+            value = float(values[loc])
+        else:
+            loc, value = -1, np.nan
+        if failed is not None and (
+            loc < 0 or sign * self.reserved_value > sign * value
+        ):
+            loc, value = -1, self.reserved_value
+        for i, (parents, choices) in zip(reversed(free), reversed(steps)):
+            if loc < 0:
+                result[i] = 0
+                continue
+            result[i] = int(choices[loc])
+            loc = int(parents[loc])
+        return tuple(result), value  # type: ignore
+
     def ufun_type(self) -> CenterUFunCategory:
         return CenterUFunCategory.Global
 
@@ -513,6 +1305,15 @@ class LambdaUtilityFunction(UtilityFunction):
 class SideUFun(BaseUtilityFunction):
     """
     Side ufun corresponding to the i's component of a center ufun.
+
+    Remarks:
+        - The utility of an offer is the center utility when this thread ends with the offer,
+          earlier threads end with their expected outcomes and later threads fail.
+        - Evaluation never modifies the center ufun. For stationary centers with a positive `cache_size`,
+          results are cached until an expected outcome or the reserved value of the center changes. The
+          cache is bounded by the `cache_size` of the center and is available as `eval_cache`.
+        - Unless a reserved value is given (or assigned), it is the utility of failing this thread
+          (`eval(None)`) computed lazily on first access and recomputed only when an expected outcome changes.
     """
 
     def __init__(
@@ -527,6 +1328,30 @@ class SideUFun(BaseUtilityFunction):
         self._center_ufun = center_ufun
         self._index = index
         self._n_edges = n_edges
+        self._cache = _side_cache(center_ufun)
+        self._cache_version = -1
+        self._lazy_reserved = "reserved_value" not in kwargs
+        self._reserved_version = -1
+
+    @property
+    def reserved_value(self) -> float:
+        center = getattr(self, "_center_ufun", None)
+        if center is None or not self._lazy_reserved:
+            return BaseUtilityFunction.reserved_value.fget(self)  # type: ignore
+        if not center.stationary or self._reserved_version != center._expected_version:
+            self._reserved_value = self.eval(None)
+            self._reserved_version = center._expected_version
+        return self._reserved_value  # type: ignore
+
+    @reserved_value.setter
+    def reserved_value(self, value: float) -> None:
+        self._lazy_reserved = False
+        BaseUtilityFunction.reserved_value.fset(self, value)  # type: ignore
+
+    def reset_reserved_value(self) -> None:
+        """Makes the reserved value the (lazily computed) utility of failing this thread again."""
+        self._lazy_reserved = True
+        self._reserved_version = -1
 
     def is_stationary(self) -> bool:
         return self._center_ufun.stationary_sides
@@ -538,44 +1363,96 @@ class SideUFun(BaseUtilityFunction):
             index = self._index
         self._center_ufun.set_expected_outcome(index, outcome)
 
-    def eval(self, offer: Outcome | None) -> float:
-        exp_outcome = [_ for _ in self._center_ufun._expected]
-        offers = [_ for _ in self._center_ufun._expected]
-        offers[self._index] = offer
-
-        # For all offers that are after the current agent, set to None:
-        for i in range(self._index + 1, self._n_edges):
-            # if offers[i] is not None:
-            # print(
-            #     f"{self._index=}: {i} has a none None outcome ({offers[i]=})\n{offers=}"
-            # )
-            # raise AssertionError(
-            #     f"{self._index=}: {i} has a none None outcome ({offers[i]=})\n{offers=}"
-            # )
-            self.set_expected_outcome(None, i)
-            offers[i] = None
-        u = self._center_ufun(tuple(offers))
-
-        # restore expected_outcome:
-        for i in range(self._index + 1, self._n_edges):
-            self.set_expected_outcome(exp_outcome[i], i)
+    def clear_cache(self) -> None:
+        """Clears cached side utilities (only needed if the center is modified directly)."""
+        self._cache = _side_cache(self._center_ufun)
+        self._cache_version = -1
+        self._reserved_version = -1
 
+    @property
+    def eval_cache(self) -> EvalCache | None:
+        """The cache of side utilities (`None` unless the center has a positive `cache_size`)."""
+        return self._cache
+
+    def _masked_outcomes(self, offer: Outcome | None) -> tuple[Outcome | None, ...]:
+        """The outcomes of all threads used to evaluate the given offer."""
+        expected = self._center_ufun._expected
+        i = self._index
+        return (
+            *expected[:i],
+            offer if offer else expected[i],
+            *((None,) * (self._n_edges - i - 1)),
+        )
+
+    def eval(self, offer: Outcome | int | None) -> float:
+        center = self._center_ufun
+        if is_index(offer):
+            # the digit of this thread (see `OutcomeEncoding`)
+            encoding = center.encoding()
+            if encoding is None:
+                raise ValueError(
+                    f"Cannot decode {offer}: outcome-space is not enumerable"
+                )
+            offer = (
+                None if offer == 0 else encoding.thread_outcomes[self._index][offer - 1]  # type: ignore
+            )
+        if not center.stationary or self._cache is None:
+            return center.eval_with_expected(
+                self._masked_outcomes(offer), use_expected=False
+            )
+        if self._cache_version != center._expected_version:
+            self._cache.clear()
+            self._cache_version = center._expected_version
+        u = self._cache.get(offer)
+        if u is None:
+            u = center.eval_with_expected(
+                self._masked_outcomes(offer), use_expected=False
+            )
+            self._cache.put(offer, u)
         return u
 
 
+def _side_cache(center: CenterUFun) -> EvalCache | None:
+    return EvalCache(center.cache_size) if center.cache_size > 0 else None
+
+
+def _reserved_state(ufun: BaseUtilityFunction | None) -> tuple | None:
+    """The reserved value of a (side) ufun and, for adapters, of the adapted ufun."""
+    if ufun is None:
+        return None
+    return (
+        ufun._reserved_value,
+        getattr(ufun, "_lazy_reserved", None),
+        _reserved_state(getattr(ufun, "_base_ufun", None)),
+    )
+
+
+def _restore_reserved_state(
+    ufun: BaseUtilityFunction | None, state: tuple | None
+) -> None:
+    if ufun is None or state is None:
+        return
+    ufun._reserved_value, lazy, base_state = state
+    if isinstance(ufun, SideUFun):
+        ufun._lazy_reserved = lazy
+        ufun._reserved_version = -1
+    _restore_reserved_state(getattr(ufun, "_base_ufun", None), base_state)
+
+
 def make_side_ufun(
     center: CenterUFun, index: int, side: BaseUtilityFunction | None
 ) -> SideUFun:
     """Creates a side-ufun for the center at the given index."""
     if side is None:
         side_ufun = SideUFun(center_ufun=center, n_edges=center.n_edges, index=index)
-        side_ufun.reserved_value = side_ufun.eval(None)  # type: ignore
     elif isinstance(side, SideUFun):
         side_ufun = side
         side_ufun._center_ufun = center
         side_ufun._index = index
         side_ufun._n_edges = center.n_edges
-        side_ufun.reserved_value = side_ufun.eval(None)  # type: ignore
+        side_ufun.clear_cache()
+        if not isinstance(side, SideUFunAdapter):
+            side_ufun.reset_reserved_value()
     else:
         side_ufun = SideUFunAdapter(
             center_ufun=center,
@@ -689,8 +1566,16 @@ class UtilityCombiningCenterUFun(CenterUFun):
     A center ufun with a side-ufun defined for each thread.
 
     The utility of the center is a function of the ufuns of the edges.
+
+    Remarks:
+        - If `combine` is monotone (never decreases when a side utility increases), completions
+          (see `best_completion`) are found by combining the sorted side utilities of free threads
+          instead of evaluating every completion.
     """
 
+    monotone: bool = False
+    """Whether `combine` is non-decreasing in every side utility"""
+
     def __init__(
         self,
         *args,
@@ -701,6 +1586,7 @@ class UtilityCombiningCenterUFun(CenterUFun):
         super().__init__(*args, **kwargs)
         self.ufuns = tuple(deepcopy(_) for _ in side_ufuns)
         self.allow_partial_agreements = allow_partial_agreements
+        self._side_values: tuple[np.ndarray, ...] | None = None
         # This is already done in CenterUFun now
         # self._effective_side_ufuns = tuple(
         #     make_side_ufun(self, i, side) for i, side in enumerate(self.ufuns)
@@ -720,6 +1606,127 @@ class UtilityCombiningCenterUFun(CenterUFun):
             return self.reserved_value
         return self.combine(tuple(float(u(_)) for u, _ in zip(self.ufuns, offer)))
 
+    def side_values(self) -> tuple[np.ndarray, ...]:
+        """The utility of every outcome of every thread (indexed by digit, see `encode_outcome`)."""
+        if self._side_values is None:
+            self._ensure_digits()
+            self._side_values = tuple(
+                np.asarray([float(u(None))] + [float(u(_)) for _ in outcomes])
+                for u, outcomes in zip(self.ufuns, self._thread_outcomes)  # type: ignore
+            )
+        return self._side_values
+
+    def clear_utility_table(self) -> None:
+        super().clear_utility_table()
+        self._side_values = None
+
+    def extreme_outcomes(
+        self,
+        outcome_space: OutcomeSpace | None = None,
+        issues: Iterable | None = None,
+        outcomes: Iterable[Outcome] | None = None,
+        max_cardinality=100_000,
+    ) -> tuple[Outcome, Outcome]:
+        """Finds the worst and best outcomes from the extremes of the side ufuns if `combine` is monotone.
+
+        Remarks:
+            - This takes time linear in the total number of outcomes of all threads and is used
+              by `minmax` and normalization as well.
+        """
+        if (
+            outcome_space is None
+            and issues is None
+            and outcomes is None
+            and isinstance(self._combiner, HierarchicalCombiner)
+        ):
+            n = self.n_edges
+            worst = self._monotone_completions([None] * n, 1, False, True)
+            best = self._monotone_completions([None] * n, 1, True, True)
+            if worst and best:
+                return (
+                    self._outcome_from_digits(worst[0][0]),  # type: ignore
+                    self._outcome_from_digits(best[0][0]),  # type: ignore
+                )
+        return super().extreme_outcomes(
+            outcome_space,
+            issues,
+            outcomes,
+            max_cardinality,  # type: ignore
+        )
+
+    def _top_completions(
+        self, digits: list[int | None], k: int, best: bool
+    ) -> list[tuple[tuple[int, ...], float]]:
+        found = self._monotone_completions(digits, k, best)
+        if found is None:
+            return super()._top_completions(digits, k, best)
+        return found
+
+    def _monotone_completions(
+        self, digits: list[int | None], k: int, best: bool, use_expected: bool = False
+    ) -> list[tuple[tuple[int, ...], float]] | None:
+        """Finds the top completions by combining sorted side utilities (`None` if `combine` is not monotone).
+
+        Remarks:
+            - If `use_expected` is given, disagreements are evaluated as the expected outcome of their thread.
+        """
+        if (
+            not self.monotone
+            or not self.allow_partial_agreements
+            or not self._ensure_digits()
+        ):
+            return None
+        side_values = self.side_values()
+        substituted = False
+        if use_expected:
+            side_values = list(side_values)
+            for i, expected in enumerate(self._expected):
+                if expected is None:
+                    continue
+                d = self._thread_digits[i].get(expected, None)  # type: ignore
+                if d is None:
+                    return None
+                side_values[i] = side_values[i].copy()
+                side_values[i][0] = side_values[i][d]
+                substituted = True
+        free = [i for i, d in enumerate(digits) if d is None]
+        sign = 1.0 if best else -1.0
+        # digits of every free thread sorted from best to worst
+        orders = [np.argsort(-sign * side_values[i], kind="stable") for i in free]
+        values = [v[d] if d is not None else 0.0 for v, d in zip(side_values, digits)]
+        current = list(digits)
+
+        def evaluate(ranks: tuple[int, ...]) -> float:
+            for i, order, r in zip(free, orders, ranks):
+                current[i] = int(order[r])
+                values[i] = side_values[i][current[i]]
+            return self.combine(values)
+
+        # best-first search over ranks in the sorted lists. As combine is monotone,
+        # completions are popped from best to worst.
+        start = (0,) * len(free)
+        heap, seen, found = [(-sign * evaluate(start), start)], {start}, []
+        # the completion in which all threads fail has the reserved value (as in eval_batch)
+        all_failed = not substituted and all(_ is None or _ == 0 for _ in digits)
+        while heap and len(found) < k:
+            key, ranks = heapq.heappop(heap)
+            evaluate(ranks)
+            if not (all_failed and not any(current)):
+                found.append((tuple(current), -sign * key))  # type: ignore
+            for j in range(len(ranks)):
+                if ranks[j] + 1 >= len(orders[j]):
+                    continue
+                nxt = ranks[:j] + (ranks[j] + 1,) + ranks[j + 1 :]
+                if nxt in seen:
+                    continue
+                seen.add(nxt)
+                heapq.heappush(heap, (-sign * evaluate(nxt), nxt))
+        if all_failed:
+            found.append(((0,) * self.n_edges, self.reserved_value))
+            found.sort(key=lambda x: -sign * x[1])
+            found = found[:k]
+        return found
+
     def ufun_type(self) -> CenterUFunCategory:
         return CenterUFunCategory.Local
 
@@ -761,6 +1768,8 @@ class MaxCenterUFun(UtilityCombiningCenterUFun):
             if isinstance(side, SideUFunAdapter):
                 side._base_ufun.reserved_value = max(side._base_ufun.reserved_value, r)
 
+    monotone = True
+
     def combine(self, values: Sequence[float]) -> float:
         return max(values)
 
@@ -770,12 +1779,17 @@ class LinearCombinationCenterUFun(UtilityCombiningCenterUFun):
     Linear combination of the side utility values
 
     The utility of the center is the maximum of the utilities it got in each negotiation (called side utilities)
+
+    Args:
+        weights: Weights of the side utilities (normalized to sum to one).
+        rng: Generator (or seed) used to draw random weights if none are given.
     """
 
     def __init__(
         self,
         *args,
         weights: tuple[float, ...] | None = None,
+        rng: np.random.Generator | int | None = None,
         **kwargs,
     ):
         super().__init__(*args, **kwargs)
@@ -784,11 +1798,12 @@ class LinearCombinationCenterUFun(UtilityCombiningCenterUFun):
             if s:
                 weights = tuple(_ / s for _ in weights)
         if weights is None:
-            w = np.random.rand(self.n_edges)
+            w = make_rng(rng).random(self.n_edges)
             s = w.sum()
             self._weights = tuple((w / s).tolist())
         else:
             self._weights: tuple[float, ...] = weights
+        self.monotone = all(_ >= 0 for _ in self._weights)
 
     def combine(self, values: Sequence[float]) -> float:
         return sum(a * b for a, b in zip(values, self._weights, strict=True))
@@ -805,6 +1820,7 @@ class SideUFunAdapter(SideUFun):
     ):
         super().__init__(*args, **kwargs)
         self._base_ufun = base_ufun
+        self._lazy_reserved = False
 
     def to_stationary(self, *args, **kwargs):
         return self._base_ufun.to_stationary(*args, **kwargs)
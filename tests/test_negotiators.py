@@ -0,0 +1,63 @@
+import threading
+from copy import deepcopy
+
+from anl2025 import negotiator
+from anl2025.negotiator import cached_inverter, clear_inverter_cache
+from anl2025.scenario import make_random_linear_ufun, make_random_os
+from anl2025.scenarios.dinners import make_dinners_scenario
+
+
+def test_cached_inverter_is_shared_and_tracks_expected_outcomes():
+    clear_inverter_cache()
+    center = make_dinners_scenario(n_friends=3, n_days=3).center_ufun
+    other = deepcopy(center)
+    side, other_side = center.side_ufuns()[1], other.side_ufuns()[1]
+    side.outcome_space = center.outcome_spaces[1]
+    other_side.outcome_space = other.outcome_spaces[1]
+    first, mx, mn, best = cached_inverter(side)
+    second, mx2, mn2, best2 = cached_inverter(other_side)
+    assert second.ufun is other_side
+    assert second.outcomes == first.outcomes
+    assert (mx, mn, best) == (mx2, mn2, best2)
+    assert len(negotiator._inverter_cache) == 1
+
+    center.set_expected_outcome(0, center.outcome_spaces[0].enumerate()[0])
+    updated, *_ = cached_inverter(side)
+    assert len(negotiator._inverter_cache) == 2
+    assert [float(side(_)) for _ in updated.outcomes] == list(updated.utils)
+
+
+def test_cached_inverter_follows_changes_to_the_ufun():
+    clear_inverter_cache()
+    os = make_random_os(2, 3, rng=0)
+    ufun = make_random_linear_ufun(os, rng=1, reserved_value=0.0)
+    _, _, _, best = cached_inverter(ufun)
+    ufun.weights[:] = reversed(list(ufun.weights))
+    _, _, _, updated = cached_inverter(ufun)
+    assert len(negotiator._inverter_cache) == 2
+    assert ufun(updated[0]) == max(ufun(_) for _ in os.enumerate())
+
+
+def test_cached_inverter_can_be_used_from_threads(monkeypatch):
+    clear_inverter_cache()
+    # a tiny cache evicts entries while other threads use them
+    monkeypatch.setattr(negotiator, "INVERTER_CACHE_SIZE", 1)
+    os = make_random_os(2, 3, rng=0)
+    ufuns = [make_random_linear_ufun(os, rng=_, reserved_value=0.0) for _ in range(4)]
+    errors = []
+
+    def invert():
+        try:
+            for _ in range(50):
+                for ufun in ufuns:
+                    cached_inverter(ufun)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=invert) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert len(negotiator._inverter_cache) == 1
@@ -1,10 +1,14 @@
 import shutil
+import sys
 from itertools import product
 from pathlib import Path
 from negmas.inout import Scenario
+from anl2025.cache import CACHE_SUFFIX, cache_file
 from anl2025.inout import load_multideal_scenario
 from anl2025.negotiator import Random2025
-from anl2025.runner import MultidealScenario, run_session
+from anl2025 import runner
+from anl2025.common import RunParams
+from anl2025.runner import MultidealScenario, assign_scenario, run_session
 from anl2025.scenario import make_multideal_scenario
 from anl2025.scenarios import get_example_scenario_names, load_example_scenario
 from anl2025.scenarios.dinners import make_dinners_scenario
@@ -13,6 +17,7 @@ from anl2025.scenarios.target_quantity import make_target_quantity_scenario
 from anl2025.ufun import FlatteningCombiner, HierarchicalCombiner, LambdaCenterUFun
 from negmas import DiscreteCartesianOutcomeSpace, UtilityFunction
 from anl2025.scenarios.genius import make_multideal_scenario_from_genius
+from anl2025.tournament import scenario_maker
 import pytest
 
 from hypothesis import given, strategies as st, example, settings
@@ -108,6 +113,23 @@ def test_make_job_hunt_all_rand():
     run_session(scenario, edge_types=[Random2025], center_type=Random2025)
 
 
+def test_sessions_restore_the_scenario_state():
+    scenario = make_job_hunt_scenario(seed=3)
+    before = scenario.save_state()
+    results = run_session(scenario, nsteps=20, output=None, method="sequential")
+    assert results.n_succeeded
+    assert scenario.save_state() == before
+    assert results.center_utility == scenario.center_ufun(tuple(results.agreements))
+    # dry runs restore the scenario as well
+    run_session(scenario, nsteps=20, output=None, dry=True)
+    assert scenario.save_state() == before
+    # a scenario cannot be shared by sessions running at the same time
+    assigned = assign_scenario(scenario, RunParams(nsteps=20))
+    with runner._exclusive(scenario), pytest.raises(RuntimeError):
+        assigned.run(dry=True)
+    assert scenario.save_state() == before
+
+
 def test_make_job_hunt():
     scenario = make_job_hunt_scenario()
     path = Path(__file__).parent.parent / "scenarios" / "job_hunt"
@@ -192,6 +214,68 @@ def test_get_example_scenarios():
         load_example_scenario(name)
 
 
+def test_from_folder_uses_cache_until_files_change(tmp_path):
+    src = Path(__file__).parent.parent / "src" / "anl2025" / "example_scenarios"
+    folder, cache = tmp_path / "TargetQuantity", tmp_path / "cache"
+    shutil.copytree(src / "TargetQuantity", folder)
+    MultidealScenario.from_folder(folder)
+    assert not list(tmp_path.glob(f"**/*{CACHE_SUFFIX}"))
+    first = MultidealScenario.from_folder(folder, use_cache=True, cache_path=cache)
+    assert first is not None and len(list(cache.glob(f"*{CACHE_SUFFIX}"))) == 1
+    second = MultidealScenario.from_folder(folder, use_cache=True, cache_path=cache)
+    assert second is not None and second.code_files == first.code_files
+    assert second.center_ufun.reserved_value == first.center_ufun.reserved_value
+    center_file = folder / "center.yml"
+    center_file.write_text(
+        center_file.read_text().replace("reserved_value: 0.0", "reserved_value: 0.25")
+    )
+    third = MultidealScenario.from_folder(folder, use_cache=True, cache_path=cache)
+    assert third is not None and third.center_ufun.reserved_value == 0.25
+    # outdated entries are replaced
+    assert len(list(cache.glob(f"*{CACHE_SUFFIX}"))) == 1
+    # broken entries are removed
+    cache_file(folder, cache).write_bytes(b"broken")
+    with pytest.warns(Warning, match="Discarding"):
+        fourth = MultidealScenario.from_folder(folder, use_cache=True, cache_path=cache)
+    assert fourth is not None and fourth.center_ufun.reserved_value == 0.25
+    assert cache_file(folder, cache).is_file()
+
+
+def test_cached_scenarios_use_their_own_code_files(tmp_path):
+    root = Path(__file__).parent.parent
+    first, second = tmp_path / "dinners", tmp_path / "Dinners"
+    shutil.copytree(root / "scenarios" / "dinners", first)
+    shutil.copytree(root / "src" / "anl2025" / "example_scenarios" / "Dinners", second)
+    for folder in (first, second, second):
+        s = MultidealScenario.from_folder(folder, use_cache=True)
+        assert s is not None
+        module = sys.modules[type(s.center_ufun._evaluator).__module__]  # type: ignore
+        assert Path(module.__file__).resolve().parent == folder.resolve()  # type: ignore
+        s.center_ufun.minmax()
+    assert cache_file(second).is_file()
+    # a scenario compiled while a module of the same name was loaded from elsewhere is not used
+    MultidealScenario.from_folder(first)
+    s = MultidealScenario.from_folder(second, use_cache=True)
+    assert s is not None
+    s.center_ufun.minmax()
+
+
+def test_seeded_scenarios_are_reproducible():
+    for seed in range(6):
+        a, b = [
+            scenario_maker(nedges=2, nissues=2, nvalues=3, seed=seed) for _ in range(2)
+        ]
+        assert a.name == b.name
+        outcomes = list(a.center_ufun.outcome_space.enumerate())
+        assert [a.center_ufun(_) for _ in outcomes] == [
+            b.center_ufun(_) for _ in outcomes
+        ]
+        for x, y in zip(a.edge_ufuns, b.edge_ufuns, strict=True):
+            assert x.reserved_value == y.reserved_value
+            edge_outcomes = list(x.outcome_space.enumerate())
+            assert [x(_) for _ in edge_outcomes] == [y(_) for _ in edge_outcomes]
+
+
 def test_random_scenario():
     scenario = make_multideal_scenario(nedges=3)
     run_session(scenario)
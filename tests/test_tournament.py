@@ -0,0 +1,385 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+from negmas.helpers.inout import load
+from negmas.helpers.types import get_full_type_name
+from negmas.warnings import NegmasIgnoredValueWarning
+
+from anl2025.common import OUTPUT_TIERS, RunParams, session_budget
+from anl2025.jobqueue import JobQueue
+from anl2025.negotiator import Boulware2025, Conceder2025, Linear2025, Random2025
+from anl2025.plots import render_plots
+from anl2025.runner import SUMMARY_FILE_NAME, run_session
+from anl2025.scenarios.dinners import make_dinners_scenario
+from anl2025.scheduler import FAILURES_TO_SKIP, CostModel, CostProfile, JobScheduler
+from anl2025.tournament import (
+    CHECKPOINT_FILE_NAME,
+    PROFILE_FILE_NAME,
+    SCORES_FILE_NAME,
+    SESSIONS_FILE_NAME,
+    STREAM_FOLDER_NAME,
+    Tournament,
+    merge_shards,
+    run_worker,
+)
+from anl2025.traces import TRACES_FOLDER_NAME, TraceReader
+from anl2025.ufun import CenterUFun
+
+
+def test_streamed_results_match_in_memory_results(tmp_path):
+    tournament = Tournament(
+        competitors=(Boulware2025, Linear2025, Conceder2025),
+        scenarios=[make_dinners_scenario(n_friends=2, n_days=2, name="d")],
+        run_params=RunParams(nsteps=10),
+    )
+    results = []
+    for stream in (False, True):
+        results.append(
+            tournament.run(
+                n_repetitions=1,
+                path=tmp_path / str(stream),
+                n_jobs=-1,
+                stream=stream,
+                seed=0,
+            )
+        )
+    in_memory, streamed = results
+    assert streamed.final_scores == in_memory.final_scores
+    assert streamed.weighted_average == in_memory.weighted_average
+    assert streamed.n_threads_succeeded == in_memory.n_threads_succeeded
+    assert not streamed.scores and not streamed.session_results
+    base = tmp_path / "True" / STREAM_FOLDER_NAME
+    assert len(pd.read_csv(base / SCORES_FILE_NAME)) == len(in_memory.scores)
+    assert len(pd.read_csv(base / SESSIONS_FILE_NAME)) == len(in_memory.session_results)
+
+
+def test_resume_skips_completed_sessions(tmp_path):
+    tournament = Tournament(
+        competitors=(Boulware2025, Linear2025, Conceder2025),
+        scenarios=[make_dinners_scenario(n_friends=2, n_days=2, name="d")],
+        run_params=RunParams(nsteps=10),
+    )
+    full = tournament.run(n_repetitions=2, path=tmp_path, n_jobs=-1, seed=1)
+    base = tmp_path / STREAM_FOLDER_NAME
+    sessions = (base / SESSIONS_FILE_NAME).read_text().splitlines(keepends=True)
+    n = len(sessions) - 1
+    # simulate a crash in the middle of writing the summary of a session
+    (base / SESSIONS_FILE_NAME).write_text("".join(sessions[: n // 2]) + "7,d,0")
+    resumed = tournament.run(n_repetitions=2, path=tmp_path, n_jobs=-1, resume=True)
+    assert len(resumed.session_results) == n - n // 2 + 1
+    assert len(resumed.scores) == len(full.scores)
+    assert resumed.final_scores == pytest.approx(full.final_scores)
+    assert resumed.n_threads_succeeded == full.n_threads_succeeded
+    assert len(pd.read_csv(base / SESSIONS_FILE_NAME)) == n
+    assert len(pd.read_csv(base / SCORES_FILE_NAME)) == len(full.scores)
+
+
+def test_seeded_runs_are_reproducible():
+    tournament = Tournament.from_scenarios(
+        competitors=(Boulware2025, Random2025, Linear2025),
+        run_params=RunParams(nsteps=10),
+        n_generated=2,
+        nedges=2,
+        nissues=2,
+        nvalues=3,
+        seed=7,
+    )
+    results = [
+        tournament.run(n_repetitions=1, n_jobs=-1, seed=11).final_scores
+        for _ in range(2)
+    ]
+    assert results[0] == results[1]
+
+
+def test_parallel_runs_match_serial_runs():
+    tournament = Tournament(
+        competitors=(Boulware2025, Linear2025, Conceder2025, Random2025),
+        scenarios=[make_dinners_scenario(n_friends=2, n_days=2, name="d")],
+        run_params=RunParams(nsteps=10),
+    )
+    # more sessions than can be pending at once with a single worker
+    serial = tournament.run(n_repetitions=3, n_jobs=-1, seed=4)
+    parallel = tournament.run(n_repetitions=3, n_jobs=1, seed=4)
+    assert len(parallel.session_results) == 12
+    assert parallel.final_scores == serial.final_scores
+    assert len(parallel.worker_utilization) == 1
+    assert 0 < next(iter(parallel.worker_utilization.values())) <= 1
+
+
+def test_merged_shards_match_a_full_run(tmp_path):
+    tournament = Tournament(
+        competitors=(Boulware2025, Linear2025, Conceder2025),
+        scenarios=[make_dinners_scenario(n_friends=2, n_days=2, name="d")],
+        run_params=RunParams(nsteps=10),
+    )
+    shards = [
+        tournament.run(n_repetitions=2, path=tmp_path / k[0], n_jobs=-1, shard=k)
+        for k in ("1/3", "2/3", "3/3")
+    ]
+    assert sorted(len(_.session_results) for _ in shards) == [2, 2, 2]
+    merged = merge_shards(tmp_path / _ for _ in "123")
+    # the seed is derived from the tournament when not given
+    full = tournament.run(
+        n_repetitions=2,
+        n_jobs=-1,
+        seed=load(tmp_path / "1" / STREAM_FOLDER_NAME / CHECKPOINT_FILE_NAME)["seed"],
+    )
+    assert merged.final_scores == pytest.approx(full.final_scores)
+    assert merged.weighted_average == pytest.approx(full.weighted_average)
+    assert len(merged.scores) == len(full.scores)
+    with pytest.raises(ValueError):
+        merge_shards([tmp_path / "1", tmp_path / "1"])
+
+
+def test_queued_sessions_are_run_by_workers(tmp_path):
+    tournament = Tournament(
+        competitors=(Boulware2025, Linear2025, Conceder2025),
+        scenarios=[make_dinners_scenario(n_friends=2, n_days=2, name="d")],
+        run_params=RunParams(nsteps=10),
+    )
+    queue = tmp_path / "queue.sqlite"
+    # workers may start before the tournament adds its sessions
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        workers = [pool.submit(run_worker, queue) for _ in range(2)]
+        queued = tournament.run(n_repetitions=2, seed=5, queue=queue)
+        counts = [_.result() for _ in workers]
+    serial = tournament.run(n_repetitions=2, n_jobs=-1, seed=5)
+    assert sum(counts) == len(queued.session_results) == 6
+    assert queued.final_scores == pytest.approx(serial.final_scores)
+
+
+def test_expired_leases_are_leased_again(tmp_path):
+    jobs = JobQueue(tmp_path / "queue.sqlite", lease_seconds=0.05, max_attempts=2)
+    jobs.put([(0, "a", 1.0), (1, "b", 2.0)])
+    jobs.seal()
+    assert jobs.lease("w1") == (1, "b")
+    assert jobs.lease("w1") == (0, "a")
+    jobs.complete(0, "A")
+    assert jobs.lease("w2") is None
+    time.sleep(0.1)
+    # w1 died while running b
+    assert not jobs.renew(1, "w2")
+    assert jobs.lease("w2") == (1, "b")
+    assert not jobs.renew(1, "w1") and jobs.renew(1, "w2")
+    time.sleep(0.1)
+    assert jobs.lease("w3") is None
+    assert sorted(jobs.collect()) == [(0, "a", "A", 1), (1, "b", None, 2)]
+    assert jobs.is_finished() and not jobs.collect()
+
+
+def test_traces_are_stored_with_offer_indices(tmp_path):
+    scenario = make_dinners_scenario(n_friends=2, n_days=2, name="d", seed=3)
+    tournament = Tournament(
+        competitors=(Boulware2025, Linear2025, Conceder2025),
+        scenarios=[scenario],
+        run_params=RunParams(nsteps=10),
+    )
+    results = tournament.run(n_repetitions=1, path=tmp_path, n_jobs=1, seed=2)
+    assert not list(tmp_path.glob("**/log"))
+    reader = TraceReader(tmp_path / TRACES_FOLDER_NAME)
+    # a single worker writes a single file
+    assert len(reader.files) == 1
+    assert reader.sessions() == ["d_0_0", "d_1_0", "d_2_0"]
+    for info in results.session_results:
+        session = f"{info.scenario_name}_{info.rotation}_{info.repetition}"
+        for i, agreement in enumerate(info.results.agreements):
+            os = scenario.edge_ufuns[i].outcome_space
+            trace = reader.trace(session, i, outcome_space=os)
+            assert len(trace) and (trace["thread"] == i).all()
+            if agreement is not None:
+                assert trace["offer"].iloc[-1] == agreement
+                assert trace["state"].iloc[-1] == "agreement"
+    assert reader.to_pandas()["offer"].dtype == np.int64
+    # plots are only rendered when asked for
+    assert not list(tmp_path.glob("**/*.png"))
+    plots = render_plots(tmp_path, sessions=["d_1_*"])
+    assert sorted(_.name for _ in plots) == ["n0.png", "n1.png"]
+    assert all(_.is_file() for _ in plots)
+    assert not render_plots(tmp_path, sessions=["d_1_*"])
+
+
+def test_output_tiers_control_what_is_written(tmp_path):
+    scenario = make_dinners_scenario(n_friends=2, n_days=2, name="d", seed=2)
+    for tier in OUTPUT_TIERS:
+        output = tmp_path / "sessions" / tier
+        run_session(scenario, nsteps=10, output=output, name="s", output_tier=tier)
+        files = sorted(str(_.relative_to(output)) for _ in output.glob("**/*.*"))
+        if tier == "none":
+            assert not output.exists()
+            continue
+        assert f"s/{SUMMARY_FILE_NAME}" in files
+        assert any(_.endswith(".arrow") for _ in files) == (tier != "summary")
+        assert any(_.endswith(".csv") for _ in files) == (tier == "full")
+        assert any(_.endswith(".png") for _ in files) == (tier == "full")
+    for tier in ("none", "full"):
+        path = tmp_path / "tournaments" / tier
+        results = Tournament(
+            competitors=(Boulware2025, Linear2025, Conceder2025),
+            scenarios=[scenario],
+            run_params=RunParams(nsteps=10, output_tier=tier),
+        ).run(n_repetitions=1, path=path, n_jobs=1, seed=2)
+        assert len(results.session_results) == 3
+        assert (path / STREAM_FOLDER_NAME).exists() == (tier == "full")
+        assert (path / TRACES_FOLDER_NAME).exists() == (tier == "full")
+        assert len(list(path.glob(f"results/**/{SUMMARY_FILE_NAME}"))) == (
+            3 if tier == "full" else 0
+        )
+    with pytest.raises(ValueError):
+        Tournament(
+            competitors=(Boulware2025, Linear2025),
+            scenarios=[scenario],
+            run_params=RunParams(output_tier="none"),
+        ).run(n_repetitions=1, path=tmp_path, resume=True)
+
+
+def test_scheduler_runs_long_jobs_first_and_chunks_short_ones():
+    costs = {"small": 1.0, "large": 100.0}
+    jobs = ["small", "large"] * 5
+    model = CostModel()
+    scheduler = JobScheduler(
+        iter(jobs), group=str, cost=costs.get, model=model, chunk_seconds=0.35
+    )
+    # nothing is observed so jobs are submitted one by one ordered by cost
+    assert [scheduler.next_chunk() for _ in range(6)] == [["large"]] * 5 + [["small"]]
+    model.observe("small", costs["small"], 0.1)
+    assert scheduler.next_chunk() == ["small"] * 3
+    assert scheduler.next_chunk() == ["small"]
+    assert scheduler.next_chunk() == []
+    # unobserved groups are estimated from their cost
+    assert model.estimate("other", 3.0) == pytest.approx(0.3)
+
+
+class CrashingCenter2025(Boulware2025):
+    def init(self):
+        if isinstance(self.ufun, CenterUFun):
+            os._exit(1)
+        super().init()
+
+
+class SpinningCenter2025(Boulware2025):
+    def init(self):
+        while isinstance(self.ufun, CenterUFun):
+            pass
+        super().init()
+
+
+def test_sessions_exceeding_budgets_are_recorded_as_failures(tmp_path):
+    tournament = Tournament(
+        competitors=(Boulware2025, Linear2025, SpinningCenter2025),
+        scenarios=[make_dinners_scenario(n_friends=2, n_days=2, name="d")],
+        run_params=RunParams(nsteps=10, session_cpu_limit=0.2),
+    )
+    results = tournament.run(n_repetitions=4, n_jobs=-1, seed=1, path=tmp_path)
+    assert not (tmp_path / PROFILE_FILE_NAME).exists()
+    failed = [_ for _ in results.session_results if _.results.run_error]
+    assert {_.center_type_name for _ in failed} == {
+        get_full_type_name(SpinningCenter2025)
+    }
+    # the session is skipped only after failing FAILURES_TO_SKIP times
+    errors = [_.results.run_error for _ in failed]
+    assert ["CPU budget" in _ for _ in errors] == [True] * FAILURES_TO_SKIP + [False]
+    assert errors[-1].startswith("Skipped")
+    assert len(results.session_results) == 12
+    # failures are saved but only used by later runs if asked for
+    profile = tmp_path / PROFILE_FILE_NAME
+    tournament.run(n_repetitions=3, n_jobs=-1, seed=1, profile=profile)
+    assert (
+        CostProfile.load(profile, cpu_limit=0.2).check(
+            get_full_type_name(SpinningCenter2025), 1e6
+        )
+        is None
+    )
+    again = tournament.run(
+        n_repetitions=1, n_jobs=-1, seed=1, profile=profile, use_saved_failures=True
+    )
+    skipped = [_ for _ in again.session_results if _.results.run_error]
+    assert [_.results.run_error.startswith("Skipped") for _ in skipped] == [True]
+
+
+def test_budgets_warn_when_they_cannot_be_enforced():
+    warned = []
+
+    def run():
+        with pytest.warns(NegmasIgnoredValueWarning) as record:
+            with session_budget(cpu_seconds=1.0):
+                pass
+        warned.extend(record)
+
+    # only the main thread can be interrupted
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert len(warned) == 1 and "main thread" in str(warned[0].message)
+
+
+def test_dead_workers_do_not_stop_the_tournament():
+    tournament = Tournament(
+        competitors=(Boulware2025, Linear2025, CrashingCenter2025),
+        scenarios=[make_dinners_scenario(n_friends=2, n_days=2, name="d")],
+        run_params=RunParams(nsteps=10),
+    )
+    for n_jobs in (1, 2):
+        results = tournament.run(n_repetitions=2, n_jobs=n_jobs, seed=1)
+        assert len(results.session_results) == 6
+        failed = [_ for _ in results.session_results if _.results.run_error]
+        # sessions running next to the crashing one are not charged for it
+        assert [_.center_type_name for _ in failed] == [
+            get_full_type_name(CrashingCenter2025)
+        ] * 2
+        assert all("died 3 times" in _.results.run_error for _ in failed)
+
+
+class UnpicklableCenter2025(Boulware2025):
+    def init(self):
+        if isinstance(self.ufun, CenterUFun):
+            self._lock = threading.Lock()
+        super().init()
+
+
+def test_sessions_with_lost_results_are_recorded_as_failures():
+    tournament = Tournament(
+        competitors=(Boulware2025, Linear2025, UnpicklableCenter2025),
+        scenarios=[make_dinners_scenario(n_friends=2, n_days=2, name="d")],
+        run_params=RunParams(nsteps=10),
+    )
+    results = tournament.run(n_repetitions=1, n_jobs=1, seed=1)
+    assert len(results.session_results) == 3
+    failed = [_ for _ in results.session_results if _.results.run_error]
+    assert [_.center_type_name for _ in failed] == [
+        get_full_type_name(UnpicklableCenter2025)
+    ]
+    assert "pickle" in failed[0].results.run_error
+
+
+def test_cost_profile_extrapolates_usage_and_persists(tmp_path):
+    profile = CostProfile(cpu_limit=10.0, memory_limit=100.0)
+    assert profile.predict("a", 100) == (None, None)
+    # cpu grows quadratically and memory linearly with the outcome-space
+    for n in (10, 20, 40):
+        profile.observe("a", n, cpu=n**2 / 1000, memory=n / 10)
+    cpu, memory = profile.predict("a", 80)
+    assert cpu == pytest.approx(6.4) and memory == pytest.approx(8.0)
+    assert profile.check("a", 80) is None
+    assert "CPU time" in profile.check("a", 200)
+    assert profile.check("b", 10**9) is None
+    assert not profile.is_uncertain("a", 400) and profile.is_uncertain("a", 401)
+    # a single failure is not enough to skip larger sessions
+    profile.observe_failure("a", 100)
+    assert profile.check("a", 100) is None
+    for n in (110, 120):
+        profile.observe_failure("a", n)
+    assert profile.check("a", 120) and profile.check("a", 115) is None
+    profile.save(tmp_path / "profile.yaml")
+    loaded = CostProfile.load(tmp_path / "profile.yaml", cpu_limit=10.0)
+    assert loaded.predict("a", 80) == pytest.approx((cpu, memory))
+    # saved failures are only used if asked for
+    assert loaded.check("a", 120) is None
+    loaded = CostProfile.load(
+        tmp_path / "profile.yaml", cpu_limit=10.0, use_saved_failures=True
+    )
+    assert loaded.check("a", 120)
@@ -1,7 +1,21 @@
-from anl2025.scenarios.dinners import make_dinners_scenario
-from anl2025.ufun import FlatteningCombiner, HierarchicalCombiner
+from copy import deepcopy
+from itertools import product
+
+import numpy as np
 from negmas import DiscreteCartesianOutcomeSpace, make_issue, make_os
 
+from anl2025.scenario import make_multideal_scenario
+from anl2025.scenarios.dinners import make_dinners_scenario
+from anl2025.scenarios.job_hunt import make_job_hunt_scenario
+from anl2025.scenarios.target_quantity import make_target_quantity_scenario
+from anl2025.ufun import (
+    CenterUFun,
+    CompiledEvaluator,
+    FlatteningCombiner,
+    HierarchicalCombiner,
+    LambdaCenterUFun,
+)
+
 
 def test_flatten_unflatten():
     outcome_spaces = (
@@ -60,3 +74,223 @@ def test_center_ufun_extremes():
         )
         for edge_outcome, os in zip(edge_outcomes, center.outcome_spaces, strict=True):
             assert edge_outcome is None or edge_outcome in os
+
+
+def test_center_ufun_eval_batch():
+    scenario = make_dinners_scenario(n_friends=3, n_days=2)
+    center = scenario.center_ufun
+    outcomes = list(center.outcome_space.enumerate())
+    indices = [center.encode_outcome(_) for _ in outcomes]
+    assert indices == list(range(len(outcomes)))
+    assert all(center.decode_outcome(i) == o for i, o in zip(indices, outcomes))
+    expected = [center(_) for _ in outcomes]
+    assert center.eval_batch(indices).tolist() == expected
+    assert center.utility_table() is not None
+    center.set_expected_outcome(1, center.outcome_spaces[1].enumerate()[0])
+    expected = [center(_) for _ in outcomes]
+    assert center.eval_batch(indices).tolist() == expected
+    assert center.eval_batch(indices, use_expected=False).tolist() == [
+        center(_, use_expected=False) for _ in outcomes
+    ]
+
+
+def test_side_ufun_does_not_modify_center():
+    scenario = make_dinners_scenario(n_friends=3, n_days=2)
+    center = scenario.center_ufun
+    sides = center.side_ufuns()
+    first = center.outcome_spaces[0].enumerate()[1]
+    last = center.outcome_spaces[2].enumerate()[1]
+    center.set_expected_outcome(0, first)
+    center.set_expected_outcome(2, last)
+    before = list(center._expected)
+    for outcome in center.outcome_spaces[1].enumerate():
+        assert sides[1].eval(outcome) == center((first, outcome, None), False)
+    assert center._expected == before
+    outcome = center.outcome_spaces[1].enumerate()[0]
+    cached = sides[1].eval(outcome)
+    center.set_expected_outcome(0, None)
+    assert sides[1].eval(outcome) == center((None, outcome, None), False)
+    assert cached == center((first, outcome, None), False)
+
+
+def test_compiled_evaluators_match_eval():
+    for scenario in (
+        make_dinners_scenario(n_friends=4, n_days=3),
+        make_target_quantity_scenario(n_suppliers=3),
+    ):
+        center = scenario.center_ufun
+        compiled = center.compiled_evaluator()
+        assert compiled is not None
+        indices = np.arange(center.n_combined_outcomes)
+        digits = center._digits(indices)
+        expected = [center.eval(center.decode_outcome(_)) for _ in indices[1:]]
+        assert np.allclose(compiled.eval_digits(digits)[1:], expected)
+        sparse = CompiledEvaluator(
+            compiled.keys,
+            {(int(k),): float(v) for k, v in enumerate(compiled.table)},
+            compiled.default,
+            max_dense_size=0,
+        )
+        assert np.allclose(sparse.eval_digits(digits), compiled.eval_digits(digits))
+
+
+def test_failing_compilation_falls_back_to_the_evaluator():
+    scenario = make_dinners_scenario(n_friends=3, n_days=2, seed=1)
+    center = scenario.center_ufun
+    assert isinstance(center, LambdaCenterUFun)
+    expected = center.minmax()
+    # evaluators pickled before the day index existed do not have it
+    evaluator = deepcopy(center._evaluator)
+    del evaluator._day_index
+    assert evaluator.compile(center._thread_outcomes) is not None
+
+    class Broken:
+        def __init__(self, evaluator):
+            self.evaluator = evaluator
+
+        def __call__(self, agreements):
+            return self.evaluator(agreements)
+
+        def compile(self, thread_outcomes):
+            raise AttributeError("broken")
+
+    center._evaluator = Broken(center._evaluator)
+    center.clear_utility_table()
+    assert center.compiled_evaluator() is None
+    assert np.allclose(center.minmax(), expected)
+
+
+def test_completions_match_exhaustive_search():
+    for scenario in (
+        make_dinners_scenario(n_friends=4, n_days=3, seed=1),
+        make_target_quantity_scenario(n_suppliers=3, seed=2),
+        make_multideal_scenario(nedges=3, nissues=2, nvalues=3, seed=3),
+        make_multideal_scenario(
+            nedges=3, nissues=2, nvalues=3, center_ufun_type="MaxCenterUFun", seed=4
+        ),
+    ):
+        center = scenario.center_ufun
+        for fixed in ({}, {1: None}, {0: center.outcome_spaces[0].enumerate()[1]}):
+            choices = [
+                [fixed[i]] if i in fixed else [None, *os.enumerate()]
+                for i, os in enumerate(center.outcome_spaces)
+            ]
+            expected = sorted(
+                (
+                    center.reserved_value
+                    if all(_ is None for _ in outcome)
+                    else center.eval(outcome)
+                    for outcome in product(*choices)
+                ),
+                reverse=True,
+            )
+            best, worst = center.best_completion(fixed), center.worst_completion(fixed)
+            assert np.isclose(best[1], expected[0])
+            assert np.isclose(worst[1], expected[-1])
+            for outcome, value in (best, worst):
+                assert np.isclose(center(outcome, use_expected=False), value)
+            top = center.top_k_completions(fixed, k=5)
+            assert np.allclose([_[1] for _ in top], expected[:5])
+            bottom = center.top_k_completions(fixed, k=5, best=False)
+            assert np.allclose([_[1] for _ in bottom], expected[::-1][:5])
+
+
+def test_separable_extremes_match_exhaustive_search():
+    for scenario in (
+        make_job_hunt_scenario(n_employers=3, work_days=3, salary=[1, 2, 3], seed=3),
+        make_multideal_scenario(nedges=3, nissues=2, nvalues=3, seed=4),
+    ):
+        center = scenario.center_ufun
+        for expected in (None, center.outcome_spaces[1].enumerate()[2]):
+            center.set_expected_outcome(1, expected)
+            worst, best = center.extreme_outcomes()
+            mn, mx = (center(_) for _ in CenterUFun.extreme_outcomes(center))
+            assert np.isclose(center(worst), mn) and np.isclose(center(best), mx)
+    # (|os|+1)^n outcomes would be too many to enumerate
+    center = make_job_hunt_scenario(n_employers=10, seed=1).center_ufun
+    assert np.isclose(center.minmax()[1], max(_.max() for _ in center.side_values()))
+
+
+def test_integer_encoded_outcomes_are_accepted():
+    scenario = make_dinners_scenario(n_friends=3, n_days=2, seed=1)
+    center = scenario.center_ufun
+    sides = center.side_ufuns()
+    for outcome in center.outcome_space.enumerate():
+        index = center.encode_outcome(outcome)
+        assert center(index) == center(outcome)
+        assert center._combiner.separated_outcomes(index) == outcome
+        assert scenario.utilities(index) == scenario.utilities(outcome)
+    for i, side in enumerate(sides):
+        for digit, outcome in enumerate([None, *center.outcome_spaces[i].enumerate()]):
+            assert side.eval(digit) == side.eval(outcome)
+    flattening = FlatteningCombiner(center.outcome_spaces)
+    outcome = tuple(os.enumerate()[0] for os in center.outcome_spaces)
+    index = flattening.encoding().encode(outcome)
+    assert flattening.combined_outcome(index) == flattening.combined_outcome(outcome)
+
+
+def test_eval_cache_is_invalidated_by_expected_outcomes():
+    scenario = make_dinners_scenario(n_friends=3, n_days=2, seed=1)
+    plain = scenario.center_ufun
+    center = deepcopy(plain)
+    center.cache_size = 4
+    side = center.side_ufuns()[1]
+    assert side.eval_cache.maxsize == 4
+    outcomes = list(plain.outcome_space.enumerate_or_sample())[:10]
+    for _ in range(2):
+        for outcome in outcomes:
+            assert center(outcome) == plain(outcome)
+    assert center.eval_cache is not None and len(center.eval_cache) == 4
+    assert center.eval_cache.misses == 2 * len(outcomes)
+    assert center(outcomes[-1]) == plain(outcomes[-1])
+    assert center.eval_cache.hits == 1
+    thread_outcome = center.outcome_spaces[1].enumerate()[0]
+    before = side.eval(thread_outcome)
+    assert side.eval(thread_outcome) == before and side.eval_cache.hits == 1
+    expected = center.outcome_spaces[0].enumerate()[1]
+    center.set_expected_outcome(0, expected)
+    plain.set_expected_outcome(0, expected)
+    assert len(center.eval_cache) == 0
+    assert side.eval(thread_outcome) == plain((expected, thread_outcome, None), False)
+    for outcome in outcomes:
+        assert center(outcome) == plain(outcome)
+
+
+def test_eval_cache_is_invalidated_by_center_state():
+    scenario = make_dinners_scenario(n_friends=3, n_days=2, seed=1)
+    center = scenario.center_ufun
+    # nothing is cached by default
+    assert center.eval_cache is None and center.side_ufuns()[0].eval_cache is None
+    center.cache_size = 8
+    side = center.side_ufuns()[0]
+    state = center.save_state()
+    before = side.eval(None)
+    center.reserved_value = before + 1.0
+    # the side utility of failing every thread is the reserved value of the center
+    assert side.eval(None) == before + 1.0
+    center.restore_state(state)
+    assert side.eval(None) == before and center(None) == before
+
+
+def test_side_reserved_values_are_lazy():
+    calls = []
+
+    def evaluator(outcomes):
+        calls.append(outcomes)
+        return sum(0 if _ is None else _[0] for _ in outcomes)
+
+    center = LambdaCenterUFun(
+        outcome_spaces=tuple(make_os([make_issue(3)]) for _ in range(3)),
+        evaluator=evaluator,
+        reserved_value=0.5,
+    )
+    sides = center.side_ufuns()
+    assert not calls
+    assert sides[1].reserved_value == 0.5
+    center.set_expected_outcome(0, (2,))
+    assert sides[1].reserved_value == sides[1].reserved_value == 2
+    assert len(calls) == 1
+    assert sides[2].reserved_value == 2
+    sides[1].reserved_value = 0.1
+    center.set_expected_outcome(0, (1,))
+    assert sides[1].reserved_value == 0.1 and sides[2].reserved_value == 1